@@ -0,0 +1,79 @@
+"""
+Benchmark of the time it takes to import pyciras, which should stay fast as the miners and sinks are imported on use.
+
+Every measurement imports pyciras in a fresh interpreter, and the median is reported. The run fails if the median is
+above --max-ms, or if it is more than --tolerance slower than a baseline.
+
+Usage:
+    python -m benchmarks.bench_import --output import.json
+    python -m benchmarks.bench_import --baseline import.json --max-ms 250
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_SCRIPT = '''
+import time
+start = time.perf_counter()
+import pyciras
+print(time.perf_counter() - start)
+'''
+
+
+def measure(repeat: int) -> list[float]:
+    """Import pyciras in repeat fresh interpreters, and return the import times in milliseconds."""
+
+    return [float(subprocess.run([sys.executable, '-c', IMPORT_SCRIPT],
+                                 cwd=Path(__file__).parent.parent,
+                                 capture_output=True,
+                                 text=True,
+                                 check=True).stdout.strip().splitlines()[-1]) * 1000
+            for _ in range(repeat)]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Benchmark the import time of pyciras.')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, help='Fail if the median import time is above this.')
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', type=Path, help='Compare the results with this JSON file.')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Relative slowdown against the baseline that counts as a regression.')
+    args = parser.parse_args(argv)
+
+    times = measure(args.repeat)
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'median_ms': round(statistics.median(times), 2),
+        'min_ms': round(min(times), 2),
+        'max_ms': round(max(times), 2),
+    }
+    print(f'import pyciras: median {results["median_ms"]:.1f} ms, '
+          f'min {results["min_ms"]:.1f} ms, max {results["max_ms"]:.1f} ms')
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4))
+
+    regressions = []
+    if args.max_ms is not None and results['median_ms'] > args.max_ms:
+        regressions.append(f'median {results["median_ms"]:.1f} ms is above {args.max_ms:.1f} ms')
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if results['median_ms'] > baseline['median_ms'] * (1 + args.tolerance):
+            regressions.append(f'median {results["median_ms"]:.1f} ms, was {baseline["median_ms"]:.1f} ms')
+
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+End-to-end benchmark of the git, lint and test miners on synthetic repositories, which works offline.
+
+Each miner runs in its own process on a fresh clone of the generated repository, and reports its throughput in
+commits per second, its peak RSS and the time of each telemetry stage. The results can be saved as a JSON baseline,
+and compared with an earlier baseline to find regressions.
+
+Usage:
+    python -m benchmarks.bench_miners --commits 100 --output baseline.json
+    python -m benchmarks.bench_miners --commits 100 --baseline baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+
+MINERS: list[str] = ['git', 'lint', 'test']
+
+
+def run_benchmarks(spec: RepoSpec, miners: list[str]) -> dict[str, any]:
+    """Generate a repository with the given shape and benchmark each miner on it in a separate process."""
+
+    with tempfile.TemporaryDirectory(prefix='pyciras-bench-') as work_directory:
+        source = generate_repo(Path(work_directory) / 'source' / 'synthetic', spec)
+
+        results = {}
+        for miner in miners:
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_miners',
+                                     '--worker', miner, str(source), str(Path(work_directory) / miner)],
+                                    cwd=Path(__file__).parent.parent,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True).stdout
+            results[miner] = json.loads(output.strip().splitlines()[-1])
+
+    return {
+        'spec': spec._asdict(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(results: dict[str, any], baseline: dict[str, any], tolerance: float) -> list[str]:
+    """Return the regressions of the results against a baseline, beyond a relative tolerance."""
+
+    if results['spec'] != baseline['spec']:
+        logging.warning('The baseline was recorded with a different repository shape')
+
+    regressions = []
+    for miner, result in results['results'].items():
+        old = baseline['results'].get(miner)
+        if old is None:
+            continue
+
+        if result['commits_per_s'] < old['commits_per_s'] * (1 - tolerance):
+            regressions.append(f'{miner}: {result["commits_per_s"]:.2f} commits/s, '
+                               f'was {old["commits_per_s"]:.2f} commits/s')
+        if result['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f'{miner}: peak RSS {result["peak_rss_mb"]:.1f} MB, was {old["peak_rss_mb"]:.1f} MB')
+
+    return regressions
+
+
+def _run_miner(miner: str, source: Path, work_directory: Path) -> dict[str, any]:
+    """Run a miner on a fresh clone of the source repository, and measure it."""
+
+    from git import Repo
+    from rich.progress import Progress
+
+    from data_io import repo_management
+    from mining import git_mining, lint_mining, test_mining
+    from utility import telemetry
+
+    logging.basicConfig(level=logging.WARNING)
+    repos_directory = work_directory / 'repositories'
+    repo_path = repos_directory / source.name
+    Repo.clone_from(str(source), repo_path)
+
+    progress = Progress(disable=True)
+    telemetry.configure(None)
+
+    start = time.perf_counter()
+    if miner == 'git':
+        data = git_mining.mine_git_data(repos_directory, [str(repo_path)], progress)
+        commits = data[source.name]['total_commits']
+    else:
+        commit_metadata = repo_management.get_repo_paths_and_commit_metadata(repos_directory, [repo_path], progress)
+        mine = lint_mining.mine_lint_data if miner == 'lint' else test_mining.mine_test_data
+        mine(commit_metadata, progress)
+        commits = len(commit_metadata[str(repo_path)])
+    duration = time.perf_counter() - start
+
+    return {
+        'commits': commits,
+        'duration': round(duration, 3),
+        'commits_per_s': round(commits / duration, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'stages': {stage: round(totals['duration'], 3) for stage, totals in telemetry.summary().items()},
+    }
+
+
+def main(argv: list[str] | None = None):
+    defaults = RepoSpec()
+    parser = argparse.ArgumentParser(description='Benchmark the miners on a synthetic repository.')
+    parser.add_argument('--commits', type=int, default=defaults.commits)
+    parser.add_argument('--files-per-commit', type=int, default=defaults.files_per_commit)
+    parser.add_argument('--python-file-lines', type=int, default=defaults.python_file_lines)
+    parser.add_argument('--test-ratio', type=float, default=defaults.test_ratio)
+    parser.add_argument('--merge-density', type=float, default=defaults.merge_density)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--miners', nargs='+', choices=MINERS, default=MINERS)
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', type=Path, help='Compare the results with this JSON file.')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Relative slowdown or memory growth that counts as a regression.')
+    parser.add_argument('--worker', nargs=3, metavar=('MINER', 'SOURCE', 'WORK_DIRECTORY'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        miner, source, work_directory = args.worker
+        print(json.dumps(_run_miner(miner, Path(source), Path(work_directory))))
+        return
+
+    spec = RepoSpec(args.commits, args.files_per_commit, args.python_file_lines, args.test_ratio,
+                    args.merge_density, args.seed)
+    results = run_benchmarks(spec, args.miners)
+
+    for miner, result in results['results'].items():
+        stages = ', '.join(f'{stage} {duration:.2f}s' for stage, duration in result['stages'].items())
+        print(f'{miner}: {result["commits"]} commits in {result["duration"]:.2f}s, '
+              f'{result["commits_per_s"]:.2f} commits/s, peak RSS {result["peak_rss_mb"]:.1f} MB ({stages})')
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4))
+
+    if args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Micro-benchmark of the data_io sinks at scale, with synthetic mining results.
+
+Each sink is driven through chunked appends like _process_chunk does, one call per chunk of repositories, for 10, 100
+and 1000 repositories by default. For every sink and scale it reports the cumulative time, the time of the first and
+the last append, the bytes written in total and left on disk, and the peak memory traced during the appends. An append
+time that grows with the number of earlier appends exposes quadratic behavior.
+
+Usage:
+    python -m benchmarks.bench_sinks --scales 10 100 --output sinks.json
+    python -m benchmarks.bench_sinks --sinks csv db --kinds lint --scales 1000 --budget 60
+"""
+
+import argparse
+import json
+import logging
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks import synthetic_payloads
+
+SINKS: list[str] = ['json', 'csv', 'db', 'flatten']
+KINDS: list[str] = ['lint', 'test', 'git', 'stargazers']
+
+
+def run_benchmarks(sinks: list[str],
+                   kinds: list[str],
+                   scales: list[int],
+                   chunk_size: int,
+                   commits: int,
+                   modules: int,
+                   budget: float | None,
+                   trace_memory: bool) -> dict[str, any]:
+    """Benchmark every combination of sink, kind of data and number of repositories."""
+
+    results = {}
+    for sink in sinks:
+        for kind in kinds:
+            for scale in scales:
+                with tempfile.TemporaryDirectory(prefix='pyciras-bench-') as output_directory:
+                    result = _run_sink(sink, kind, scale, chunk_size, commits, modules, Path(output_directory),
+                                       budget, trace_memory)
+                results.setdefault(f'{sink}/{kind}', {})[str(scale)] = result
+                logging.info(f'{sink}/{kind} {scale} repos: {result}')
+
+    return {
+        'settings': {'chunk_size': chunk_size, 'commits': commits, 'modules': modules, 'trace_memory': trace_memory},
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def _run_sink(sink: str,
+              kind: str,
+              scale: int,
+              chunk_size: int,
+              commits: int,
+              modules: int,
+              output_directory: Path,
+              budget: float | None,
+              trace_memory: bool) -> dict[str, any]:
+    """Append the data of scale repositories to a sink in chunks, and measure the appends."""
+
+    from rich.progress import Progress
+
+    from utility import telemetry
+
+    write = _get_writer(sink, kind, output_directory, Progress(disable=True))
+    telemetry.configure(None)
+    append_times = []
+    peak_memory = 0
+    repos = 0
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        for offset in range(0, scale, chunk_size):
+            names = synthetic_payloads.make_repo_names(min(chunk_size, scale - offset), offset)
+            payload = _make_payload(kind, names, commits, modules, seed=offset)
+
+            if trace_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+
+            start = time.perf_counter()
+            write(payload)
+            append_times.append(time.perf_counter() - start)
+            repos += len(names)
+
+            if trace_memory:
+                peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1] - baseline)
+
+            if budget is not None and sum(append_times) > budget:
+                break
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    bytes_on_disk = sum(path.stat().st_size for path in output_directory.rglob('*') if path.is_file())
+    bytes_written = sum(totals['counters'].get('bytes', 0) for stage, totals in telemetry.summary().items()
+                        if stage in ['json_write', 'csv_write'])
+
+    return {
+        'repos': repos,
+        'appends': len(append_times),
+        'completed': repos == scale,
+        'duration': round(sum(append_times), 4),
+        'first_append': round(append_times[0], 4),
+        'last_append': round(append_times[-1], 4),
+        'bytes_written': bytes_written or bytes_on_disk,
+        'bytes_on_disk': bytes_on_disk,
+        'peak_memory_mb': round(peak_memory / 1024 ** 2, 2) if trace_memory else None,
+    }
+
+
+def _make_payload(kind: str, names: list[str], commits: int, modules: int, seed: int) -> dict[str, any]:
+    """Generate the data of a chunk, which is generated for every append as the CSV writers modify their input."""
+
+    if kind == 'lint':
+        return synthetic_payloads.lint_payload(names, commits, modules, seed)
+    if kind == 'test':
+        return synthetic_payloads.test_payload(names, commits, modules, seed)
+    if kind == 'git':
+        return synthetic_payloads.git_payload(names, commits, modules, seed)
+
+    return synthetic_payloads.stargazers_payload(names, commits, seed)
+
+
+def _get_writer(sink: str, kind: str, output_directory: Path, progress) -> Callable[[dict], None]:
+    """Return a function that appends the data of a chunk to a sink, the same way pyciras.py writes it."""
+
+    from data_io import data_management
+    from data_io.database_management import DatabaseManager
+
+    if sink == 'json':
+        if kind in ['lint', 'test']:
+            return lambda data: data_management.append_json_lines(data, output_directory / f'{kind}-raw.jsonl',
+                                                                  progress)
+        return lambda data: data_management.write_json(data, output_directory / f'{kind}-raw.json', progress)
+
+    if sink == 'csv':
+        to_csv = {
+            'lint': data_management.lint_data_to_csv,
+            'test': data_management.test_data_to_csv,
+            'git': data_management.git_data_to_csv,
+            'stargazers': data_management.stargazers_data_to_csv,
+        }[kind]
+        return lambda data: to_csv(data, output_directory / f'{kind}.csv', progress)
+
+    if sink == 'db':
+        def insert(data: dict):
+            with DatabaseManager(output_directory / 'database.db') as dbm:
+                getattr(dbm, {
+                    'lint': 'insert_lint_data',
+                    'test': 'insert_test_data',
+                    'git': 'insert_git_data',
+                    'stargazers': 'insert_stargazers_data',
+                }[kind])(data, progress)
+
+        return insert
+
+    def flatten(data: dict):
+        for repo_data in data.values():
+            if kind in ['lint', 'test']:
+                for commit_data in repo_data.values():
+                    data_management._flatten_dict(commit_data)
+            else:
+                data_management._flatten_dict(repo_data)
+
+    return flatten
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Benchmark the data_io sinks with synthetic mining results.')
+    parser.add_argument('--sinks', nargs='+', choices=SINKS, default=SINKS)
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=KINDS)
+    parser.add_argument('--scales', nargs='+', type=int, default=[10, 100, 1000],
+                        help='Numbers of repositories to write.')
+    parser.add_argument('--chunk-size', type=int, default=1, help='Repositories per append.')
+    parser.add_argument('--commits', type=int, default=10,
+                        help='Commits per repository, or stargazers per repository for stargazers data.')
+    parser.add_argument('--modules', type=int, default=20, help='Python modules per repository.')
+    parser.add_argument('--budget', type=float, default=120,
+                        help='Stop a sink after this many seconds of appends, 0 for no limit.')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Do not trace memory, which slows down the appends.')
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run_benchmarks(args.sinks, args.kinds, args.scales, args.chunk_size, args.commits, args.modules,
+                             args.budget or None, not args.no_memory)
+
+    for name, scales in results['results'].items():
+        for scale, result in scales.items():
+            memory = f', peak {result["peak_memory_mb"]:.1f} MB' if result['peak_memory_mb'] is not None else ''
+            stopped = '' if result['completed'] else f' (stopped after {result["repos"]} repos)'
+            print(f'{name} {scale} repos: {result["duration"]:.2f}s, first append {result["first_append"]:.4f}s, '
+                  f'last append {result["last_append"]:.4f}s, {result["bytes_written"] / 1024 ** 2:.1f} MB written, '
+                  f'{result["bytes_on_disk"] / 1024 ** 2:.1f} MB on disk'
+                  f'{memory}{stopped}')
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark of the StatementVisitor of the test miner against the visitor it replaced, which walked the syntax trees
+with ast.NodeVisitor.
+
+The Python files of the given directories, the standard library by default, are parsed once, and both visitors count
+the statements of every tree. The run reports the files per second of both visitors, and fails if their counts or
+names differ for any file, or if the visitor is more than --tolerance slower than a baseline.
+
+Usage:
+    python -m benchmarks.bench_visitor --output visitor.json
+    python -m benchmarks.bench_visitor out/repositories/flask out/repositories/django --baseline visitor.json
+"""
+
+import argparse
+import ast
+import json
+import platform
+import sys
+import sysconfig
+import time
+import warnings
+from pathlib import Path
+
+from mining.test_mining import StatementVisitor
+
+
+class NodeStatementVisitor(ast.NodeVisitor):
+    """The StatementVisitor that the test miner used before, kept as the reference of the benchmark and the tests"""
+
+    def __init__(self):
+        self.known_test_modules = ['unittest', 'pytest', 'nose2']
+        self.test_imports = []
+        self.test_classes = []
+        self.test_functions = []
+        self.test_statements = 0
+        self.production_statements = 0
+        self.in_test_context = False
+
+    def visit_Import(self, node):
+        """Parse an import"""
+
+        for alias in node.names:
+            if alias.name in self.known_test_modules:
+                self.test_statements += 1
+                self.test_imports.append(alias.name)
+
+            elif not self.in_test_context:
+                self.production_statements += 1
+
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        """Parse a class definition, set the context for coming visits"""
+
+        original_in_test_context = self.in_test_context
+        test_base_found = False
+        for base in node.bases:
+            if isinstance(base, ast.Name) and base.id == "TestCase":
+                test_base_found = True
+                break
+
+            elif isinstance(base, ast.Attribute) and base.attr == "TestCase":
+                test_base_found = True
+                break
+
+        if test_base_found:
+            self.test_statements += 1
+            self.test_classes.append(node.name)
+            self.in_test_context = True
+
+        else:
+            if not self.in_test_context:
+                self.production_statements += 1
+
+        self.generic_visit(node)
+        self.in_test_context = original_in_test_context
+
+    def visit_FunctionDef(self, node):
+        """Parse a function definition"""
+
+        original_in_test_context = self.in_test_context
+        if node.name.startswith('test_'):
+            self.test_functions.append(node.name)
+            self.test_statements += 1
+            self.in_test_context = True
+
+        else:
+            if not self.in_test_context:
+                self.production_statements += 1
+
+        self.generic_visit(node)
+        self.in_test_context = original_in_test_context
+
+    def visit_Assign(self, node):
+        """Parse an assignment"""
+
+        if self.in_test_context:
+            self.test_statements += 1
+        else:
+            self.production_statements += 1
+
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        """Parse a function call"""
+
+        if self.in_test_context:
+            self.test_statements += 1
+        else:
+            self.production_statements += 1
+
+        self.generic_visit(node)
+
+    def visit_Expr(self, node):
+        """Parse an expression"""
+
+        if self.in_test_context:
+            self.test_statements += 1
+        else:
+            self.production_statements += 1
+
+        self.generic_visit(node)
+
+
+def parse_files(directories: list[Path]) -> dict[str, ast.Module]:
+    """Parse the Python files of the directories, skipping those that do not parse and the installed packages."""
+
+    trees = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for directory in directories:
+            for path in sorted(directory.rglob('*.py')):
+                if 'site-packages' in path.relative_to(directory).parts:
+                    continue
+                try:
+                    trees[str(path)] = ast.parse(path.read_bytes())
+                except (SyntaxError, ValueError, OSError, RecursionError):
+                    continue
+
+    return trees
+
+
+def count(visitor_class: type, trees: dict[str, ast.Module]) -> tuple[float, dict[str, tuple]]:
+    """Count the statements of every tree with a new visitor per tree, return the seconds it took and the counts."""
+
+    counts = {}
+    start = time.perf_counter()
+    for path, tree in trees.items():
+        visitor = visitor_class()
+        visitor.visit(tree)
+        counts[path] = (visitor.test_imports, visitor.test_classes, visitor.test_functions,
+                        visitor.production_statements, visitor.test_statements)
+
+    return time.perf_counter() - start, counts
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Benchmark the statement visitor of the test miner.')
+    parser.add_argument('directories', nargs='*', type=Path, default=[Path(sysconfig.get_paths()['stdlib'])],
+                        help='Directories with Python files, such as cloned repositories (default: the standard '
+                             'library).')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', type=Path, help='Compare the results with this JSON file.')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Relative slowdown against the baseline that counts as a regression.')
+    args = parser.parse_args(argv)
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    trees = parse_files(args.directories)
+    reference_times, visitor_times = [], []
+    for _ in range(args.repeat):
+        reference_time, reference_counts = count(NodeStatementVisitor, trees)
+        visitor_time, visitor_counts = count(StatementVisitor, trees)
+        reference_times.append(reference_time)
+        visitor_times.append(visitor_time)
+
+    mismatches = [path for path in trees if reference_counts[path] != visitor_counts[path]]
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'files': len(trees),
+        'reference_files_per_s': round(len(trees) / min(reference_times), 1),
+        'visitor_files_per_s': round(len(trees) / min(visitor_times), 1),
+        'speedup': round(min(reference_times) / min(visitor_times), 2),
+        'mismatches': len(mismatches),
+    }
+    print(f'{results["files"]} files: NodeVisitor {results["reference_files_per_s"]:.0f} files/s, '
+          f'StatementVisitor {results["visitor_files_per_s"]:.0f} files/s, {results["speedup"]:.2f}x')
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=4))
+
+    regressions = [f'different counts for {path}' for path in mismatches]
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if results['visitor_files_per_s'] < baseline['visitor_files_per_s'] * (1 - args.tolerance):
+            regressions.append(f'{results["visitor_files_per_s"]:.0f} files/s, '
+                               f'was {baseline["visitor_files_per_s"]:.0f} files/s')
+
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+This module generates reproducible synthetic mining results, in the same dict shapes as the miners return them, used
+to benchmark the data_io sinks without mining.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+BASE_DATE: datetime = datetime(2020, 1, 1, tzinfo=timezone.utc)
+CATEGORIES: list[str] = ['convention', 'error', 'fatal', 'info', 'refactor', 'statement', 'warning']
+MESSAGES: list[tuple[str, str, str, str]] = [
+    ('C0114', 'missing-module-docstring', 'convention', 'Missing module docstring'),
+    ('C0116', 'missing-function-docstring', 'convention', 'Missing function or method docstring'),
+    ('C0103', 'invalid-name', 'convention', 'Variable name "x" doesn\'t conform to snake_case naming style'),
+    ('R0903', 'too-few-public-methods', 'refactor', 'Too few public methods (1/2)'),
+    ('R1260', 'too-complex', 'refactor', '\'compute\' is too complex. The McCabe rating is 4'),
+    ('W0611', 'unused-import', 'warning', 'Unused import os'),
+    ('E1101', 'no-member', 'error', 'Instance of \'Model\' has no \'value\' member'),
+]
+BAD_NAMES: list[str] = ['argument', 'attr', 'klass', 'class_attribute', 'class_const', 'const', 'inlinevar',
+                        'function', 'method', 'module', 'variable', 'typevar', 'typealias']
+NODE_TYPES: list[str] = ['function', 'klass', 'method', 'module']
+
+
+def make_repo_names(count: int, offset: int = 0) -> list[str]:
+    """Return the names of synthetic repositories."""
+
+    return [f'repo_{index:05d}' for index in range(offset, offset + count)]
+
+
+def lint_payload(repo_names: list[str], commits: int, modules: int, seed: int = 0) -> dict[str, any]:
+    """Generate lint data as returned by lint_mining.mine_lint_data."""
+
+    rng = random.Random(seed)
+    return {repo_name: {_commit_hash(rng): _lint_commit(rng, repo_name, number, modules)
+                        for number in range(commits)}
+            for repo_name in repo_names}
+
+
+def test_payload(repo_names: list[str], commits: int, modules: int, seed: int = 0) -> dict[str, any]:
+    """Generate test data as returned by test_mining.mine_test_data."""
+
+    rng = random.Random(seed)
+    return {repo_name: {_commit_hash(rng): _test_commit(rng, repo_name, number, modules)
+                        for number in range(commits)}
+            for repo_name in repo_names}
+
+
+def git_payload(repo_names: list[str], commits: int, modules: int, seed: int = 0) -> dict[str, any]:
+    """Generate git data as returned by git_mining.mine_git_data."""
+
+    rng = random.Random(seed)
+    return {repo_name: _git_repo(rng, repo_name, commits, modules) for repo_name in repo_names}
+
+
+def stargazers_payload(repo_names: list[str], stargazers: int, seed: int = 0) -> dict[str, any]:
+    """Generate stargazers data as returned by git_mining.mine_stargazers_data."""
+
+    rng = random.Random(seed)
+    data = {}
+    for repo_name in repo_names:
+        starred = sorted(BASE_DATE + timedelta(minutes=rng.randrange(60 * 24 * 365 * 4)) for _ in range(stargazers))
+        edges = [{'cursor': f'Y3Vyc29yOnYyOpK5{index:08d}',
+                  'starredAt': date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                  'node': {'login': f'user{rng.randrange(10 ** 6)}'}}
+                 for index, date in enumerate(starred)]
+        data[repo_name] = {'data': {'repository': {'stargazers': {'edges': edges}, 'name': repo_name}}}
+
+    return data
+
+
+def _commit_hash(rng: random.Random) -> str:
+    return f'{rng.getrandbits(160):040x}'
+
+
+def _commit_date(number: int) -> datetime:
+    return BASE_DATE + timedelta(hours=7 * number)
+
+
+def _module_names(repo_name: str, modules: int) -> list[str]:
+    return [f'{repo_name}.src.module_{index}' for index in range(modules)]
+
+
+def _lint_commit(rng: random.Random, repo_name: str, number: int, modules: int) -> dict[str, any]:
+    messages = {}
+    by_msg = {}
+    by_module = {}
+    category_totals = dict.fromkeys(CATEGORIES, 0)
+    complexities = []
+    for module in _module_names(repo_name, modules):
+        by_module[module] = dict.fromkeys(CATEGORIES, 0)
+        module_messages = {'total_messages': 0, 'categories': {}}
+        for _ in range(rng.randrange(12)):
+            msg_id, symbol, category, text = rng.choice(MESSAGES)
+            path = f'/repositories/{repo_name}/{module.split(".", 1)[1].replace(".", "/")}.py'
+            category_data = module_messages['categories'].setdefault(category, {'total': 0, 'message_ids': {}})
+            category_data['message_ids'].setdefault(msg_id, []).append({
+                'symbol': symbol,
+                'msg': text,
+                'confidence': ('HIGH', 'Warning that is not based on inference result.'),
+                'path': path
+            })
+            category_data['total'] += 1
+            module_messages['total_messages'] += 1
+            by_module[module][category] += 1
+            category_totals[category] += 1
+            by_msg[f'{msg_id}.{symbol}'] = by_msg.get(f'{msg_id}.{symbol}', 0) + 1
+            if symbol == 'too-complex':
+                complexities.append(4)
+
+        by_module[module]['statement'] = rng.randrange(20, 200)
+        if module_messages['total_messages'] > 0:
+            messages[module] = module_messages
+
+    avg_mccabe_complexity = sum(complexities) / len(complexities) if complexities else 0
+    messages['avg_mccabe_complexity'] = avg_mccabe_complexity
+    messages['repository_name'] = repo_name
+
+    statements = sum(module['statement'] for module in by_module.values())
+    stats = {
+        'bad_names': {name: rng.randrange(3) for name in BAD_NAMES},
+        'by_module': by_module,
+        'by_msg': by_msg,
+        'code_type_count': {'code': statements, 'comment': rng.randrange(100), 'docstring': rng.randrange(100),
+                            'empty': rng.randrange(100), 'total': statements * 2},
+        'dependencies': {},
+        'duplicated_lines': {'nb_duplicated_lines': 0, 'percent_duplicated_lines': 0.0},
+        'global_note': round(rng.uniform(0, 10), 6),
+        'nb_duplicated_lines': 0,
+        'node_count': {node_type: rng.randrange(modules * 5 + 1) for node_type in NODE_TYPES},
+        'percent_duplicated_lines': 0.0,
+        'undocumented': {node_type: rng.randrange(modules + 1) for node_type in NODE_TYPES},
+        'avg_mccabe_complexity': avg_mccabe_complexity,
+        'repository_name': repo_name,
+    }
+    stats.update({category: total for category, total in category_totals.items() if category != 'statement'})
+    stats['statement'] = statements
+
+    return {'messages': messages, 'stats': stats, 'date': _commit_date(number)}
+
+
+def _test_commit(rng: random.Random, repo_name: str, number: int, modules: int) -> dict[str, any]:
+    files = {}
+    test_statements = 0
+    production_statements = 0
+    for index in range(modules):
+        is_test = rng.random() < 0.25
+        file_data = {
+            'imports': ['unittest'] if is_test else [],
+            'unittest_classes': [f'Test{index}'] if is_test else [],
+            'pytest_functions': [f'test_case_{case}' for case in range(rng.randrange(10))] if is_test else [],
+            'production_statements': rng.randrange(5) if is_test else rng.randrange(20, 200),
+            'test_statements': rng.randrange(20, 100) if is_test else 0,
+        }
+        test_statements += file_data['test_statements']
+        production_statements += file_data['production_statements']
+        path = f'repositories/{repo_name}/{"tests/test" if is_test else "src/module"}_{index}.py'
+        files[path] = file_data
+
+    return {
+        'files': files,
+        'test-to-code-ratio': test_statements / production_statements if production_statements else 0.0,
+        'date': _commit_date(number),
+    }
+
+
+def _git_repo(rng: random.Random, repo_name: str, commits: int, modules: int) -> dict[str, any]:
+    files = [f'src/module_{index}.py' for index in range(modules)]
+    developers = [f'Developer {index}' for index in range(rng.randrange(1, 20))]
+
+    def per_file(low: float, high: float) -> dict[str, float]:
+        return {file: round(rng.uniform(low, high), 2) for file in files}
+
+    lines_added = rng.randrange(commits * 10, commits * 100)
+    lines_deleted = rng.randrange(lines_added)
+    files_modified = rng.randrange(commits, commits * 5)
+    return {
+        'total_commits': commits,
+        'developers': developers,
+        'developer_count': len(developers),
+        'lines_added': lines_added,
+        'lines_deleted': lines_deleted,
+        'files_modified': files_modified,
+        'average_lines_added_per_commit': lines_added / commits,
+        'average_lines_deleted_per_commit': lines_deleted / commits,
+        'average_files_modified_per_commit': files_modified / commits,
+        'average_dmm_method_lines_of_code': rng.random(),
+        'average_dmm_method_cyclomatic_complexity': rng.random(),
+        'average_dmm_method_number_of_parameters': rng.random(),
+        'lines_count': {'added': per_file(1, 500), 'removed': per_file(0, 200), 'avg_added': per_file(1, 50)},
+        'hunks_count': per_file(1, 40),
+        'contributors_experience': per_file(0, 100),
+        'contributors_count': {'total': per_file(1, 10), 'minor': per_file(0, 5)},
+        'history_complexity': per_file(0, 5),
+        'code_churn': {'total': per_file(0, 500), 'max': per_file(0, 100), 'avg': per_file(0, 50)},
+        'change_set_max': rng.randrange(1, 50),
+        'change_set_avg': rng.uniform(1, 5),
+        'average_lines_added_to_files': rng.uniform(1, 500),
+        'average_lines_deleted_from_files': rng.uniform(0, 200),
+        'average_avg_lines_added_to_files': rng.uniform(1, 50),
+        'average_hunks': rng.uniform(1, 40),
+        'average_contributor_experience': rng.uniform(0, 100),
+        'average_contributors': rng.uniform(1, 10),
+        'average_minor_contributors': rng.uniform(0, 5),
+        'average_code_churn_total': rng.uniform(0, 500),
+        'average_code_churn_max': rng.uniform(0, 100),
+        'average_code_churn_avg': rng.uniform(0, 50),
+        'average_history_complexity': rng.uniform(0, 5),
+        'repo': repo_name,
+        'repo_url': f'https://github.com/synthetic/{repo_name}',
+    }
@@ -0,0 +1,155 @@
+"""This module generates reproducible synthetic git repositories, used to benchmark the miners offline."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from git import Actor, Commit, Repo
+
+AUTHORS: list[Actor] = [Actor(name, f'{name.lower()}@example.com')
+                        for name in ['Ada', 'Brian', 'Grace', 'Guido', 'Linus', 'Margaret']]
+BASE_DATE: datetime = datetime(2020, 1, 1, tzinfo=timezone.utc)
+PACKAGES: list[str] = ['core', 'io', 'models', 'services']
+
+
+class RepoSpec(NamedTuple):
+    """The shape of a synthetic repository."""
+
+    commits: int = 50
+    files_per_commit: int = 3
+    python_file_lines: int = 60
+    # The share of modified files that are unit-test files.
+    test_ratio: float = 0.25
+    # The share of commits that are merges of a side branch.
+    merge_density: float = 0.1
+    seed: int = 0
+
+
+def generate_repo(path: Path, spec: RepoSpec = RepoSpec()) -> Path:
+    """
+    Generate a repository at path with the given shape. The same spec always produces the same commit hashes, as
+    contents, authors and dates are derived from the seed.
+    """
+
+    rng = random.Random(spec.seed)
+    path.mkdir(parents=True, exist_ok=True)
+    repo = Repo.init(path, initial_branch='main')
+    modules: list[str] = []
+    tests: list[str] = []
+
+    made = 0
+    while made < spec.commits:
+        if made > 0 and made + 2 <= spec.commits and rng.random() < spec.merge_density:
+            head = repo.head.commit
+            side = _commit(repo, rng, spec, made, modules, tests, parents=[head], move_head=False)
+            _commit(repo, rng, spec, made + 1, modules, tests, parents=[head, side], merge=True)
+            made += 2
+        else:
+            _commit(repo, rng, spec, made, modules, tests)
+            made += 1
+
+    return path
+
+
+def _commit(repo: Repo,
+            rng: random.Random,
+            spec: RepoSpec,
+            number: int,
+            modules: list[str],
+            tests: list[str],
+            parents: list[Commit] | None = None,
+            move_head: bool = True,
+            merge: bool = False) -> Commit:
+    """Write the files of a commit to the working tree, and commit them."""
+
+    changed = []
+    for _ in range(spec.files_per_commit):
+        is_test = rng.random() < spec.test_ratio
+        files = tests if is_test else modules
+        if len(files) == 0 or rng.random() < 0.3:
+            package = rng.choice(PACKAGES)
+            name = f'tests/test_{package}_{len(files)}.py' if is_test else f'src/{package}/module_{len(files)}.py'
+            files.append(name)
+            changed += _write_package_files(Path(repo.working_dir), name)
+        else:
+            name = rng.choice(files)
+
+        file_path = Path(repo.working_dir) / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = max(1, round(rng.gauss(spec.python_file_lines, spec.python_file_lines / 4)))
+        file_path.write_text(_test_module(rng, lines) if is_test else _production_module(rng, lines))
+        changed.append(name)
+
+    repo.index.add(sorted(set(changed)))
+
+    author = rng.choice(AUTHORS)
+    date = f'{int((BASE_DATE + timedelta(hours=7 * number)).timestamp())} +0000'
+    message = 'Merge side branch into main' if merge else f'Change {", ".join(sorted(set(changed)))}'
+    return repo.index.commit(message,
+                             parent_commits=parents,
+                             head=move_head,
+                             author=author,
+                             committer=author,
+                             author_date=date,
+                             commit_date=date)
+
+
+def _write_package_files(repo_path: Path, name: str) -> list[str]:
+    """Write the missing __init__.py files of the packages that contain a file, so that Pylint finds all modules."""
+
+    written = []
+    for package in [Path(name).parents[i] for i in reversed(range(len(Path(name).parents)))]:
+        init_file = package / '__init__.py'
+        if not (repo_path / init_file).exists():
+            (repo_path / package).mkdir(parents=True, exist_ok=True)
+            (repo_path / init_file).write_text('')
+            written.append(init_file.as_posix())
+
+    return written
+
+
+def _production_module(rng: random.Random, lines: int) -> str:
+    """Generate a Python module of at least the given number of lines, with imports, classes and functions."""
+
+    source = ['import os', 'from pathlib import Path', '', '']
+    while len(source) < lines:
+        index = rng.randrange(1000)
+        if rng.random() < 0.3:
+            source += [f'class Model{index}:',
+                       f'    """Model {index}."""',
+                       '',
+                       '    def __init__(self, value):',
+                       '        self.value = value',
+                       '',
+                       '    def scaled(self, factor):',
+                       '        result = self.value * factor',
+                       '        return result',
+                       '', '']
+        else:
+            source += [f'def compute_{index}(value, items=None):',
+                       '    total = 0',
+                       '    for item in items or range(value):',
+                       f'        if item % {rng.randint(2, 9)} == 0:',
+                       '            total += item',
+                       '    path = Path(os.getcwd())',
+                       '    print(path, total)',
+                       '    return total',
+                       '', '']
+
+    return '\n'.join(source).rstrip() + '\n'
+
+
+def _test_module(rng: random.Random, lines: int) -> str:
+    """Generate a unittest module of at least the given number of lines."""
+
+    source = ['import unittest', '', '', f'class Test{rng.randrange(1000)}(unittest.TestCase):', '']
+    while len(source) < max(lines, 6):
+        index = rng.randrange(1000)
+        source += [f'    def test_compute_{index}(self):',
+                   f'        value = {index}',
+                   '        result = sum(range(value))',
+                   '        self.assertGreaterEqual(result, 0)',
+                   '']
+
+    return '\n'.join(source).rstrip() + '\n\n\nif __name__ == \'__main__\':\n    unittest.main()\n'
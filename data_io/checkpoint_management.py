@@ -0,0 +1,75 @@
+"""This module provides checkpoints for the mining, so that an interrupted run can continue where it stopped."""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from data_io.data_management import get_lock_for_file
+from utility import util
+
+CHECKPOINT_FILE = 'checkpoints.json'
+
+
+def read_checkpoints(data_directory: Path, miner: str) -> dict[str, str]:
+    """Returns the high-water marks of a miner, as a dict of repo names and the last processed commit hash."""
+
+    path = data_directory / CHECKPOINT_FILE
+    with get_lock_for_file(path):
+        return _load(path).get(miner, {})
+
+
+def record_checkpoint(data_directory: Path, miner: str, repo_name: str, commit_hash: str):
+    """Records the last processed commit of a repository for a miner."""
+
+    path = data_directory / CHECKPOINT_FILE
+    with get_lock_for_file(path):
+        checkpoints = _load(path)
+        checkpoints.setdefault(miner, {})[repo_name] = commit_hash
+        checkpoints['updated_at'] = str(datetime.now())
+
+        temporary_path = path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as file:
+            json.dump(checkpoints, file, indent=4)
+        temporary_path.replace(path)
+
+    logging.debug(f'{miner} checkpoint for {repo_name} at {commit_hash}')
+
+
+def skip_processed_commits(data_directory: Path,
+                           miner: str,
+                           repos_and_commit_metadata: dict[str, list[tuple[str, datetime]]]) \
+        -> dict[str, list[tuple[str, datetime]]]:
+    """Removes the commits up to and including the high-water mark of each repository."""
+
+    checkpoints = read_checkpoints(data_directory, miner)
+    remaining = {}
+    for repo_path, commit_metadata in repos_and_commit_metadata.items():
+        repo_name = util.get_repo_name_from_url_or_path(repo_path)
+        high_water_mark = checkpoints.get(repo_name)
+        if high_water_mark is None:
+            remaining[repo_path] = commit_metadata
+            continue
+
+        commit_hashes = [commit_hash for commit_hash, _ in commit_metadata]
+        if high_water_mark not in commit_hashes:
+            logging.warning(f'\n{miner} checkpoint {high_water_mark} not found in {repo_name}, '
+                            f'mining all commits')
+            remaining[repo_path] = commit_metadata
+            continue
+
+        index = commit_hashes.index(high_water_mark) + 1
+        logging.info(f'\nResuming {miner} mining of {repo_name} at commit {index}/{len(commit_metadata)}')
+        remaining[repo_path] = commit_metadata[index:]
+
+    return remaining
+
+
+def _load(path: Path) -> dict:
+    """Loads the checkpoint file, or returns an empty dict if it does not exist."""
+
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
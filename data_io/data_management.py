@@ -1,9 +1,12 @@
 """This module provides functionality for data manipulation and processing."""
 
+import csv
 import json
 import logging
+import os
 import threading
 from datetime import datetime
+from itertools import islice
 from multiprocessing import current_process
 from pathlib import Path
 
@@ -11,11 +14,21 @@ import numpy as np
 import pandas as pd
 from rich.progress import Progress
 
-from utility import config, util
+from mining.lint_messages import LintMessages
+from utility import config, profiling, telemetry, util
 
 meta_lock = threading.Lock()
 file_locks = {}
 
+RAW_JSON_FILES: list[str] = ['metadata-raw.json', 'stargazers-raw.json', 'git-raw.json']
+RAW_JSON_LINES_FILES: list[str] = ['lint-raw.jsonl', 'test-raw.jsonl']
+# The number of rows that are read at a time when a CSV file is rewritten.
+CSV_CHUNK_ROWS: int = 10000
+LINT_FIXED_COLUMNS: list[str] = ['repo', 'date', 'commit_hash', 'info', 'refactor', 'convention', 'warning', 'error',
+                                 'fatal', 'global_note', 'avg_mccabe_complexity', 'percent_duplicated_lines',
+                                 'nb_duplicated_lines', 'statement']
+LINT_FIXED_COLUMN_PREFIXES: list[str] = ['undocumented', 'bad_names', 'code_type', 'node_count']
+
 
 def get_lock_for_file(file_path: Path) -> threading.Lock:
     """Get a lock for a file path, creating one if it doesn't exist."""
@@ -32,7 +45,7 @@ def get_lock_for_file(file_path: Path) -> threading.Lock:
 
 
 class CustomEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle Path objects, sets and datetime objects produced by Pydriller and Pylint"""
+    """Custom JSON encoder to handle Path objects, sets, datetime objects and lint messages from Pydriller and Pylint"""
 
     def default(self, obj):
         if isinstance(obj, set):
@@ -41,18 +54,22 @@ class CustomEncoder(json.JSONEncoder):
             return str(obj)
         elif isinstance(obj, Path):
             return str(obj)
+        elif isinstance(obj, LintMessages):
+            return obj.to_dict()
         else:
             return json.JSONEncoder.default(self, obj)
 
 
-def make_data_directory() -> Path:
-    """Creates a timestamped directory for the output data."""
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
-    data_dir = config.DATA_FOLDER / f'./{timestamp}'
+def make_data_directory(name: str | None = None) -> Path:
+    """Creates a timestamped directory for the output data, or returns the named directory if a name is given."""
+    if name is None:
+        name = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    data_dir = config.DATA_FOLDER / f'./{name}'
     data_dir.mkdir(parents=True, exist_ok=True)
     return data_dir
 
 
+@profiling.profiled
 def write_json(new_data: dict, path: Path, progress: Progress):
     """Loads existing JSON data and updates it with new data, or writes new data to a JSON file."""
 
@@ -70,12 +87,40 @@ def write_json(new_data: dict, path: Path, progress: Progress):
         data.update(new_data)
 
         write_task = progress.add_task(f'Writing JSON: {util.absolute_data_path_to_relative(str(path))}', total=None)
-        with open(path, 'w') as file:
-            json.dump(data, file, indent=4, cls=CustomEncoder)
+        with telemetry.span('json_write') as span:
+            with open(path, 'w') as file:
+                json.dump(data, file, indent=4, cls=CustomEncoder)
+            span.add('repos', len(new_data))
+            span.add('bytes', path.stat().st_size)
+        progress.stop_task(write_task)
+        progress.remove_task(write_task)
+
+
+@profiling.profiled
+def append_json_lines(new_data: dict, path: Path, progress: Progress):
+    """
+    Appends the commits of new data, by repository and commit hash, to a JSON Lines file with one record per commit,
+    which is used when the commits of a repository are written in batches. Records are not deduplicated, which is done
+    when data directories are merged.
+    """
+
+    lock = get_lock_for_file(path)
+    with lock:
+        write_task = progress.add_task(f'Writing JSON: {util.absolute_data_path_to_relative(str(path))}', total=None)
+        with telemetry.span('json_write') as span:
+            with open(path, 'a') as file:
+                start = file.tell()
+                for repo, commits in new_data.items():
+                    for commit_hash, commit_data in commits.items():
+                        record = {'repo': repo, 'commit_hash': commit_hash, 'data': commit_data}
+                        file.write(json.dumps(record, cls=CustomEncoder) + '\n')
+                span.add('bytes', file.tell() - start)
+            span.add('repos', len(new_data))
         progress.stop_task(write_task)
         progress.remove_task(write_task)
 
 
+@profiling.profiled
 def lint_data_to_csv(lint_data: dict, path: Path, progress: Progress):
     """Write lint data to a CSV file."""
 
@@ -128,30 +173,10 @@ def lint_data_to_csv(lint_data: dict, path: Path, progress: Progress):
     progress.stop_task(processing_task)
     progress.remove_task(processing_task)
 
-    fixed_columns = [
-        'repo',
-        'date',
-        'commit_hash',
-        'info',
-        'refactor',
-        'convention',
-        'warning',
-        'error',
-        'fatal',
-        'global_note',
-        'avg_mccabe_complexity',
-        'percent_duplicated_lines',
-        'nb_duplicated_lines',
-        'statement'
-    ]
-
-    prefixes_dynamic_fixed_columns = ['undocumented', 'bad_names', 'code_type', 'node_count']
-    fixed_dynamic_columns = sorted([col for col in df.columns if
-                                    any(col.startswith(prefix) for prefix in prefixes_dynamic_fixed_columns)])
-
-    _update_csv(path, df, fixed_columns + fixed_dynamic_columns, progress)
+    _append_csv(path, df, _lint_fixed_columns(df), progress)
 
 
+@profiling.profiled
 def git_data_to_csv(git_data: dict, path: Path, progress: Progress):
     """Write git data to a CSV file."""
 
@@ -174,24 +199,10 @@ def git_data_to_csv(git_data: dict, path: Path, progress: Progress):
     progress.stop_task(processing_task)
     progress.remove_task(processing_task)
 
-    lock = get_lock_for_file(path)
-    with lock:
-        if path.exists():
-            read_task = progress.add_task(f'Reading CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
-            existing_df = pd.read_csv(path)
-            progress.stop_task(read_task)
-            progress.remove_task(read_task)
-            updated_df = pd.concat([existing_df, df]).drop_duplicates('repo', keep='last')
-        else:
-            updated_df = df
-
-        write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
-        updated_df = _sort_rows_and_cols(updated_df, ['repo'], ['repo'])
-        updated_df.to_csv(path, mode='w', index=False, na_rep='nan')
-        progress.stop_task(write_task)
-        progress.remove_task(write_task)
+    _update_csv_by_repo(path, df, progress)
 
 
+@profiling.profiled
 def test_data_to_csv(test_data: dict, path: Path, progress: Progress):
     """Write test data to a CSV file."""
 
@@ -221,9 +232,10 @@ def test_data_to_csv(test_data: dict, path: Path, progress: Progress):
     progress.stop_task(processing_task)
     progress.remove_task(processing_task)
 
-    _update_csv(path, df, ['repo', 'date'], progress)
+    _append_csv(path, df, ['repo', 'date'], progress)
 
 
+@profiling.profiled
 def stargazers_data_to_csv(stargazers_data: dict, path: Path, progress):
     """Write stargazers data to a CSV file."""
 
@@ -254,17 +266,14 @@ def stargazers_data_to_csv(stargazers_data: dict, path: Path, progress):
     df = df.fillna(0).astype(int)
 
     df.reset_index(inplace=True)
-    df = _sort_cols(df, ['date'])
 
     progress.stop_task(processing_task)
     progress.remove_task(processing_task)
 
-    write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
-    df.to_csv(path, mode='w', index=False)
-    progress.stop_task(write_task)
-    progress.remove_task(write_task)
+    _update_stargazers_csv(path, df, progress)
 
 
+@profiling.profiled
 def metadata_to_csv(metadata: dict, path: Path, progress: Progress):
     """Write repo metadata to a CSV file."""
 
@@ -295,15 +304,45 @@ def metadata_to_csv(metadata: dict, path: Path, progress: Progress):
     with pd.option_context('future.no_silent_downcasting', True):
         df.replace('', np.nan, inplace=True)
 
-    df = _sort_rows_and_cols(df, ['repo'], ['repo'])
-
     progress.stop_task(processing_task)
     progress.remove_task(processing_task)
 
-    write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
-    df.to_csv(path, mode='w', index=False, na_rep='nan')
-    progress.stop_task(write_task)
-    progress.remove_task(write_task)
+    _update_csv_by_repo(path, df, progress)
+
+
+def merge_data_directory(source: Path, target: Path, progress: Progress):
+    """
+    Merges the JSON and CSV data of a data directory into another one, which combines the data of mining nodes into
+    one dataset. Rows of repositories and commits that are in both directories are taken from the source, and rows
+    that a directory has more than once, when a batch was written again after an interrupted run was resumed, appear
+    once.
+    """
+
+    for name in RAW_JSON_FILES:
+        if (source / name).exists():
+            with open(source / name, 'r') as file:
+                data = json.load(file)
+            write_json(data, target / name, progress)
+
+    for name in RAW_JSON_LINES_FILES:
+        if (source / name).exists():
+            _merge_json_lines(source / name, target / name, progress)
+
+    if (source / 'lint.csv').exists():
+        df = pd.read_csv(source / 'lint.csv', parse_dates=['date'])
+        _update_csv(target / 'lint.csv', df, _lint_fixed_columns(df), progress)
+
+    if (source / 'test.csv').exists():
+        _update_csv(target / 'test.csv', pd.read_csv(source / 'test.csv', parse_dates=['date']), ['repo', 'date'],
+                    progress)
+
+    for name in ['git.csv', 'metadata.csv']:
+        if (source / name).exists():
+            _update_csv_by_repo(target / name, pd.read_csv(source / name), progress)
+
+    if (source / 'stargazers.csv').exists():
+        _update_stargazers_csv(target / 'stargazers.csv', pd.read_csv(source / 'stargazers.csv', parse_dates=['date']),
+                               progress)
 
 
 def _calculate_language_percentages(languages_edges, total_size):
@@ -327,7 +366,10 @@ def _flatten_dict(dictionary: dict, parent_key: str = '', prefix_separator: str
 
 
 def _update_csv(path: Path, new_df: pd.DataFrame, fixed_cols: list[str], progress):
-    """Loads existing CSV data and updates it with new data, or writes new data to a CSV file."""
+    """
+    Loads existing CSV data and updates it with new data, or writes new data to a CSV file. Rows of the same repository
+    and date are deduplicated, keeping the last, and the rows are sorted.
+    """
 
     lock = get_lock_for_file(path)
     with lock:
@@ -342,17 +384,154 @@ def _update_csv(path: Path, new_df: pd.DataFrame, fixed_cols: list[str], progres
         write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
         if not existing_df.empty:
             updated_df = pd.concat([existing_df, new_df], ignore_index=True)
-            updated_df = updated_df.drop_duplicates(subset=['repo', 'date'], keep='last')
         else:
             updated_df = new_df
+        updated_df = updated_df.drop_duplicates(subset=['repo', 'date'], keep='last')
 
         updated_df = _sort_rows_and_cols(updated_df, ['repo', 'date'], fixed_cols)
 
-        updated_df.to_csv(path, index=False, na_rep='nan')
+        _write_csv(updated_df, path, len(new_df), index=False, na_rep='nan')
+        progress.stop_task(write_task)
+        progress.remove_task(write_task)
+
+
+def _append_csv(path: Path, new_df: pd.DataFrame, fixed_cols: list[str], progress):
+    """
+    Appends new data to a CSV file, or writes new data to a CSV file, which is used for the batches of the snapshot
+    miners. The header is written once, and the rows are not deduplicated, which is done when data directories are
+    merged. Columns of the new data that the file does not have yet are added at its end.
+    """
+
+    lock = get_lock_for_file(path)
+    with lock:
+        write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
+        if not path.exists():
+            _write_csv(_sort_rows_and_cols(new_df, ['repo', 'date'], fixed_cols), path, len(new_df), index=False,
+                       na_rep='nan')
+        else:
+            columns = pd.read_csv(path, nrows=0).columns.tolist()
+            new_columns = sorted(col for col in new_df.columns if col not in columns)
+            if new_columns:
+                _add_csv_columns(path, new_columns)
+                columns += new_columns
+
+            new_df = new_df.reindex(columns=columns).sort_values(['repo', 'date'])
+            _write_csv(new_df, path, len(new_df), mode='a', header=False, index=False, na_rep='nan')
+        progress.stop_task(write_task)
+        progress.remove_task(write_task)
+
+
+def _add_csv_columns(path: Path, new_columns: list[str]):
+    """Adds empty columns at the end of a CSV file, rewriting it a chunk of rows at a time."""
+
+    temporary_path = path.with_name(f'{path.name}.tmp')
+    with telemetry.span('csv_write') as span, open(path, newline='') as source, \
+            open(temporary_path, 'w', newline='') as target:
+        reader, writer = csv.reader(source), csv.writer(target, lineterminator=os.linesep)
+        writer.writerow(next(reader) + new_columns)
+        padding = ['nan'] * len(new_columns)
+        while rows := list(islice(reader, CSV_CHUNK_ROWS)):
+            writer.writerows(row + padding for row in rows)
+            span.add('rows', len(rows))
+        target.flush()
+        span.add('bytes', os.fstat(target.fileno()).st_size)
+    os.replace(temporary_path, path)
+
+
+def _merge_json_lines(source: Path, target: Path, progress):
+    """
+    Merges a JSON Lines file of commit records into another one. Each commit appears once, with the last record of
+    the source replacing those of the target.
+    """
+
+    lock = get_lock_for_file(target)
+    with lock:
+        write_task = progress.add_task(f'Merging JSON: {util.absolute_data_path_to_relative(str(target))}', total=None)
+        paths = [path for path in [target, source] if path.exists()]
+        last_records = {}
+        for path_index, path in enumerate(paths):
+            with open(path, 'r') as file:
+                for line_index, line in enumerate(file):
+                    last_records[_json_line_key(line)] = (path_index, line_index)
+
+        temporary_path = target.with_name(f'{target.name}.tmp')
+        with telemetry.span('json_write') as span, open(temporary_path, 'w') as merged:
+            for path_index, path in enumerate(paths):
+                with open(path, 'r') as file:
+                    for line_index, line in enumerate(file):
+                        if last_records[_json_line_key(line)] == (path_index, line_index):
+                            merged.write(line)
+            merged.flush()
+            span.add('bytes', os.fstat(merged.fileno()).st_size)
+        os.replace(temporary_path, target)
+        progress.stop_task(write_task)
+        progress.remove_task(write_task)
+
+
+def _json_line_key(line: str) -> tuple[str, str]:
+    """Returns the repository and commit hash of a JSON Lines commit record."""
+
+    record = json.loads(line)
+    return record['repo'], record['commit_hash']
+
+
+def _update_csv_by_repo(path: Path, new_df: pd.DataFrame, progress):
+    """Updates a CSV file with one row per repository, replacing the rows of the repositories in the new data."""
+
+    lock = get_lock_for_file(path)
+    with lock:
+        if path.exists():
+            read_task = progress.add_task(f'Reading CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
+            existing_df = pd.read_csv(path)
+            progress.stop_task(read_task)
+            progress.remove_task(read_task)
+            updated_df = pd.concat([existing_df, new_df]).drop_duplicates('repo', keep='last')
+        else:
+            updated_df = new_df
+
+        write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
+        updated_df = _sort_rows_and_cols(updated_df, ['repo'], ['repo'])
+        _write_csv(updated_df, path, len(new_df), mode='w', index=False, na_rep='nan')
+        progress.stop_task(write_task)
+        progress.remove_task(write_task)
+
+
+def _update_stargazers_csv(path: Path, new_df: pd.DataFrame, progress):
+    """
+    Updates the stargazers CSV file, which has a column of cumulative stargazer counts per repository, replacing the
+    columns of the repositories in the new data.
+    """
+
+    lock = get_lock_for_file(path)
+    with lock:
+        if path.exists():
+            read_task = progress.add_task(f'Reading CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
+            existing_df = pd.read_csv(path, parse_dates=['date'])
+            progress.stop_task(read_task)
+            progress.remove_task(read_task)
+            updated_df = pd.concat([existing_df.set_index('date'), new_df.set_index('date')], axis=1)
+            updated_df = updated_df.loc[:, ~updated_df.columns.duplicated(keep='last')].sort_index()
+            updated_df = updated_df.ffill().fillna(0).astype(int).reset_index()
+        else:
+            updated_df = new_df
+
+        write_task = progress.add_task(f'Writing CSV: {util.absolute_data_path_to_relative(str(path))}', total=None)
+        _write_csv(_sort_cols(updated_df, ['date']), path, len(new_df), mode='w', index=False)
         progress.stop_task(write_task)
         progress.remove_task(write_task)
 
 
+def _write_csv(df: pd.DataFrame, path: Path, new_rows: int, **kwargs):
+    """Writes a DataFrame to a CSV file, recording the rows and bytes written."""
+
+    with telemetry.span('csv_write') as span:
+        start = path.stat().st_size if kwargs.get('mode') == 'a' else 0
+        df.to_csv(path, **kwargs)
+        span.add('rows', len(df))
+        span.add('new_rows', new_rows)
+        span.add('bytes', path.stat().st_size - start)
+
+
 def _sort_rows_and_cols(df: pd.DataFrame, sort_rows_by: list[str], fixed_cols: list[str]):
     """Sorts rows and columns in a DataFrame."""
     df = _sort_cols(df, fixed_cols)
@@ -360,6 +539,13 @@ def _sort_rows_and_cols(df: pd.DataFrame, sort_rows_by: list[str], fixed_cols: l
     return df
 
 
+def _lint_fixed_columns(df: pd.DataFrame) -> list[str]:
+    """Returns the columns of lint data that come first, the fixed columns and those with a fixed prefix."""
+
+    return [col for col in LINT_FIXED_COLUMNS if col in df.columns] + \
+        sorted([col for col in df.columns if any(col.startswith(prefix) for prefix in LINT_FIXED_COLUMN_PREFIXES)])
+
+
 def _sort_cols(df: pd.DataFrame, fixed_cols: list[str]):
     """Sorts columns in a DataFrame, with fixed columns first."""
     return df[fixed_cols + [col for col in sorted(df.columns) if col not in fixed_cols]]
@@ -1,12 +1,14 @@
 import json
+from functools import wraps
 from pathlib import Path
 
 from rich.progress import Progress
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from data_io.data_management import CustomEncoder
+from data_io.data_management import CustomEncoder, get_lock_for_file
 from data_io.database_models import Base, Git, Lint, LintCommit, Metadata, Repository, Stargazers, Test, TestCommit
+from utility import telemetry
 from utility.progress_bars import IterableProgressWrapper
 
 
@@ -16,12 +18,33 @@ def dumps(data):
     return json.dumps(data, cls=CustomEncoder)
 
 
+def _recorded(per_commit: bool = False):
+    """
+    Records a telemetry span for an insert method, counting the inserted rows. The insert holds the lock of the
+    database, as the miners that run at the same time can otherwise both add the row of a new repository.
+    """
+
+    def decorator(insert):
+        @wraps(insert)
+        def wrapper(self, data: dict, progress: Progress):
+            with telemetry.span('db_write') as span, get_lock_for_file(self.database_path):
+                insert(self, data, progress)
+                span.add('repos', len(data))
+                span.add('rows', sum(len(repo_info) for repo_info in data.values()) if per_commit else len(data))
+
+        return wrapper
+
+    return decorator
+
+
 class DatabaseManager:
     """ Class for managing the database. """
 
     def __init__(self, database_path: Path):
+        self.database_path = Path(database_path)
         self.engine = create_engine(f'sqlite:///{database_path}', echo=False, json_serializer=dumps)
-        Base.metadata.create_all(self.engine)
+        with get_lock_for_file(self.database_path):
+            Base.metadata.create_all(self.engine)
         self.session_maker = sessionmaker(bind=self.engine)
 
     def __enter__(self):
@@ -31,6 +54,7 @@ class DatabaseManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.session.close()
 
+    @_recorded()
     def insert_metadata(self, data: dict, progress: Progress):
         """ Inserts the metadata into the database. """
 
@@ -49,6 +73,7 @@ class DatabaseManager:
 
         self.session.commit()
 
+    @_recorded()
     def insert_stargazers_data(self, data: dict, progress: Progress):
         """ Inserts the stargazers data into the database. """
 
@@ -67,6 +92,7 @@ class DatabaseManager:
 
         self.session.commit()
 
+    @_recorded(per_commit=True)
     def insert_test_data(self, data: dict, progress: Progress):
         """ Inserts the test data into the database. """
 
@@ -80,9 +106,10 @@ class DatabaseManager:
                 repository = Repository(repo_name=repo_name)
                 self.session.add(repository)
 
-            test_entry = Test(repository_name=repo_name)
-
-            self.session.add(test_entry)
+            test_entry = self.session.query(Test).filter_by(repository_name=repo_name).first()
+            if not test_entry:
+                test_entry = Test(repository_name=repo_name)
+                self.session.add(test_entry)
             self.session.commit()
 
             for commit, commit_info in IterableProgressWrapper(repo_info.items(),
@@ -105,6 +132,7 @@ class DatabaseManager:
         self.session.add(test_commit)
         self.session.commit()
 
+    @_recorded(per_commit=True)
     def insert_lint_data(self, data: dict, progress: Progress):
         """Inserts the lint data into the database."""
 
@@ -118,8 +146,10 @@ class DatabaseManager:
                 repository = Repository(repo_name=repo_name)
                 self.session.add(repository)
 
-            lint_entry = Lint(repository_name=repo_name)
-            self.session.add(lint_entry)
+            lint_entry = self.session.query(Lint).filter_by(repository_name=repo_name).first()
+            if not lint_entry:
+                lint_entry = Lint(repository_name=repo_name)
+                self.session.add(lint_entry)
             self.session.commit()
 
             for commit, commit_info in IterableProgressWrapper(repo_info.items(),
@@ -142,6 +172,7 @@ class DatabaseManager:
         self.session.add(lint_commit)
         self.session.commit()
 
+    @_recorded()
     def insert_git_data(self, data: dict, progress: Progress):
         """ Inserts the git data into the database. """
 
@@ -159,3 +190,54 @@ class DatabaseManager:
             self.session.add(git_entry)
 
         self.session.commit()
+
+    def merge_database(self, source_path: Path, progress: Progress):
+        """
+        Merges the data of another database into this one, which combines the data of mining nodes into one dataset.
+        The repository data of the source replaces existing data, and lint and test commits that exist are skipped.
+        """
+
+        source_engine = create_engine(f'sqlite:///{source_path}', echo=False, json_serializer=dumps)
+        source_session = sessionmaker(bind=source_engine)()
+        try:
+            with telemetry.span('db_merge') as span:
+                for repository in source_session.query(Repository):
+                    if not self.session.query(Repository).filter_by(repo_name=repository.repo_name).first():
+                        self.session.add(Repository(repo_name=repository.repo_name))
+                self.session.commit()
+
+                for model in [Metadata, Stargazers, Git]:
+                    for entry in IterableProgressWrapper(source_session.query(model).all(),
+                                                         progress,
+                                                         description=f'Merging {model.__tablename__}',
+                                                         postfix='Repos'):
+                        self.session.query(model).filter_by(repository_name=entry.repository_name).delete()
+                        self.session.add(model(repository_name=entry.repository_name, data=entry.data))
+                        span.add('rows', 1)
+                self.session.commit()
+
+                for model, commit_model, parent in [(Lint, LintCommit, 'lint_id'), (Test, TestCommit, 'test_id')]:
+                    for entry in IterableProgressWrapper(source_session.query(model).all(),
+                                                         progress,
+                                                         description=f'Merging {model.__tablename__}',
+                                                         postfix='Repos'):
+                        target = self.session.query(model).filter_by(repository_name=entry.repository_name).first()
+                        if not target:
+                            target = model(repository_name=entry.repository_name)
+                            self.session.add(target)
+                            self.session.commit()
+
+                        existing = {commit_hash for commit_hash, in self.session.query(commit_model.hash)
+                                    .filter_by(**{parent: target.id})}
+                        columns = [column.name for column in commit_model.__table__.columns
+                                   if column.name not in ['id', parent]]
+                        for commit in source_session.query(commit_model).filter_by(**{parent: entry.id}):
+                            if commit.hash in existing:
+                                continue
+                            self.session.add(commit_model(**{parent: target.id},
+                                                          **{column: getattr(commit, column) for column in columns}))
+                            span.add('rows', 1)
+                        self.session.commit()
+        finally:
+            source_session.close()
+            source_engine.dispose()
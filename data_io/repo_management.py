@@ -1,4 +1,9 @@
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -6,17 +11,51 @@ from git import Repo, rmtree
 from pydriller import Repository
 from rich.progress import Progress
 
-from utility import util
+from data_io.data_management import get_lock_for_file
+from utility import config, telemetry, util
 from utility.progress_bars import GitProgress, RepositoryWithProgress
 
 
-def clone_repos(repo_directory: Path, repo_urls: list[str], progress: Progress) -> list[Path]:
+# File in the git directory recording the refs that the indexes of prepare_repo were written for.
+PREPARED_MARKER = 'pyciras-prepared.json'
+
+# Options passed to git clone for each clone strategy. Partial clones fetch missing objects on demand from the remote.
+CLONE_STRATEGIES: dict[str, list[str]] = {
+    'full': [],
+    'blobless': ['--filter=blob:none', '--single-branch', '--no-tags'],
+    'treeless': ['--filter=tree:0', '--single-branch', '--no-tags'],
+    'snapshot': ['--filter=blob:none', '--single-branch', '--no-tags', '--no-checkout'],
+}
+
+
+def select_clone_strategy(git: bool, lint: bool, test: bool) -> str | None:
+    """
+    Selects the clone strategy for the enabled miners, unless a strategy is set in config.CLONE_STRATEGY.
+
+    Snapshot miners get a blobless clone with a sparse checkout of config.SPARSE_CHECKOUT_PATTERNS, git history
+    mining gets a blobless clone and runs without any of these miners need no clone at all.
+    """
+
+    if not (git or lint or test):
+        return None
+
+    if config.CLONE_STRATEGY != 'auto':
+        return config.CLONE_STRATEGY
+
+    if lint or test:
+        return 'snapshot'
+
+    return 'blobless'
+
+
+def clone_repos(repo_directory: Path, repo_urls: list[str], progress: Progress, strategy: str = 'full') -> list[Path]:
     """
     Clones repositories from a list of URLs, and returns the paths.
     Args:
         repo_directory: The folder to clone the repositories to.
         repo_urls: A list of repository URLs.
         progress: The progress bar to show the progress of the cloning.
+        strategy: The clone strategy, one of CLONE_STRATEGIES.
 
     Returns:
         A list of repository paths.
@@ -25,7 +64,7 @@ def clone_repos(repo_directory: Path, repo_urls: list[str], progress: Progress)
     repo_paths = []
     for repo_url in repo_urls:
 
-        path = _clone_repo(repo_directory, repo_url, progress)
+        path = _clone_repo(repo_directory, repo_url, progress, strategy)
 
         if path is None:
             logging.error(f'Failed to download repository from {repo_url}')
@@ -35,13 +74,135 @@ def clone_repos(repo_directory: Path, repo_urls: list[str], progress: Progress)
     return repo_paths
 
 
-def _clone_repo(repos_directory: Path, repo_url: str, progress: Progress) -> Path | None:
+class ClonePrefetcher:
+    """
+    Clones repositories in a background thread, so that cloning overlaps with mining.
+
+    The prefetcher clones the repositories in order and keeps at most `capacity` of them on disk until they are
+    released, and stops cloning ahead while the cloned repositories use more than the disk budget. A repository that
+    is waited for is always cloned, so the budget can not stall the mining.
+    """
+
+    def __init__(self,
+                 repos_directory: Path,
+                 repo_urls: list[str],
+                 progress: Progress,
+                 capacity: int,
+                 disk_budget_mb: int | None = None,
+                 strategy: str = 'full'):
+        self.repos_directory = repos_directory
+        self.repo_urls = repo_urls
+        self.progress = progress
+        self.strategy = strategy
+        self.capacity = capacity
+        self.disk_budget = disk_budget_mb * 1024 * 1024 if disk_budget_mb is not None else None
+        self._condition = threading.Condition()
+        self._cloned: dict[str, Path | None] = {}
+        self._held_bytes: dict[str, int] = {}
+        self._requested: set[str] = set()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='ClonePrefetcher', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def wait_for(self, repo_urls: list[str]) -> list[Path]:
+        """Blocks until the repositories are cloned, and returns the paths of the successfully cloned ones."""
+
+        with self._condition:
+            self._requested.update(repo_urls)
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._stopped or all(url in self._cloned for url in repo_urls))
+            return [self._cloned[url] for url in repo_urls if self._cloned.get(url) is not None]
+
+    def release(self, repo_urls: list[str]):
+        """Marks repositories as done, so that their disk space is available for the next ones."""
+
+        with self._condition:
+            for url in repo_urls:
+                self._held_bytes.pop(url, None)
+                self._requested.discard(url)
+            self._condition.notify_all()
+
+    def _run(self):
+        """Clones the repositories in order, waiting while the look-ahead or the disk budget is exhausted."""
+
+        for url in self.repo_urls:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or self._has_capacity_for(url))
+                if self._stopped:
+                    return
+
+            path = _clone_repo(self.repos_directory, url, self.progress, self.strategy)
+            size = _directory_size(path) if path is not None else 0
+            logging.debug(f'Prefetched {url} ({util.kb_to_mb_gb(size // 1024)})')
+
+            with self._condition:
+                self._cloned[url] = path
+                self._held_bytes[url] = size
+                self._condition.notify_all()
+
+    def _has_capacity_for(self, url: str) -> bool:
+        """Checks if a repository can be cloned without exceeding the look-ahead or the disk budget."""
+
+        if url in self._requested or len(self._held_bytes) == 0:
+            return True
+
+        if len(self._held_bytes) >= self.capacity:
+            return False
+
+        return self.disk_budget is None or sum(self._held_bytes.values()) < self.disk_budget
+
+
+def _directory_size(path: Path) -> int:
+    """Returns the size in bytes of the files in a directory."""
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                size += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                continue
+
+    return size
+
+
+def sparse_checkout_patterns() -> list[str]:
+    """
+    Returns the non-cone sparse-checkout patterns of snapshot clones: config.SPARSE_CHECKOUT_PATTERNS, followed by
+    patterns that leave out the ignored directories at any depth if config.SPARSE_CHECKOUT_EXCLUDE_IGNORED is set.
+    """
+
+    patterns = list(config.SPARSE_CHECKOUT_PATTERNS)
+    if config.SPARSE_CHECKOUT_EXCLUDE_IGNORED:
+        names = [_escape_pattern(name) for name in util.generate_dir_name_variations(config.IGNORE_DIRECTORIES)]
+        prefixes = [f'{_escape_pattern(prefix)}*' for prefix in config.IGNORE_STARTSWITH]
+        patterns += [f'!**/{name}/**' for name in dict.fromkeys(names + prefixes)]
+    return patterns
+
+
+def _escape_pattern(name: str) -> str:
+    """Escapes the characters of a name that have a meaning in sparse-checkout patterns."""
+
+    return ''.join(f'\\{char}' if char in '*?[]\\!#' else char for char in name)
+
+
+def _clone_repo(repos_directory: Path, repo_url: str, progress: Progress, strategy: str = 'full') -> Path | None:
     """
     Clones a Git repository from a given URL to a given destination folder.
     Args:
         repo_url: The URL of the Git repository to clone.
         repos_directory: The folder where repos are stored.
         progress: The progress bar to show the progress of the cloning.
+        strategy: The clone strategy, one of CLONE_STRATEGIES.
     Returns:
         The repository path.
     """
@@ -56,13 +217,33 @@ def _clone_repo(repos_directory: Path, repo_url: str, progress: Progress) -> Pat
 
         if repo_path.exists():
             logging.info(f'\n{repo_name} already exists in {repos_directory}, skipping clone\n')
+            if config.PREPARE_REPOSITORIES and not config.USE_MIRROR_CACHE:
+                prepare_repo(repo_path)
             return repo_path
 
-        logging.info(f'\nCloning Git Repository {repo_url}')
+        logging.info(f'\nCloning Git Repository {repo_url} ({strategy})')
+
+        if config.USE_MIRROR_CACHE:
+            clone_url = str(update_mirror(repo_url, progress))
+            options = ['--shared'] + [option for option in CLONE_STRATEGIES[strategy]
+                                      if not option.startswith('--filter')]
+        else:
+            clone_url = repo_url
+            options = CLONE_STRATEGIES[strategy]
+
+        with telemetry.span('clone', repo_name) as span:
+            repo = Repo.clone_from(clone_url,
+                                   repo_path,
+                                   progress=GitProgress(progress, description=repo_name),
+                                   multi_options=options)
 
-        Repo.clone_from(repo_url,
-                        repo_path,
-                        progress=GitProgress(progress, description=repo_name))
+            if strategy == 'snapshot':
+                repo.git.sparse_checkout('set', '--no-cone', *sparse_checkout_patterns())
+                repo.git.checkout()
+            span.add('repos')
+
+        if config.PREPARE_REPOSITORIES and not config.USE_MIRROR_CACHE:
+            prepare_repo(repo_path)
 
         logging.info(f'\nFinished cloning {repo_url}')
 
@@ -73,6 +254,95 @@ def _clone_repo(repos_directory: Path, repo_url: str, progress: Progress) -> Pat
         return None
 
 
+def update_mirror(repo_url: str, progress: Progress) -> Path:
+    """
+    Creates or refreshes the bare mirror of a repository in config.MIRROR_FOLDER, and returns its path.
+
+    Existing mirrors are updated with git fetch --prune, so only new objects are transferred. A new mirror borrows the
+    objects of a mirror with the same repository name, which is usually a fork of the same upstream.
+    """
+
+    repo_name = util.get_repo_name_from_url_or_path(repo_url)
+    mirror_path = _get_mirror_path(repo_url)
+
+    with get_lock_for_file(config.MIRROR_FOLDER / repo_name):
+        if mirror_path.exists():
+            logging.info(f'\nFetching {repo_url} into mirror {mirror_path.name}')
+            Repo(mirror_path).git.fetch('--prune', 'origin')
+            if config.PREPARE_REPOSITORIES:
+                prepare_repo(mirror_path)
+            return mirror_path
+
+        config.MIRROR_FOLDER.mkdir(parents=True, exist_ok=True)
+        options = ['--mirror']
+        fork_mirrors = [path for path in config.MIRROR_FOLDER.glob(f'*__{repo_name}.git') if path != mirror_path]
+        if fork_mirrors:
+            logging.info(f'\nMirror of {repo_url} will share objects with {fork_mirrors[0].name}')
+            options.append(f'--reference-if-able={fork_mirrors[0]}')
+
+        logging.info(f'\nCreating mirror of {repo_url}')
+        mirror = Repo.clone_from(repo_url,
+                                 mirror_path,
+                                 progress=GitProgress(progress, description=f'Mirror {repo_name}'),
+                                 multi_options=options)
+
+        # Other mirrors may borrow objects from this one, so unreachable objects must never be pruned
+        with mirror.config_writer() as writer:
+            writer.set_value('gc', 'pruneExpire', 'never')
+
+        if config.PREPARE_REPOSITORIES:
+            prepare_repo(mirror_path)
+
+    return mirror_path
+
+
+def prepare_repo(repo_path: Path) -> dict[str, float] | None:
+    """
+    Writes the indexes that speed up history walks in a repository: a commit-graph with changed-path Bloom filters,
+    used by rev-list and path-limited logs, and a multi-pack-index with a reachability bitmap.
+
+    The step is skipped if the indexes were written for the current refs. Objects borrowed from a mirror are not
+    repacked into the clone. Bare repositories, the mirrors, keep their unreachable objects in the new pack, as the
+    mirrors of forks and the working clones that borrow from them may still refer to them. Returns the duration in
+    seconds of each step, or None if skipped.
+    """
+
+    repo = Repo(repo_path)
+    marker_path = Path(repo.git_dir) / PREPARED_MARKER
+    refs = repo.git.for_each_ref('--format=%(objectname) %(refname)')
+    fingerprint = hashlib.sha1(refs.encode()).hexdigest()
+
+    if marker_path.exists() and json.loads(marker_path.read_text()).get('fingerprint') == fingerprint:
+        logging.debug(f'Indexes of {repo_path.name} are up to date, skipping prepare')
+        return None
+
+    timings = {}
+    with telemetry.span('prepare', repo_path.name) as span:
+        start_time = time.time()
+        repo.git.commit_graph('write', '--reachable', '--changed-paths')
+        timings['commit_graph'] = time.time() - start_time
+
+        start_time = time.time()
+        keep_unreachable = ['--keep-unreachable'] if repo.bare else []
+        repo.git.repack('-a', '-d', '-l', '-b', '--write-midx', *keep_unreachable)
+        timings['repack'] = time.time() - start_time
+        span.add('repos')
+
+    marker_path.write_text(json.dumps({'fingerprint': fingerprint, 'timings': timings}))
+    logging.info(f'\nPrepared {repo_path.name}: commit-graph {timings["commit_graph"]:.2f}s, '
+                 f'repack {timings["repack"]:.2f}s')
+
+    return timings
+
+
+def _get_mirror_path(repo_url: str) -> Path:
+    """Returns the path to the mirror of a repository, named by owner and name to keep forks apart."""
+
+    owner = util.get_repo_owner_from_url(repo_url)
+    name = util.get_repo_name_from_url_or_path(repo_url)
+    return config.MIRROR_FOLDER / f'{owner}__{name}.git'
+
+
 def get_repo_paths_and_commit_metadata(repos_directory: Path,
                                        repo_paths: list[Path],
                                        progress: Progress) -> dict[str, list[tuple[str, datetime]]]:
@@ -82,14 +352,41 @@ def get_repo_paths_and_commit_metadata(repos_directory: Path,
     repos_with_commit_hashes_and_dates = {}
     for repo_path, repo in repos.items():
         hashes_and_dates = []
-        for commit in repo.traverse_commits():
-            hashes_and_dates.append((commit.hash, commit.committer_date))
+        with telemetry.span('commit_enumeration', util.get_repo_name_from_url_or_path(repo_path)) as span:
+            for commit in repo.traverse_commits():
+                hashes_and_dates.append((commit.hash, commit.committer_date))
+            span.add('commits', len(hashes_and_dates))
 
         repos_with_commit_hashes_and_dates[repo_path] = hashes_and_dates
 
     return repos_with_commit_hashes_and_dates
 
 
+def sample_commits(repos_and_commit_metadata: dict[str, list[tuple[str, datetime]]],
+                   every: int = 1,
+                   max_commits: int | None = None) -> dict[str, list[tuple[str, datetime]]]:
+    """
+    Samples the commits of each repository: every nth commit counting back from the latest, and then at most
+    max_commits of those, evenly spaced. The latest commit is always kept, and the order is preserved.
+    """
+
+    sampled = {}
+    for repo_path, commit_metadata in repos_and_commit_metadata.items():
+        commits = commit_metadata[::-1][::every][::-1]
+        if max_commits is not None and len(commits) > max_commits:
+            if max_commits == 1:
+                commits = commits[-1:]
+            else:
+                step = (len(commits) - 1) / (max_commits - 1)
+                commits = [commits[round(index * step)] for index in range(max_commits)]
+
+        if len(commits) < len(commit_metadata):
+            logging.info(f'Sampled {len(commits)} of {len(commit_metadata)} commits of {repo_path}')
+        sampled[repo_path] = commits
+
+    return sampled
+
+
 def load_repos(repos_directory: Path,
                repos: list[Path | str],
                progress: Progress) -> (dict[str, RepositoryWithProgress]):
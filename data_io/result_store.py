@@ -0,0 +1,178 @@
+"""
+This module stores the lint and test results of commits by the tree of their Python files, so that a commit whose tree
+was mined before is not checked out and mined again.
+
+Many commits have the tree of another commit: merges that change no files, reverts, commits that only change files
+that are not mined, and the shared history of forks. A result is stored by the SHA of the Python files of the tree of
+its commit, after the filter of file_index, together with the name of the repository, which the results refer to, and
+a fingerprint of the settings and versions that the miner depends on. The store is an SQLite database, which may be
+shared between runs and processes.
+"""
+
+import hashlib
+import logging
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+from git import Repo
+
+from utility import config, file_index
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# The version of the stored results, which is part of every fingerprint. Increase it when the miners change their
+# results, so that the results stored by a previous version are not used.
+RESULT_STORE_VERSION = 2
+# The seconds a connection waits for the lock of another connection that writes to the store.
+LOCK_TIMEOUT_SECONDS = 60
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS results (
+        miner TEXT NOT NULL,
+        repository TEXT NOT NULL,
+        tree BLOB NOT NULL,
+        fingerprint TEXT NOT NULL,
+        data BLOB NOT NULL,
+        stored_at REAL NOT NULL,
+        PRIMARY KEY (miner, repository, tree, fingerprint)
+    ) WITHOUT ROWID''',
+]
+
+_lock = threading.Lock()
+_store_path: Path | None = None
+_totals: dict[str, dict[str, int]] = {}
+
+
+def configure(store_path: Path | None):
+    """Sets the database that results are stored in, or disables the store if None, and resets the hit counts."""
+
+    global _store_path, _totals
+
+    with _lock:
+        _store_path = store_path
+        _totals = {}
+        if store_path is not None:
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            with _transaction(store_path) as connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+
+
+def tree_key(repo: Repo, commit: str) -> bytes | None:
+    """Returns the key of the Python files of the tree of a commit, or None if the store is disabled."""
+
+    if _store_path is None:
+        return None
+
+    tree = hashlib.sha1()
+    for path, binsha in file_index.get_python_blobs_from_commit(repo, commit):
+        tree.update(path.encode('utf-8', 'surrogateescape') + b'\0' + binsha)
+    return tree.digest()
+
+
+def fingerprint(*settings: any) -> str:
+    """
+    Returns the fingerprint of the settings of a miner, together with those that all miners depend on: the Python
+    version, the filter of the Python files and the limits of the file guards.
+    """
+
+    shared = (RESULT_STORE_VERSION, sys.version_info[:2], config.IGNORE_DIRECTORIES, config.IGNORE_STARTSWITH,
+              config.MAX_FILE_SIZE_KB, config.MAX_LINE_LENGTH, config.GENERATED_FILE_MARKERS)
+    return hashlib.sha1(repr((shared, settings)).encode()).hexdigest()
+
+
+def get(miner: str, repository: str, tree: bytes | None, settings_fingerprint: str) -> any:
+    """Returns the stored result of a tree, or None if there is none, and counts the lookup as a hit or a miss."""
+
+    if tree is None:
+        return None
+
+    with _lock:
+        store_path = _store_path
+    row = None
+    if store_path is not None:
+        try:
+            with _transaction(store_path) as connection:
+                row = connection.execute('SELECT data FROM results WHERE miner = ? AND repository = ? AND tree = ? '
+                                         'AND fingerprint = ?',
+                                         (miner, repository, tree, settings_fingerprint)).fetchone()
+        except sqlite3.Error:
+            logging.error(f'Could not read the result store {store_path}', exc_info=True)
+
+    data = None
+    if row is not None:
+        try:
+            data = pickle.loads(zlib.decompress(row[0]))
+        except Exception:
+            logging.error(f'{repository}: could not load the stored {miner} result, mining it again', exc_info=True)
+
+    with _lock:
+        totals = _totals.setdefault(miner, {'hits': 0, 'misses': 0})
+        totals['hits' if data is not None else 'misses'] += 1
+    return data
+
+
+def put(miner: str, repository: str, tree: bytes | None, settings_fingerprint: str, data: any):
+    """Stores the result of a tree, if the store is enabled."""
+
+    if tree is None:
+        return
+
+    with _lock:
+        store_path = _store_path
+    if store_path is None:
+        return
+
+    try:
+        blob = zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        with _transaction(store_path) as connection:
+            connection.execute('INSERT OR IGNORE INTO results (miner, repository, tree, fingerprint, data, stored_at) '
+                               'VALUES (?, ?, ?, ?, ?, ?)',
+                               (miner, repository, tree, settings_fingerprint, blob, time.time()))
+    except (sqlite3.Error, pickle.PicklingError):
+        logging.error(f'Could not write to the result store {store_path}', exc_info=True)
+
+
+def summary() -> dict[str, dict[str, int]]:
+    """Returns the hits and misses of each miner since the last configure."""
+
+    with _lock:
+        return {miner: dict(totals) for miner, totals in _totals.items()}
+
+
+def log_summary(console: 'Console | None' = None):
+    """Logs the hit rate of each miner, and prints it to the console if given."""
+
+    totals = summary()
+    if not totals:
+        return
+
+    rates = []
+    for miner, counts in totals.items():
+        lookups = counts['hits'] + counts['misses']
+        rates.append(f'{miner} {counts["hits"]} of {lookups} commits ({counts["hits"] / lookups * 100:.1f}%)')
+
+    message = f'Result store hits: {", ".join(rates)}'
+    logging.info(f'\n{message}')
+    if console is not None:
+        console.print(message)
+
+
+@contextmanager
+def _transaction(store_path: Path) -> Iterator[sqlite3.Connection]:
+    """Opens a connection to the store with a transaction, which is committed if the context exits without an error."""
+
+    connection = sqlite3.connect(store_path, timeout=LOCK_TIMEOUT_SECONDS)
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
@@ -0,0 +1,256 @@
+"""
+This module provides a work queue of repositories shared by mining nodes, so that several hosts can mine one list of
+repositories without splitting it up front.
+
+The queue is an SQLite database, which can be kept on a filesystem shared by the nodes. A node claims repositories
+with a lease, keeps the lease alive with heartbeats while it mines them, and marks them as done when they are mined.
+The lease of a node that stops sending heartbeats expires, and its repositories are claimed again by other nodes.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from utility import config
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+STATES = [PENDING, LEASED, DONE, FAILED]
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS repositories (
+        url TEXT PRIMARY KEY,
+        state TEXT NOT NULL DEFAULT 'pending',
+        node TEXT,
+        lease_expires_at REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at REAL
+    )''',
+    'CREATE INDEX IF NOT EXISTS repositories_state ON repositories (state, lease_expires_at)',
+    '''CREATE TABLE IF NOT EXISTS nodes (
+        node TEXT PRIMARY KEY,
+        data_directory TEXT NOT NULL,
+        registered_at REAL,
+        last_seen_at REAL
+    )''',
+]
+
+
+def default_node_name() -> str:
+    """Returns a node name that is unique per process, the host name and the process id."""
+
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+class WorkQueue:
+    """A queue of repository URLs with leases, stored in an SQLite database."""
+
+    def __init__(self, path: Path, lease_seconds: float | None = None, max_attempts: int | None = None):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds if lease_seconds is not None else config.QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts if max_attempts is not None else config.QUEUE_MAX_ATTEMPTS
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Opens a connection with a write transaction, which locks the database until it is committed. A connection per
+        transaction lets threads and processes share the queue.
+        """
+
+        connection = sqlite3.connect(self.path, timeout=config.QUEUE_LOCK_TIMEOUT_SECONDS, isolation_level=None)
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        finally:
+            connection.close()
+
+    def add(self, repo_urls: list[str]) -> int:
+        """Adds repositories to the queue in the given order, skipping those already in it. Returns the number added."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany('INSERT OR IGNORE INTO repositories (url, updated_at) VALUES (?, ?)',
+                                   [(url, now) for url in repo_urls])
+            return connection.total_changes - before
+
+    def claim(self, node: str, count: int = 1) -> list[str]:
+        """Leases up to count pending repositories to a node, after requeuing the repositories of expired leases."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            self._requeue_expired(connection, now)
+            urls = [url for url, in connection.execute('SELECT url FROM repositories WHERE state = ? '
+                                                       'ORDER BY rowid LIMIT ?', (PENDING, count))]
+            connection.executemany('UPDATE repositories SET state = ?, node = ?, lease_expires_at = ?, '
+                                   'attempts = attempts + 1, updated_at = ? WHERE url = ?',
+                                   [(LEASED, node, now + self.lease_seconds, now, url) for url in urls])
+            connection.execute('UPDATE nodes SET last_seen_at = ? WHERE node = ?', (now, node))
+
+        if urls:
+            logging.info(f'\n{node} claimed {urls}')
+        return urls
+
+    def heartbeat(self, node: str, repo_urls: list[str]) -> list[str]:
+        """Extends the leases of a node on the given repositories. Returns the repositories it still holds."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany('UPDATE repositories SET lease_expires_at = ?, updated_at = ? '
+                                   'WHERE url = ? AND node = ? AND state = ?',
+                                   [(now + self.lease_seconds, now, url, node, LEASED) for url in repo_urls])
+            connection.execute('UPDATE nodes SET last_seen_at = ? WHERE node = ?', (now, node))
+            return self._held(connection, node, repo_urls)
+
+    def complete(self, node: str, repo_urls: list[str]):
+        """
+        Marks repositories as done by a node. A repository whose lease expired is marked as done as well, as its data
+        has been written, even if another node has claimed it since.
+        """
+
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany('UPDATE repositories SET state = ?, node = ?, lease_expires_at = NULL, '
+                                   'error = NULL, updated_at = ? WHERE url = ? AND state != ?',
+                                   [(DONE, node, now, url, DONE) for url in repo_urls])
+
+    def fail(self, node: str, repo_urls: list[str], error: str):
+        """
+        Returns the repositories of a node that could not be mined to the queue, or marks them as failed once they
+        have been attempted max_attempts times.
+        """
+
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany('UPDATE repositories '
+                                   'SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, node = NULL, '
+                                   'lease_expires_at = NULL, error = ?, updated_at = ? '
+                                   'WHERE url = ? AND node = ? AND state = ?',
+                                   [(self.max_attempts, FAILED, PENDING, error, now, url, node, LEASED)
+                                    for url in repo_urls])
+
+    def release(self, node: str, repo_urls: list[str]):
+        """Returns the leased repositories of a node to the queue without counting the attempt, used on shutdown."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany('UPDATE repositories SET state = ?, node = NULL, lease_expires_at = NULL, '
+                                   'attempts = MAX(attempts - 1, 0), updated_at = ? '
+                                   'WHERE url = ? AND node = ? AND state = ?',
+                                   [(PENDING, now, url, node, LEASED) for url in repo_urls])
+
+    def requeue_expired(self) -> int:
+        """Returns the repositories of expired leases to the queue. Returns the number of requeued repositories."""
+
+        with self._transaction() as connection:
+            return self._requeue_expired(connection, time.time())
+
+    def requeue_failed(self) -> int:
+        """Returns the failed repositories to the queue with their attempts reset. Returns the number requeued."""
+
+        with self._transaction() as connection:
+            return connection.execute('UPDATE repositories SET state = ?, attempts = 0, updated_at = ? WHERE state = ?',
+                                      (PENDING, time.time(), FAILED)).rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Returns the number of repositories in each state."""
+
+        with self._transaction() as connection:
+            counts = dict(connection.execute('SELECT state, COUNT(*) FROM repositories GROUP BY state'))
+        return {state: counts.get(state, 0) for state in STATES}
+
+    def is_drained(self) -> bool:
+        """Returns true if no repositories are pending or leased."""
+
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def register_node(self, node: str, data_directory: Path):
+        """Records the data directory that a node writes its data to, which the merge step reads."""
+
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute('INSERT INTO nodes (node, data_directory, registered_at, last_seen_at) '
+                               'VALUES (?, ?, ?, ?) ON CONFLICT (node) DO UPDATE '
+                               'SET data_directory = excluded.data_directory, last_seen_at = excluded.last_seen_at',
+                               (node, str(Path(data_directory).resolve()), now, now))
+
+    def nodes(self) -> dict[str, Path]:
+        """Returns the data directories of the registered nodes, by node name."""
+
+        with self._transaction() as connection:
+            return {node: Path(data_directory) for node, data_directory
+                    in connection.execute('SELECT node, data_directory FROM nodes ORDER BY registered_at')}
+
+    def _requeue_expired(self, connection: sqlite3.Connection, now: float) -> int:
+        """Requeues the repositories of expired leases, or marks them as failed after max_attempts attempts."""
+
+        expired = connection.execute('SELECT url, node FROM repositories WHERE state = ? AND lease_expires_at < ?',
+                                     (LEASED, now)).fetchall()
+        for url, node in expired:
+            logging.warning(f'\nThe lease of {node} on {url} expired, requeuing it')
+
+        connection.execute('UPDATE repositories SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, node = NULL, '
+                           'lease_expires_at = NULL, error = ?, updated_at = ? '
+                           'WHERE state = ? AND lease_expires_at < ?',
+                           (self.max_attempts, FAILED, PENDING, 'lease expired', now, LEASED, now))
+        return len(expired)
+
+    @staticmethod
+    def _held(connection: sqlite3.Connection, node: str, repo_urls: list[str]) -> list[str]:
+        """Returns the repositories that a node holds a lease on."""
+
+        return [url for url in repo_urls
+                if connection.execute('SELECT 1 FROM repositories WHERE url = ? AND node = ? AND state = ?',
+                                      (url, node, LEASED)).fetchone() is not None]
+
+
+class Heartbeat:
+    """Context manager that keeps the leases of a node alive from a background thread while the node mines."""
+
+    def __init__(self, queue: WorkQueue, node: str, repo_urls: list[str], interval: float | None = None):
+        self.queue = queue
+        self.node = node
+        self.repo_urls = repo_urls
+        self.interval = interval if interval is not None else config.QUEUE_HEARTBEAT_SECONDS
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f'heartbeat-{node}', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                held = self.queue.heartbeat(self.node, self.repo_urls)
+            except sqlite3.Error:
+                logging.warning(f'\nHeartbeat of {self.node} failed', exc_info=True)
+                continue
+
+            lost = [url for url in self.repo_urls if url not in held]
+            if lost:
+                logging.warning(f'\n{self.node} lost its lease on {lost}, another node may mine them again')
+                self.repo_urls = held
@@ -0,0 +1,103 @@
+"""
+This module provides the temporary git worktrees that the snapshot miners check out commits in, on a RAM-backed file
+system such as /dev/shm if config.SNAPSHOT_WORKTREE_FOLDER is set.
+
+The lint and test miners reset, clean and check out every commit they mine, which writes the files of each commit to
+disk. A worktree in SNAPSHOT_WORKTREE_FOLDER shares the objects and the sparse checkout of its repository and keeps
+those writes in memory. Repositories whose mined Python files are larger than config.SNAPSHOT_WORKTREE_LIMIT_MB are
+mined in place. The worktrees are removed when the mining of their repository ends, and those left by a process that
+crashed are removed by the next process that creates a worktree.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from git import Repo
+
+from utility import config, file_index, util
+
+# The prefix of the temporary directories of the worktrees, followed by the ID of the process that created them.
+WORKTREE_PREFIX = 'pyciras-'
+
+
+@contextmanager
+def snapshot_worktree(repo_path: Path) -> Iterator[Path]:
+    """
+    Yields the path of the directory to check out the commits of a repository in: a temporary worktree with the name
+    of the repository in config.SNAPSHOT_WORKTREE_FOLDER if it is set and the Python files of the repository fit in
+    config.SNAPSHOT_WORKTREE_LIMIT_MB, otherwise the repository itself.
+    """
+
+    if config.SNAPSHOT_WORKTREE_FOLDER is None:
+        yield repo_path
+        return
+
+    repo_name = util.get_repo_name_from_url_or_path(repo_path)
+    size_mb = _checkout_size(repo_path) / (1024 * 1024)
+    if size_mb > config.SNAPSHOT_WORKTREE_LIMIT_MB:
+        logging.info(f'{repo_name}: the {size_mb:.0f} MB of Python files exceed the worktree limit, mining in place')
+        yield repo_path
+        return
+
+    folder = Path(config.SNAPSHOT_WORKTREE_FOLDER)
+    folder.mkdir(parents=True, exist_ok=True)
+    remove_stale_worktrees(folder)
+
+    directory = Path(tempfile.mkdtemp(prefix=f'{WORKTREE_PREFIX}{os.getpid()}-', dir=folder))
+    # The worktree has the name of the repository, which Pylint names the modules of a repository after.
+    worktree_path = directory / repo_path.name
+    repo = Repo(repo_path)
+    try:
+        repo.git.worktree('prune')
+        repo.git.worktree('add', '--detach', '--no-checkout', str(worktree_path))
+        if repo.git.config('--get', 'core.sparseCheckout', with_exceptions=False) == 'true':
+            patterns = repo.git.sparse_checkout('list').splitlines()
+            Repo(worktree_path).git.sparse_checkout('set', '--no-cone', *patterns)
+        logging.info(f'{repo_name}: mining in the worktree {worktree_path}')
+        yield worktree_path
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        repo.git.worktree('prune')
+        repo.close()
+
+
+def remove_stale_worktrees(folder: Path):
+    """Removes the worktree directories in a folder that were created by processes that are no longer running."""
+
+    for directory in folder.glob(f'{WORKTREE_PREFIX}*'):
+        pid = directory.name.removeprefix(WORKTREE_PREFIX).split('-')[0]
+        if pid.isdigit() and not _is_running(int(pid)):
+            logging.info(f'Removing the stale worktree {directory}')
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _is_running(pid: int) -> bool:
+    """Returns whether a process with the given ID is running. Always true on Windows, where os.kill ends processes."""
+
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _checkout_size(repo_path: Path) -> int:
+    """
+    Returns the size in bytes of the Python files that the miners check out of the latest commit of a repository, the
+    files of file_index, by the sizes of their blobs.
+    """
+
+    repo = Repo(repo_path)
+    try:
+        return sum(repo.odb.info(binsha).size for _, binsha in file_index.get_python_blobs_from_commit(repo, 'HEAD'))
+    finally:
+        repo.close()
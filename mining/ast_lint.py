@@ -0,0 +1,629 @@
+"""
+This module contains the AST lint backend, a fast alternative to Pylint for large-scale runs.
+
+Pylint infers the types of the code it lints, which makes it the most expensive step of mining, while the analyses use
+only a part of its results: the message category totals, the McCabe complexity, the undocumented and badly named
+definitions and the statement counts. This backend computes those from the syntax tree of each file with the ast module
+and returns the same messages and stats keys as Pylint, following the settings of config.PYLINT_CONFIG.
+
+Where Pylint would infer, the backend assumes the common case. For example, methods are checked even if they override
+a documented method, and a module level name is a constant if a literal is assigned to it. Duplicate code and the
+other Pylint checks are not reported, so the totals are lower than those of Pylint.
+"""
+
+import ast
+import configparser
+import functools
+import logging
+import os
+import re
+import sys
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple, Pattern
+
+import astroid
+import mccabe
+from astroid import nodes
+from git import Repo
+from pylint.checkers.base.name_checker.checker import DEFAULT_PATTERNS
+from pylint.checkers.base.name_checker.naming_style import DEFAULT_NAMING_STYLES, NAMING_STYLES
+from pylint.constants import HUMAN_READABLE_TYPES, MSG_TYPES
+from pylint.interfaces import HIGH, INFERENCE, Confidence
+from pylint.message import Message
+from pylint.typing import MessageLocationTuple
+from pylint.utils import LinterStats
+
+from mining.lint_messages import LintMessages, LintTables
+from utility import config, file_index, util
+
+# The nodes that Pylint counts as statements, docstrings excepted.
+STATEMENTS: tuple[type, ...] = (ast.stmt, ast.ExceptHandler)
+# The messages of the checks of this backend, as message ID, symbol and message template.
+MESSAGES: dict[str, tuple[str, str]] = {
+    'C0103': ('invalid-name', '%s name "%s" doesn\'t conform to %s'),
+    'C0104': ('disallowed-name', 'Disallowed name "%s"'),
+    'C0112': ('empty-docstring', 'Empty %s docstring'),
+    'C0114': ('missing-module-docstring', 'Missing module docstring'),
+    'C0115': ('missing-class-docstring', 'Missing class docstring'),
+    'C0116': ('missing-function-docstring', 'Missing function or method docstring'),
+    'E0001': ('syntax-error', 'Parsing failed: \'%s\''),
+    'R1260': ('too-complex', '%s is too complex. The McCabe rating is %d'),
+}
+MISSING_DOCSTRING_IDS: dict[str, str] = {'module': 'C0114', 'class': 'C0115', 'function': 'C0116', 'method': 'C0116'}
+ENUM_BASES: set[str] = {'Enum', 'IntEnum', 'StrEnum', 'Flag', 'IntFlag'}
+PROPERTY_DECORATORS: set[str] = {'property', 'abstractproperty'}
+ACCESSOR_DECORATORS: set[str] = {'setter', 'deleter'}
+
+
+class Settings(NamedTuple):
+    """The Pylint settings that the checks of this backend use."""
+
+    good_names: set[str]
+    good_names_rgxs: list[Pattern[str]]
+    bad_names: set[str]
+    bad_names_rgxs: list[Pattern[str]]
+    naming: dict[str, tuple[Pattern[str], str]]
+    no_docstring_rgx: Pattern[str]
+    docstring_min_length: int
+    max_complexity: int
+    evaluation: str
+
+
+@functools.lru_cache(maxsize=None)
+def read_settings(rcfile: str) -> Settings:
+    """Reads the settings from a Pylint configuration file, using the defaults of Pylint for those it does not set."""
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(rcfile)
+    options = {option: value for section in parser.sections() for option, value in parser.items(section)}
+
+    def names(option: str, default: str) -> list[str]:
+        return [name.strip() for name in options.get(option, default).split(',') if name.strip()]
+
+    naming = {}
+    for name_type in [*DEFAULT_NAMING_STYLES, *DEFAULT_PATTERNS]:
+        option = name_type.replace('_', '-')
+        if name_type in DEFAULT_NAMING_STYLES:
+            style = options.get(f'{option}-naming-style', DEFAULT_NAMING_STYLES[name_type])
+            pattern = NAMING_STYLES[style].get_regex(name_type)
+        else:
+            style = 'predefined'
+            pattern = DEFAULT_PATTERNS[name_type]
+        hint = f'{style} naming style'
+        if options.get(f'{option}-rgx'):
+            pattern = re.compile(options[f'{option}-rgx'])
+            hint = f'{pattern.pattern!r} pattern'
+        naming[name_type] = (pattern, hint)
+
+    return Settings(good_names=set(names('good-names', 'i,j,k,ex,Run,_')),
+                    good_names_rgxs=[re.compile(rgx) for rgx in names('good-names-rgxs', '')],
+                    bad_names=set(names('bad-names', 'foo,bar,baz,toto,tutu,tata')),
+                    bad_names_rgxs=[re.compile(rgx) for rgx in names('bad-names-rgxs', '')],
+                    naming=naming,
+                    no_docstring_rgx=re.compile(options.get('no-docstring-rgx', '^_')),
+                    docstring_min_length=int(options.get('docstring-min-length', -1)),
+                    max_complexity=int(options.get('max-complexity', 10)),
+                    evaluation=options.get('evaluation', 'max(0, 0 if fatal else 10.0 - ((float(5 * error + warning + '
+                                                         'refactor + convention) / statement) * 10))'))
+
+
+def lint_repository(repository_path: Path, commit: str, tables: LintTables | None = None) -> dict[str, any] | None:
+    """
+    Lints the Python files of a repository, see the lint backends of lint_mining. The messages are interned in the given
+    tables, which are shared by the commits of a repository.
+    """
+
+    settings = read_settings(str(config.PYLINT_CONFIG))
+    stats = LinterStats()
+    # Pylint also lists the sources of its configuration as modules.
+    for module in [str(config.PYLINT_CONFIG), 'Command line', 'Command line or configuration file']:
+        stats.init_single_module(module)
+    messages = []
+    complexities = []
+
+    for file in _python_files(repository_path, commit):
+        linter = ModuleLinter(settings, stats, _module_name(repository_path, file), str(file))
+        linter.lint()
+        messages += linter.messages
+        complexities += linter.complexities
+
+    if stats.statement > 0:
+        stats.global_note = eval(settings.evaluation, {}, {'fatal': stats.fatal, 'error': stats.error,
+                                                           'warning': stats.warning, 'refactor': stats.refactor,
+                                                           'convention': stats.convention, 'info': stats.info,
+                                                           'statement': stats.statement})
+
+    repo_name = util.get_repo_name_from_url_or_path(str(repository_path))
+    avg_mccabe_complexity = sum(complexities) / len(complexities) if complexities else 0
+
+    logging.info(f"{commit}: {len(messages)} AST lint messages\n")
+
+    stats_dict = {str(attr): getattr(stats, attr) for attr in dir(stats) if
+                  not attr.startswith('__') and not callable(getattr(stats, attr))}
+    stats_dict['avg_mccabe_complexity'] = avg_mccabe_complexity
+    stats_dict['repository_name'] = repo_name
+
+    return {
+        'messages': LintMessages.from_messages(messages, tables if tables is not None else LintTables(), repo_name,
+                                               avg_mccabe_complexity),
+        'stats': stats_dict
+    }
+
+
+def _python_files(repository_path: Path, commit: str) -> list[Path]:
+    """
+    Returns the Python files of a commit of a repository that Pylint lints, without the directories it is told to
+    ignore. If the repository is a package, Pylint only lints its subpackages. Otherwise Pylint fails to load the
+    repository, and all its Python files are linted instead.
+    """
+
+    # The files that the guards of the lint miner skip are removed from the checkout.
+    with Repo(repository_path) as repo:
+        files = [PurePosixPath(file) for file in file_index.get_python_files_from_commit(repo, commit)
+                 if not file.rpartition('/')[2].startswith('.#') and os.path.lexists(repository_path / file)]
+
+    packages = {file.parent for file in files if file.name == '__init__.py'}
+    if PurePosixPath('.') in packages:
+        files = [file for file in files if all(parent in packages for parent in file.parents)]
+    return [repository_path / file for file in files]
+
+
+def _module_name(repository_path: Path, file: Path) -> str:
+    """Returns the module name that Pylint gives a file, with the repository directory as its top-level package."""
+
+    if file == repository_path / '__init__.py':
+        return repository_path.name
+    return '.'.join(file.relative_to(repository_path.parent).with_suffix('').parts)
+
+
+class _Frame:
+    """A module, class or function that names are defined in, with what the checks need to know about it."""
+
+    def __init__(self, node: ast.AST, self_name: str | None = None):
+        self.node = node
+        # The first argument of a method, whose attributes are the instance attributes of its class.
+        self.self_name = self_name
+        # The names of a function that are declared global or nonlocal.
+        self.declared: set[str] = set()
+        # The instance attributes of a class, with the node that first assigns them.
+        self.attributes: dict[str, ast.AST] = {}
+
+
+class ModuleLinter(ast.NodeVisitor):
+    """
+    Lints a module in one walk of its syntax tree, counting its statements and definitions and collecting the messages
+    of the docstring and naming checks. The McCabe complexity is computed from the same tree afterwards.
+    """
+
+    def __init__(self, settings: Settings, stats: LinterStats, module: str, abspath: str):
+        self.settings = settings
+        self.stats = stats
+        # The stats are kept per module name, the messages per module name without __init__, as Pylint does.
+        self.module = module
+        self.message_module = module.removesuffix('.__init__')
+        self.abspath = abspath
+        self.path = abspath.replace(os.getcwd() + os.sep, '', 1)
+        self.messages: list[Message] = []
+        self.complexities: list[int] = []
+        self.statements = 0
+        self._frames: list[_Frame] = []
+        self._assignment: ast.AST | None = None
+        self._docstring_owners: list[ast.AST] = []
+        self._docstrings: set[int] = set()
+        # The classes and imported names of the module, which the bases of its classes are resolved in.
+        self._classes: dict[str, ast.ClassDef] = {}
+        self._imports: dict[str, str] = {}
+        self._inherited: dict[int, set[str]] = {}
+        # The names imported in a try block, while its ImportError handler is visited.
+        self._import_fallbacks: set[str] = set()
+
+    def lint(self):
+        """Lints the module and adds its statements and messages to the stats."""
+
+        self.stats.init_single_module(self.module)
+        try:
+            with open(self.abspath, 'rb') as file:
+                tree = ast.parse(file.read(), filename=self.message_module)
+        except (SyntaxError, ValueError) as error:
+            self._add('E0001', None, (str(error),), line=getattr(error, 'lineno', None) or 0)
+            return
+
+        self.visit(tree)
+        self.stats.statement += self.statements
+        self.stats.by_module[self.module]['statement'] = self.statements
+        self._check_complexity(tree)
+
+    def visit(self, node: ast.AST):
+        if isinstance(node, STATEMENTS) and id(node) not in self._docstrings:
+            self.statements += 1
+        return super().visit(node)
+
+    def visit_Module(self, node: ast.Module):
+        self.stats.node_count['module'] += 1
+        docstring = self._docstring(node)
+        if node.body:
+            self._check_docstring('module', node, docstring)
+        self._check_name('module', self.message_module.split('.')[-1], node)
+
+        for child in node.body:
+            if isinstance(child, ast.ClassDef):
+                self._classes[child.name] = child
+            elif isinstance(child, ast.Import):
+                self._imports.update({alias.asname or alias.name.split('.')[0]:
+                                      alias.name if alias.asname else alias.name.split('.')[0]
+                                      for alias in child.names})
+            elif isinstance(child, ast.ImportFrom) and not child.level:
+                self._imports.update({alias.asname or alias.name: f'{child.module}.{alias.name}'
+                                      for alias in child.names})
+        self._visit_frame(_Frame(node), node.body)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.stats.node_count['klass'] += 1
+        docstring = self._docstring(node)
+        if self.settings.no_docstring_rgx.match(node.name) is None:
+            self._check_docstring('class', node, docstring)
+        self._check_name('class', node.name, node)
+        self._check_type_params(node)
+
+        for child in [*node.decorator_list, *node.bases, *node.keywords]:
+            self.visit(child)
+        frame = _Frame(node)
+        self._visit_frame(frame, node.body)
+        for name, attribute in frame.attributes.items():
+            self._check_name('attr', name, attribute)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
+        parent = self._frames[-1].node
+        is_method = isinstance(parent, ast.ClassDef)
+        function_type = 'method' if is_method else 'function'
+        confidence = INFERENCE if is_method else HIGH
+        self.stats.node_count[function_type] += 1
+
+        docstring = self._docstring(node)
+        decorators = {_last_name(decorator) for decorator in node.decorator_list}
+        # Pylint does not ask for the docstring and name of a method to be repeated where it is overridden.
+        overrides = is_method and node.name in self._inherited_methods(parent)
+        if (isinstance(parent, (ast.Module, ast.ClassDef)) and self.settings.no_docstring_rgx.match(node.name) is None
+                and not decorators & (ACCESSOR_DECORATORS | {'overload'})):
+            self._check_docstring(function_type, node, docstring, confidence, report_missing=not overrides)
+
+        if not overrides:
+            self._check_name('attr' if is_method and decorators & (PROPERTY_DECORATORS | ACCESSOR_DECORATORS)
+                             else function_type, node.name, node, confidence)
+            for argument in node.args.args:
+                self._check_name('argument', argument.arg, argument)
+        self._check_type_params(node)
+
+        for child in [*node.decorator_list, node.args, *([node.returns] if node.returns else [])]:
+            self.visit(child)
+        self_name = node.args.args[0].arg if is_method and node.args.args and 'staticmethod' not in decorators \
+            else None
+        self._visit_frame(_Frame(node, self_name), node.body)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self.visit(node.args)
+        self._visit_frame(_Frame(node), [node.body])
+
+    def visit_Assign(self, node: ast.Assign):
+        self._visit_targets(node, node.targets)
+        self.visit(node.value)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign):
+        self._visit_targets(node, [node.target])
+        self.visit(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+
+    def visit_comprehension(self, node: ast.comprehension):
+        self._visit_targets(node, [node.target])
+        self.visit(node.iter)
+        for condition in node.ifs:
+            self.visit(condition)
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Store):
+            self._check_assigned_name(node.id, node)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        frame = self._frames[-1]
+        if (isinstance(node.ctx, ast.Store) and isinstance(node.value, ast.Name) and frame.self_name is not None
+                and node.value.id == frame.self_name):
+            self._frames[-2].attributes.setdefault(node.attr, node)
+        self.visit(node.value)
+
+    def visit_Try(self, node: ast.Try):
+        for child in node.body:
+            self.visit(child)
+        imported = {alias.asname or alias.name for child in node.body for alias in getattr(child, 'names', [])
+                    if isinstance(child, (ast.Import, ast.ImportFrom))}
+        for handler in node.handlers:
+            previous = self._import_fallbacks
+            if {'ImportError', 'ModuleNotFoundError'} & {_last_name(error) for error in _handled_errors(handler)}:
+                self._import_fallbacks = previous | imported
+            self.visit(handler)
+            self._import_fallbacks = previous
+        for child in [*node.orelse, *node.finalbody]:
+            self.visit(child)
+
+    visit_TryStar = visit_Try
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.name is not None:
+            self._check_assigned_name(node.name, node)
+        self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global | ast.Nonlocal):
+        self._frames[-1].declared.update(node.names)
+
+    visit_Nonlocal = visit_Global
+
+    def visit_TypeAlias(self, node: ast.AST):
+        self._check_name('typealias', node.name.id, node)
+        self._check_type_params(node)
+        self.visit(node.value)
+
+    def _visit_frame(self, frame: _Frame, body: list[ast.AST]):
+        self._frames.append(frame)
+        for child in body:
+            self.visit(child)
+        self._frames.pop()
+
+    def _visit_targets(self, assignment: ast.AST, targets: list[ast.AST]):
+        previous, self._assignment = self._assignment, assignment
+        for target in targets:
+            self.visit(target)
+        self._assignment = previous
+
+    def _docstring(self, node: ast.Module | ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> str | None:
+        """Returns the docstring of a node, which is then not counted as a statement, as Pylint does not count it."""
+
+        if node.body and isinstance(node.body[0], ast.Expr) and isinstance(node.body[0].value, ast.Constant) \
+                and isinstance(node.body[0].value.value, str):
+            self._docstring_owners.append(node)
+            self._docstrings.add(id(node.body[0]))
+            return node.body[0].value.value
+        return None
+
+    def _check_docstring(self, node_type: str, node: ast.AST, docstring: str | None, confidence: Confidence = HIGH,
+                         report_missing: bool = True):
+        if docstring is None:
+            if not report_missing:
+                return
+            min_length = self.settings.docstring_min_length
+            lines = (getattr(node, 'end_lineno', 0) or 0) - (getattr(node, 'lineno', 0) or 0)
+            if node_type != 'module' and min_length > -1 and lines < min_length:
+                return
+            self.stats.undocumented['klass' if node_type == 'class' else node_type] += 1
+            self._add(MISSING_DOCSTRING_IDS[node_type], node, confidence=confidence)
+        elif not docstring.strip():
+            self.stats.undocumented['klass' if node_type == 'class' else node_type] += 1
+            self._add('C0112', node, (node_type,), confidence=confidence)
+
+    def _inherited_methods(self, node: ast.ClassDef) -> set[str]:
+        """
+        Returns the names of the methods that a class inherits from the bases that are resolved without inference, which
+        are the classes of the module and the classes of the standard library.
+        """
+
+        methods = self._inherited.get(id(node))
+        if methods is None:
+            methods = self._inherited[id(node)] = set()
+            for base in node.bases:
+                name = _dotted_name(base)
+                if name in self._classes:
+                    methods |= {child.name for child in self._classes[name].body
+                                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))}
+                    methods |= self._inherited_methods(self._classes[name])
+                elif name is not None and name.split('.')[0] in self._imports:
+                    head, _, rest = name.partition('.')
+                    methods |= _standard_library_methods(f'{self._imports[head]}.{rest}'.rstrip('.'))
+                elif name is not None:
+                    methods |= _standard_library_methods(f'builtins.{name}')
+        return methods
+
+    def _check_type_params(self, node: ast.AST):
+        for type_param in getattr(node, 'type_params', []):
+            self._check_name('typevar', type_param.name, type_param)
+
+    def _check_assigned_name(self, name: str, node: ast.AST):
+        """Checks a name that is assigned to, with the name type that Pylint gives it where it is assigned."""
+
+        frame = self._frames[-1]
+        assignment = self._assignment
+        if isinstance(assignment, ast.comprehension):
+            self._check_name('inlinevar', name, node)
+
+        elif isinstance(frame.node, ast.Module):
+            if isinstance(assignment, ast.Assign) and isinstance(node, ast.Name) \
+                    and any(target is node for target in assignment.targets):
+                if _is_typevar(assignment.value):
+                    self._check_name('typevar', name, node)
+                elif isinstance(assignment.value, ast.Name) and assignment.value.id in self._classes:
+                    self._check_name('class', name, node)
+                elif _is_constant(assignment.value) and name not in self._import_fallbacks:
+                    self._check_name('const', name, node)
+                else:
+                    self._check_name('variable', name, node, disallowed_only=True)
+            elif isinstance(assignment, ast.AnnAssign):
+                if _annotation_name(assignment.annotation) == 'Final':
+                    self._check_name('const', name, node)
+                elif _annotation_name(assignment.annotation) == 'TypeAlias':
+                    self._check_name('typealias', name, node)
+
+        elif isinstance(frame.node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = frame.node.args
+            argument_names = {argument.arg for argument in [*arguments.posonlyargs, *arguments.args,
+                                                            *arguments.kwonlyargs, arguments.vararg, arguments.kwarg]
+                              if argument is not None}
+            if name not in frame.declared and name not in argument_names:
+                if isinstance(assignment, ast.AnnAssign) and _annotation_name(assignment.annotation) == 'TypeAlias':
+                    self._check_name('typealias', name, node)
+                else:
+                    self._check_name('variable', name, node)
+
+        elif isinstance(frame.node, ast.ClassDef):
+            if (isinstance(assignment, ast.AnnAssign) and _annotation_name(assignment.annotation) == 'Final') \
+                    or any(_last_name(base) in ENUM_BASES for base in frame.node.bases):
+                self._check_name('class_const', name, node)
+            else:
+                self._check_name('class_attribute', name, node)
+
+    def _check_name(self, node_type: str, name: str, node: ast.AST, confidence: Confidence = HIGH,
+                    disallowed_only: bool = False):
+        settings = self.settings
+        if name in settings.good_names or any(pattern.match(name) for pattern in settings.good_names_rgxs):
+            return
+        if name in settings.bad_names or any(pattern.match(name) for pattern in settings.bad_names_rgxs):
+            self.stats.increase_bad_name(node_type, 1)
+            self._add('C0104', node, (name,))
+            return
+        if disallowed_only:
+            return
+
+        pattern, hint = settings.naming[node_type]
+        if pattern.match(name) is None:
+            self.stats.increase_bad_name(node_type, 1)
+            self._add('C0103', node, (HUMAN_READABLE_TYPES[node_type].capitalize(), name, hint), confidence)
+
+    def _check_complexity(self, tree: ast.Module):
+        """Adds the McCabe complexity of the functions and module level blocks above max-complexity."""
+
+        # Pylint computes the complexity on trees without docstrings.
+        for owner in self._docstring_owners:
+            owner.body = owner.body[1:]
+
+        visitor = PathGraphingVisitor()
+        for child in tree.body:
+            visitor.preorder(child, visitor)
+
+        for key, graph in visitor.graphs.items():
+            complexity = graph.complexity()
+            if complexity <= self.settings.max_complexity:
+                continue
+            root = visitor.roots[key]
+            name = f"'{root.name}'" if hasattr(root, 'name') else f"This '{type(root).__name__.lower()}'"
+            self.complexities.append(complexity)
+            self._add('R1260', root, (name, complexity))
+
+    def _add(self, msg_id: str, node: ast.AST | None, args: tuple = (), confidence: Confidence = HIGH,
+             line: int | None = None):
+        symbol, template = MESSAGES[msg_id]
+        if line is None:
+            line = getattr(node, 'lineno', 1)
+        location = MessageLocationTuple(self.abspath, self.path, self.message_module, '', line,
+                                        getattr(node, 'col_offset', 0), getattr(node, 'end_lineno', None),
+                                        getattr(node, 'end_col_offset', None))
+        self.messages.append(Message(msg_id, symbol, location, template % args if args else template, confidence))
+
+        category = MSG_TYPES[msg_id[0]]
+        self.stats.increase_single_message_count(category, 1)
+        self.stats.increase_single_module_message_count(self.module, category, 1)
+        self.stats.by_msg[f'{msg_id}.{symbol}'] = self.stats.by_msg.get(f'{msg_id}.{symbol}', 0) + 1
+
+
+class PathGraphingVisitor(mccabe.PathGraphingAstVisitor):
+    """
+    Builds the McCabe path graphs of the functions and module level blocks as the mccabe extension of Pylint does,
+    which only adds the statements and expressions below to a graph and looks for blocks in all other nodes. The node
+    that each graph starts at is kept in roots.
+    """
+
+    SIMPLE_NODES: tuple[type, ...] = (ast.Assert, ast.Assign, ast.AugAssign, ast.Delete, ast.Raise, ast.Yield,
+                                      ast.Import, ast.Call, ast.Subscript, ast.Pass, ast.Continue, ast.Break,
+                                      ast.Global, ast.Return, ast.Expr, ast.Await)
+
+    def __init__(self):
+        super().__init__()
+        self.roots: dict[str, ast.AST] = {}
+
+    def default(self, node: ast.AST, *args):
+        if isinstance(node, self.SIMPLE_NODES):
+            self.visitSimpleStatement(node)
+        else:
+            mccabe.ASTVisitor.default(self, node, *args)
+
+    def visitFunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
+        if self.graph is None:
+            self.roots[f'{self.classname}{node.name}'] = node
+        super().visitFunctionDef(node)
+
+    visitAsyncFunctionDef = visitFunctionDef
+
+    def _subgraph(self, node: ast.AST, name: str, extra_blocks=()):
+        if self.graph is None:
+            self.roots[f'{self.classname}{name}'] = node
+        super()._subgraph(node, name, extra_blocks)
+
+
+def _last_name(node: ast.AST) -> str | None:
+    """Returns the last name of a decorator, base class or exception, like setter for @value.setter."""
+
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _dotted_name(node: ast.AST) -> str | None:
+    """Returns the dotted name of a base class, like unittest.TestCase."""
+
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return None if value is None else f'{value}.{node.attr}'
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _standard_library_methods(qualified_name: str) -> frozenset[str]:
+    """
+    Returns the names of the methods of a class of the standard library and of its ancestors but object, as Pylint
+    finds them. The class is looked up in the syntax trees of astroid, so its module is not imported.
+    """
+
+    module_name, _, class_name = qualified_name.rpartition('.')
+    if module_name.split('.')[0] not in sys.stdlib_module_names:
+        return frozenset()
+    try:
+        cls = next(astroid.MANAGER.ast_from_module_name(module_name).igetattr(class_name))
+        if not isinstance(cls, nodes.ClassDef):
+            return frozenset()
+        ancestors = [cls, *cls.ancestors()]
+    except (astroid.AstroidError, StopIteration, RecursionError):
+        return frozenset()
+    return frozenset(name for ancestor in ancestors if ancestor.qname() != 'builtins.object'
+                     for name, definitions in ancestor.locals.items() if isinstance(definitions[0], nodes.FunctionDef))
+
+
+def _handled_errors(handler: ast.ExceptHandler) -> list[ast.AST]:
+    """Returns the exceptions that an except clause handles."""
+
+    if handler.type is None:
+        return []
+    return handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+
+
+def _annotation_name(node: ast.AST) -> str | None:
+    """Returns the last name of an annotation, like Final for typing.Final[int]."""
+
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    return _last_name(node)
+
+
+def _is_constant(node: ast.AST) -> bool:
+    """Whether a value is a literal, which is what Pylint most often infers as a constant."""
+
+    if isinstance(node, ast.UnaryOp):
+        node = node.operand
+    return isinstance(node, ast.Constant)
+
+
+def _is_typevar(node: ast.AST) -> bool:
+    return isinstance(node, ast.Call) and _last_name(node.func) == 'TypeVar'
@@ -0,0 +1,226 @@
+"""
+This module contains an incremental replacement of the similarities checker of Pylint, which reports the duplicate-code
+messages and the nb_duplicated_lines and percent_duplicated_lines stats.
+
+Pylint normalizes and hashes the line windows of both files of every pair of files, on every commit. The DuplicateIndex
+keeps the windows of each file by its blob SHA and the common lines of each pair of blobs, so that on the next commit of
+a repository only the changed files are normalized and hashed, and only the pairs that share a window and include a
+changed file are compared. The pairs are compared and combined in the order of Pylint, which gives the same results.
+
+The checker is loaded as a Pylint plugin by lint_mining, and replaces the similarities checker of the linter.
+"""
+
+import hashlib
+from collections import defaultdict
+from io import BytesIO
+from typing import TYPE_CHECKING, NamedTuple
+
+from astroid import nodes
+from pylint.checkers.similar import REGEX_FOR_LINES_WITH_CONTENT, SimilarChecker, stripped_lines
+from pylint.utils import decoding_stream
+
+if TYPE_CHECKING:
+    from pylint.lint import PyLinter
+
+
+class FileWindows(NamedTuple):
+    """
+    The normalized lines of a file and the hashes of their windows of min-similarity-lines lines, with the indices of
+    the windows that start at each hash in order and the line numbers that each window spans.
+    """
+
+    real_lines: list[str]
+    texts: list[str]
+    has_code: list[bool]
+    hashes: dict[int, list[int]]
+    limits: list[tuple[int, int]]
+
+
+class Common(NamedTuple):
+    """Lines that two files have in common, as their number and the line numbers they span in both files."""
+
+    lines: int
+    first_start: int
+    first_end: int
+    second_start: int
+    second_end: int
+
+
+def hash_windows(real_lines: list[str], stripped: list, min_lines: int) -> FileWindows:
+    """Hashes the windows of the normalized lines of a file, as hash_lineset of Pylint does."""
+
+    texts = [line.text for line in stripped]
+    hashes = defaultdict(list)
+    limits = []
+    for index in range(len(texts) - min_lines + 1 if min_lines > 0 else 0):
+        end = stripped[index + min_lines].line_number if index + min_lines < len(stripped) \
+            else stripped[-1].line_number + 1
+        limits.append((stripped[index].line_number, end))
+        hashes[hash(tuple(texts[index:index + min_lines]))].append(index)
+
+    return FileWindows(real_lines, texts, [REGEX_FOR_LINES_WITH_CONTENT.match(text) is not None for text in texts],
+                       dict(hashes), limits)
+
+
+def common_lines(first: FileWindows, second: FileWindows, min_lines: int) -> list[Common]:
+    """Returns the lines that two files have in common, as _find_common of Pylint does."""
+
+    # Pylint sorts the common hashes by their first window in the file whose hashes it iterates to intersect them.
+    iterated = first if len(second.hashes) > len(first.hashes) else second
+    common = sorted(first.hashes.keys() & second.hashes.keys(), key=lambda window: iterated.hashes[window][0])
+
+    couples = {}
+    for window in common:
+        for first_index in first.hashes[window]:
+            for second_index in second.hashes[window]:
+                couples[first_index, second_index] = [*first.limits[first_index], *second.limits[second_index],
+                                                      min_lines]
+
+    # Successive couples are merged into the first of them that is visited, see remove_successive.
+    for couple in tuple(couples):
+        successive = []
+        test = (couple[0] + 1, couple[1] + 1)
+        while test in couples:
+            couples[couple][1] = couples[test][1]
+            couples[couple][3] = couples[test][3]
+            couples[couple][4] += 1
+            successive.append(test)
+            test = (test[0] + 1, test[1] + 1)
+        for test in successive:
+            couples.pop(test, None)
+
+    result = []
+    for (first_index, second_index), (first_start, first_end, second_start, second_end, lines) in couples.items():
+        first_code = [text for text, code in zip(first.texts[first_index:first_index + lines],
+                                                 first.has_code[first_index:first_index + lines]) if code]
+        second_code = [text for text, code in zip(second.texts[second_index:second_index + lines],
+                                                  second.has_code[second_index:second_index + lines]) if code]
+        if sum(first_line == second_line for first_line, second_line in zip(first_code, second_code)) > min_lines:
+            result.append(Common(lines, first_start, first_end, second_start, second_end))
+    return result
+
+
+class DuplicateIndex:
+    """The hashed windows of files by blob SHA, and the common lines of pairs of blobs."""
+
+    def __init__(self):
+        self.windows: dict[str, FileWindows] = {}
+        self.commons: dict[tuple[str, str], list[Common]] = {}
+
+    def similarities(self, blobs: list[str], min_lines: int) -> list[tuple[int, set[tuple[int, int, int]]]]:
+        """
+        Returns the similarities between indexed files, in the order of the blobs of the files given, as _compute_sims
+        of Pylint does. A similarity is a number of lines and the set of the file positions and line numbers that the
+        lines are found at in two files.
+        """
+
+        files_by_window = defaultdict(list)
+        for position, blob in enumerate(blobs):
+            for window in self.windows[blob].hashes:
+                files_by_window[window].append(position)
+
+        pairs = {(first, second) for positions in files_by_window.values()
+                 for index, first in enumerate(positions) for second in positions[index + 1:]}
+
+        no_duplicates = defaultdict(list)
+        # The files and lines of the similarities by number of lines, as Pylint skips similarities found there before.
+        seen = defaultdict(set)
+        for first, second in sorted(pairs):
+            key = (blobs[first], blobs[second])
+            if key not in self.commons:
+                self.commons[key] = common_lines(self.windows[key[0]], self.windows[key[1]], min_lines)
+
+            for common in self.commons[key]:
+                first_lines = (first, common.first_start, common.first_end)
+                second_lines = (second, common.second_start, common.second_end)
+                if first_lines not in seen[common.lines] and second_lines not in seen[common.lines]:
+                    no_duplicates[common.lines].append({first_lines, second_lines})
+                    seen[common.lines].update((first_lines, second_lines))
+
+        similarities = [(lines, couples) for lines, ensembles in no_duplicates.items() for couples in ensembles]
+        similarities.sort(key=lambda similarity: similarity[0])
+        similarities.reverse()
+        return similarities
+
+    def retain(self, blobs: set[str]):
+        """Removes the windows and common lines of the blobs that are not given."""
+
+        self.windows = {blob: windows for blob, windows in self.windows.items() if blob in blobs}
+        self.commons = {key: commons for key, commons in self.commons.items() if key[0] in blobs and key[1] in blobs}
+
+
+class IncrementalSimilarChecker(SimilarChecker):
+    """
+    The similarities checker of Pylint, with the files hashed once per blob and compared once per pair of blobs. The
+    index is kept between the runs of a linter, with only the blobs of the last run.
+    """
+
+    # The options and reports are those of the similarities checker that this checker replaces.
+    options = ()
+    reports = ()
+
+    def __init__(self, linter: 'PyLinter'):
+        super().__init__(linter)
+        self.index = DuplicateIndex()
+        self.files: list[tuple[str, str]] = []
+
+    def __getstate__(self) -> dict[str, any]:
+        # The workers of a parallel run get a copy of the linter. They hash their files anew and pass the windows back.
+        return {**self.__dict__, 'index': DuplicateIndex()}
+
+    def open(self):
+        self.files = []
+        self.linter.stats.reset_duplicated_lines()
+
+    def process_module(self, node: nodes.Module):
+        with node.stream() as stream:
+            data = stream.read()
+
+        blob = hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+        if blob not in self.index.windows:
+            try:
+                lines = decoding_stream(BytesIO(data), node.file_encoding).readlines()
+            except UnicodeDecodeError:
+                lines = []
+            stripped = stripped_lines(lines, self.namespace.ignore_comments, self.namespace.ignore_docstrings,
+                                      self.namespace.ignore_imports, self.namespace.ignore_signatures,
+                                      line_enabled_callback=self.linter._is_one_message_enabled)
+            self.index.windows[blob] = hash_windows(lines, stripped, self.namespace.min_similarity_lines)
+
+        self.files.append((self.linter.current_name, blob))
+
+    def close(self):
+        blobs = [blob for _, blob in self.files]
+        total = sum(len(self.index.windows[blob].real_lines) for blob in blobs)
+        duplicated = 0
+        for lines, couples in self.index.similarities(blobs, self.namespace.min_similarity_lines):
+            msg = sorted(f'=={self.files[position][0]}:[{start}:{end}]' for position, start, end in couples)
+            position, start, end = max(couples)
+            msg += [line.rstrip() for line in self.index.windows[blobs[position]].real_lines[start:end]]
+
+            self.add_message('R0801', args=(len(couples), '\n'.join(msg)))
+            duplicated += lines * (len(couples) - 1)
+
+        stats = self.linter.stats
+        stats.nb_duplicated_lines += int(duplicated)
+        stats.percent_duplicated_lines += float(total and duplicated * 100.0 / total)
+        self.index.retain(set(blobs))
+
+    def get_map_data(self) -> list[tuple[str, str, FileWindows]]:
+        return [(name, blob, self.index.windows[blob]) for name, blob in self.files]
+
+    def reduce_map_data(self, linter: 'PyLinter', data: list[list[tuple[str, str, FileWindows]]]):
+        self.files = []
+        for name, blob, windows in (file for files in data for file in files):
+            self.index.windows[blob] = windows
+            self.files.append((name, blob))
+        self.close()
+
+
+def register(linter: 'PyLinter'):
+    """Replaces the similarities checker of a linter with the incremental checker."""
+
+    checkers = linter._checkers['similarities']
+    if not any(isinstance(checker, IncrementalSimilarChecker) for checker in checkers):
+        checkers[:] = [checker for checker in checkers if not isinstance(checker, SimilarChecker)]
+        linter.register_checker(IncrementalSimilarChecker(linter))
@@ -4,6 +4,7 @@ import logging
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator
 
 import pandas as pd
 import requests
@@ -19,7 +20,8 @@ from pydriller.metrics.process.lines_count import LinesCount
 from rich.progress import Progress
 
 from data_io import repo_management
-from utility import config, ntfyer, util
+from mining import records
+from utility import config, ntfyer, telemetry, util
 from utility.progress_bars import IterableProgressWrapper, RepositoryWithProgress
 
 
@@ -30,19 +32,32 @@ def mine_git_data(repo_directory: Path,
                   to: datetime = datetime.now()) -> dict[str, dict[str, any]]:
     """Mine git data from a list of repositories and return a dictionary with the data"""
 
-    data = {}
+    return records.collect_repos(iter_git_data(repo_directory, repo_urls, progress, since, to))
+
+
+def iter_git_data(repo_directory: Path,
+                  repo_urls: list[str],
+                  progress: Progress,
+                  since: datetime = datetime.now() - relativedelta(years=20),
+                  to: datetime = datetime.now()) -> Iterator[records.RepoRecord]:
+    """Mine git data from a list of repositories, yielding a record as each repository is mined"""
+
     repo_urls = repo_management.load_repos(repo_directory, repo_urls, progress)
     for repo_url, repo in IterableProgressWrapper(repo_urls.items(),
                                                   progress,
                                                   description=f'Mining Git Data',
                                                   postfix="Repos"):
         repo_name = util.get_repo_name_from_url_or_path(repo_url)
-        data[repo_name] = _mine_commit_data(repo, progress)
-        data[repo_name].update(_mine_process_data(repo_directory / repo_name, since=since, to=to, progress=progress))
-        data[repo_name]['repo'] = repo_name
-        data[repo_name]['repo_url'] = repo_url
+        with telemetry.span('git_commits', repo_name) as span:
+            data = _mine_commit_data(repo, progress)
+            span.add('commits', data['total_commits'])
+        with telemetry.span('git_process_metrics', repo_name) as span:
+            data.update(_mine_process_data(repo_directory / repo_name, since=since, to=to, progress=progress))
+            span.add('repos')
+        data['repo'] = repo_name
+        data['repo_url'] = repo_url
 
-    return data
+        yield records.RepoRecord(repo_name, data)
 
 
 def _mine_commit_data(repo: RepositoryWithProgress, progress: Progress) -> dict[str, any]:
@@ -239,10 +254,18 @@ def _history_complexity(repo_path: Path, since: datetime = None, to: datetime =
 def mine_stargazers_data(repo_urls: list[str], progress: Progress) -> dict[str, [dict]]:
     """Mine stargazers data from a list of repositories and return a dictionary with the data"""
 
+    return records.collect_repos(records.group_stargazers(iter_stargazers_data(repo_urls, progress)))
+
+
+def iter_stargazers_data(repo_urls: list[str], progress: Progress) -> Iterator[records.StargazersPage]:
+    """
+    Mine stargazers data from a list of repositories, yielding each page of stargazers as it is received. The pages of
+    a repository end with an empty last page, unless the rate limit ran out.
+    """
+
     load_dotenv()
 
     headers = {'Authorization': f'Bearer {os.getenv("GITHUB_TOKEN")}'}
-    data = {}
     for url in IterableProgressWrapper(repo_urls, progress, "Querying GraphQL API for Stargazers", postfix="Repos"):
 
         repo_owner = util.get_repo_owner_from_url(url)
@@ -252,75 +275,72 @@ def mine_stargazers_data(repo_urls: list[str], progress: Progress) -> dict[str,
             logging.error(f"Ratelimit exceeded, skipping {repo_owner}/{repo_name}")
             continue
 
-        stargazers = []
         end_cursor = None
-
         query_task = progress.add_task(f'{util.get_repo_name_from_url_or_path(url)}', total=None)
-        while True:
-
-            query = {
-                "query": """
-                    query repository($owner: String!, $name: String!, $first: Int, $after: String) {
-                        repository(owner: $owner, name: $name) {
-                            stargazers(first: $first, after: $after) {
-                                edges {
-                                    cursor
-                                    starredAt
-                                    node {
-                                        login
+        with telemetry.span('stargazers_query', repo_name) as span:
+            while True:
+
+                query = {
+                    "query": """
+                        query repository($owner: String!, $name: String!, $first: Int, $after: String) {
+                            repository(owner: $owner, name: $name) {
+                                stargazers(first: $first, after: $after) {
+                                    edges {
+                                        cursor
+                                        starredAt
+                                        node {
+                                            login
+                                        }
                                     }
                                 }
                             }
                         }
+                    """,
+                    "variables": {
+                        "owner": repo_owner,
+                        "name": repo_name,
+                        "first": 100,
+                        "after": end_cursor if end_cursor else None
                     }
-                """,
-                "variables": {
-                    "owner": repo_owner,
-                    "name": repo_name,
-                    "first": 100,
-                    "after": end_cursor if end_cursor else None
                 }
-            }
 
-            response = requests.post(config.GRAPHQL_API, json=query, headers=headers).json()
+                with span.timing():
+                    response = requests.post(config.GRAPHQL_API, json=query, headers=headers).json()
+                span.add('requests')
 
-            if "message" in response and response["message"] == "Bad credentials":
-                logging.error(f"\nBad credentials when querying the GraphQL API for stargazers\n"
-                              f"Skipping repo: {repo_owner}/{repo_name}")
-                break
+                if "message" in response and response["message"] == "Bad credentials":
+                    logging.error(f"\nBad credentials when querying the GraphQL API for stargazers\n"
+                                  f"Skipping repo: {repo_owner}/{repo_name}")
+                    break
 
-            elif "errors" in response:
-                logging.error(f"\nError when when querying the GraphQL API for stargazers\n"
-                              f"repo: {repo_owner}/{repo_name}"
-                              f"Error message: {response['errors'][0]['message']}")
-                continue
+                elif "errors" in response:
+                    logging.error(f"\nError when when querying the GraphQL API for stargazers\n"
+                                  f"repo: {repo_owner}/{repo_name}"
+                                  f"Error message: {response['errors'][0]['message']}")
+                    continue
 
-            edges = response["data"]["repository"]["stargazers"]["edges"]
+                edges = response["data"]["repository"]["stargazers"]["edges"]
 
-            if not edges:
-                break
+                if not edges:
+                    yield records.StargazersPage(repo_name, [], True)
+                    break
 
-            stargazers.extend(edges)
-            end_cursor = edges[-1]["cursor"]
+                span.add('stargazers', len(edges))
+                yield records.StargazersPage(repo_name, edges, False)
+                end_cursor = edges[-1]["cursor"]
 
-            remaining, reset_at = _check_graphql_rate_limit()
+                remaining, reset_at = _check_graphql_rate_limit()
 
-            logging.debug(f"Remaining GraphQL requests: {remaining}, reset at: {reset_at}")
+                logging.debug(f"Remaining GraphQL requests: {remaining}, reset at: {reset_at}")
 
-            if remaining in [250, 100, 10, 1]:
-                _send_graphql_rate_limit_warning(remaining, reset_at)
-            elif remaining <= 0:
-                break
+                if remaining in [250, 100, 10, 1]:
+                    _send_graphql_rate_limit_warning(remaining, reset_at)
+                elif remaining <= 0:
+                    break
 
         progress.stop_task(query_task)
         progress.remove_task(query_task)
 
-        response["data"]["repository"]["name"] = repo_name
-        response["data"]["repository"]["stargazers"]["edges"] = stargazers
-        data[repo_name] = response
-
-    return data
-
 
 def _check_graphql_rate_limit() -> tuple[int, pd.Timestamp]:
     """Check the rate limit of the GraphQL API"""
@@ -354,10 +374,15 @@ def _check_graphql_rate_limit() -> tuple[int, pd.Timestamp]:
 def mine_repo_metadata(repos: list[str], progress: Progress) -> dict[str, any]:
     """Mine the metadata of a list of repositories and return a dictionary with the data."""
 
+    return records.collect_repos(iter_repo_metadata(repos, progress))
+
+
+def iter_repo_metadata(repos: list[str], progress: Progress) -> Iterator[records.RepoRecord]:
+    """Mine the metadata of a list of repositories, yielding a record as the metadata of each repository is received."""
+
     load_dotenv()
 
     headers = {'Authorization': f'Bearer {os.getenv("GITHUB_TOKEN")}'}
-    data = {}
     for repo_url in IterableProgressWrapper(repos,
                                             progress,
                                             description="Querying GraphQL API for metadata",
@@ -428,7 +453,9 @@ def mine_repo_metadata(repos: list[str], progress: Progress) -> dict[str, any]:
             }
         }
 
-        response = requests.post(config.GRAPHQL_API, json=query, headers=headers).json()
+        with telemetry.span('metadata_query', repo_name) as span:
+            response = requests.post(config.GRAPHQL_API, json=query, headers=headers).json()
+            span.add('requests')
 
         if "errors" in response:
             logging.error(f"\nError when when querying GraphQL API for repo metadata\n"
@@ -436,11 +463,7 @@ def mine_repo_metadata(repos: list[str], progress: Progress) -> dict[str, any]:
                           f"Error message: {response['errors'][0]['message']}")
             continue
 
-        metadata = response['data']['repository']
-
-        data.update({
-            repo_name: metadata
-        })
+        yield records.RepoRecord(repo_name, response['data']['repository'])
 
         remaining, reset_at = _check_graphql_rate_limit()
 
@@ -451,8 +474,6 @@ def mine_repo_metadata(repos: list[str], progress: Progress) -> dict[str, any]:
         elif remaining <= 0:
             break
 
-    return data
-
 
 def _send_graphql_rate_limit_warning(remaining: int, reset_at: pd.Timestamp):
     """Send a warning if the rate limit of GraphQL is getting low"""
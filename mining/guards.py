@@ -0,0 +1,236 @@
+"""
+This module keeps pathological files and commits from stalling the lint and test miners.
+
+Files are skipped before they are mined if they are larger than config.MAX_FILE_SIZE_KB, have a line longer than
+config.MAX_LINE_LENGTH, or start with one of config.GENERATED_FILE_MARKERS. The decision is kept per blob, so an
+unchanged file is only read for it once.
+
+If config.COMMIT_TIMEOUT_SECONDS or config.COMMIT_MEMORY_LIMIT_MB is set, the commits are mined in a worker process
+that is replaced when a commit exceeds the time or memory budget, and the commit is skipped. Every skipped file and
+commit is recorded with utility.skips.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Callable
+
+from git import Repo
+
+from utility import config, file_index, skips, util
+
+try:
+    import resource
+except ImportError:
+    # The memory budget is not enforced on Windows, where the resource module does not exist.
+    resource = None
+
+# The number of bytes at the start of a file that are searched for the markers of generated files.
+GENERATED_HEADER_BYTES = 2048
+# The number of blobs whose skip decision is kept.
+DECISION_CACHE_SIZE = 262144
+
+_lock = threading.Lock()
+_decisions: dict[tuple[bytes, tuple], str | None] = {}
+
+
+class CommitBudgetExceeded(Exception):
+    """Raised when the mining of a commit exceeds its time or memory budget, with the reason as its message."""
+
+
+def skip_reason(path: Path) -> str | None:
+    """Returns why a file is skipped by the miners, or None if it is mined."""
+
+    size = os.path.getsize(path)
+    if config.MAX_FILE_SIZE_KB is not None and size > config.MAX_FILE_SIZE_KB * 1024:
+        return f'file size of {size // 1024} KB'
+
+    with open(path, 'rb') as file:
+        content = file.read()
+
+    if config.MAX_LINE_LENGTH is not None:
+        longest = max(map(len, content.splitlines()), default=0)
+        if longest > config.MAX_LINE_LENGTH:
+            return f'line length of {longest}'
+
+    header = content[:GENERATED_HEADER_BYTES]
+    for marker in config.GENERATED_FILE_MARKERS:
+        if marker.encode() in header:
+            return f'generated file ({marker})'
+
+    return None
+
+
+def guard_files(repo: Repo, commit: str, miner: str) -> list[str]:
+    """
+    Returns the paths of the Python files of the checked out commit of a repository that are mined. The skipped files
+    are recorded and removed from the checkout, so that Pylint does not find them either.
+    """
+
+    repo_path = Path(repo.working_tree_dir)
+    repo_name = util.get_repo_name_from_url_or_path(repo_path)
+    files = []
+    for path, binsha in file_index.get_python_blobs_from_commit(repo, commit):
+        reason = _cached_skip_reason(repo_path / path, binsha)
+        if reason is None:
+            files.append(path)
+        else:
+            skips.record(miner, repo_name, commit, reason, path)
+            (repo_path / path).unlink(missing_ok=True)
+
+    return files
+
+
+def _cached_skip_reason(path: Path, binsha: bytes) -> str | None:
+    """Returns the skip reason of a file, which is kept per blob and settings."""
+
+    key = (binsha, (config.MAX_FILE_SIZE_KB, config.MAX_LINE_LENGTH, tuple(config.GENERATED_FILE_MARKERS)))
+    with _lock:
+        if key in _decisions:
+            return _decisions[key]
+
+    try:
+        reason = skip_reason(path)
+    except OSError:
+        # Files that are not checked out, such as broken symbolic links, are left to the miners.
+        reason = None
+
+    with _lock:
+        _decisions[key] = reason
+        if len(_decisions) > DECISION_CACHE_SIZE:
+            del _decisions[next(iter(_decisions))]
+    return reason
+
+
+class CommitGuard:
+    """
+    A worker process that mines one commit at a time within config.COMMIT_TIMEOUT_SECONDS and
+    config.COMMIT_MEMORY_LIMIT_MB. The worker keeps its state between commits, such as the Pylint session and the
+    astroid cache, until a commit exceeds the budget and the worker is replaced.
+    """
+
+    def __init__(self):
+        self._process: multiprocessing.Process | None = None
+        self._connection: Connection | None = None
+
+    def run(self, function: Callable, *args) -> any:
+        """
+        Calls a module-level function with picklable arguments in the worker and returns its result. Raises
+        CommitBudgetExceeded if the call runs out of time or memory, and the exceptions of the function otherwise.
+        """
+
+        if not self.running:
+            self._start()
+
+        self._connection.send((_settings(), function, args))
+        timeout = config.COMMIT_TIMEOUT_SECONDS
+        if not self._connection.poll(timeout):
+            self.stop()
+            raise CommitBudgetExceeded(f'time limit of {timeout} s')
+
+        try:
+            status, result = self._connection.recv()
+        except EOFError:
+            exit_code = self._process.exitcode if self._process is not None else None
+            self.stop()
+            raise CommitBudgetExceeded(f'worker exited with code {exit_code}')
+
+        if status == 'memory':
+            self.stop()
+            raise CommitBudgetExceeded(f'memory limit of {config.COMMIT_MEMORY_LIMIT_MB} MB')
+        if status == 'recursion':
+            self.stop()
+            raise CommitBudgetExceeded('recursion limit')
+        if status == 'error':
+            raise result
+        return result
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker is running, with the state of the previous calls."""
+
+        return self._process is not None and self._process.is_alive()
+
+    def stop(self):
+        """Stops the worker, killing it if it is busy."""
+
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._connection.close()
+        self._process, self._connection = None, None
+
+    def _start(self):
+        # Spawned workers start from a clean interpreter. They log to the log files of this process and get its
+        # settings with every call.
+        context = multiprocessing.get_context('spawn')
+        self._connection, worker_connection = context.Pipe()
+        log_files = [handler.baseFilename for handler in logging.root.handlers
+                     if isinstance(handler, logging.FileHandler)]
+        self._process = context.Process(target=_serve, args=(worker_connection, _settings(), log_files), daemon=True)
+        self._process.start()
+        worker_connection.close()
+
+
+_guards = threading.local()
+
+
+def commit_guard() -> CommitGuard | None:
+    """Returns the commit guard of the current thread, or None if the commits are mined without a budget."""
+
+    if config.COMMIT_TIMEOUT_SECONDS is None and config.COMMIT_MEMORY_LIMIT_MB is None:
+        return None
+    if not hasattr(_guards, 'guard'):
+        _guards.guard = CommitGuard()
+    return _guards.guard
+
+
+def run_guarded(guard: CommitGuard | None, function: Callable, *args) -> any:
+    """Calls a function in the worker of a commit guard, or in this process if there is no guard."""
+
+    return function(*args) if guard is None else guard.run(function, *args)
+
+
+def _settings() -> dict[str, any]:
+    """Returns the settings of config.py in this process."""
+
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def _serve(connection: Connection, settings: dict[str, any], log_files: list[str]):
+    """Runs the calls sent by a commit guard until its connection is closed."""
+
+    vars(config).update(settings)
+    for log_file in log_files:
+        handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        handler.setLevel(config.FILE_LOGGING_LEVEL)
+        logging.root.addHandler(handler)
+    logging.root.setLevel(logging.DEBUG if log_files else logging.CRITICAL)
+
+    if config.COMMIT_MEMORY_LIMIT_MB is not None and resource is not None:
+        limit = config.COMMIT_MEMORY_LIMIT_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            settings, function, args = connection.recv()
+        except EOFError:
+            return
+
+        vars(config).update(settings)
+        try:
+            reply = ('ok', function(*args))
+        except MemoryError:
+            reply = ('memory', None)
+        except RecursionError:
+            reply = ('recursion', None)
+        except Exception as exception:
+            reply = ('error', exception)
+
+        try:
+            connection.send(reply)
+        except Exception as exception:
+            connection.send(('error', RuntimeError(f'Could not return the result of {function.__name__}: {exception}')))
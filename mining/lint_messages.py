@@ -0,0 +1,152 @@
+"""
+This module contains the compact representation of the Pylint messages of a commit.
+
+The messages of a commit are kept as array-backed columns of indices into tables of interned values, which are shared
+by all commits of a repository. A message that recurs in every commit, with the same symbol, text and path, then takes
+a few bytes per commit instead of a dict of strings. The nested dict that the outputs expect is built on demand.
+"""
+
+from array import array
+from typing import TYPE_CHECKING, Callable, Hashable, Iterator, NamedTuple
+
+if TYPE_CHECKING:
+    from pylint.message import Message
+
+
+class MessageKind(NamedTuple):
+    """The message ID, symbol and category that a Pylint message type is known by."""
+
+    msg_id: str
+    symbol: str
+    category: str
+
+
+class CompactMessage(NamedTuple):
+    """A Pylint message of a commit, with the values it refers to looked up."""
+
+    module: str
+    kind: MessageKind
+    msg: str
+    path: str
+    line: int | None
+    confidence: any
+
+
+class InternTable:
+    """A table of distinct values, which are referred to by their index in the table."""
+
+    def __init__(self):
+        self.values: list[Hashable] = []
+        self._indices: dict[Hashable, int] = {}
+
+    def intern(self, value: Hashable) -> int:
+        """Returns the index of a value, adding it to the table if it is new."""
+
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class LintTables:
+    """The interned values of the lint messages of a repository, shared by the messages of all its commits."""
+
+    def __init__(self):
+        self.kinds = InternTable()
+        self.modules = InternTable()
+        self.paths = InternTable()
+        self.texts = InternTable()
+        self.confidences = InternTable()
+
+
+class LintMessages:
+    """
+    The Pylint messages of a commit as columns of indices into the LintTables of its repository, one entry per message.
+    Lines are stored as -1 for messages without a line.
+    """
+
+    def __init__(self, tables: LintTables, repository_name: str, avg_mccabe_complexity: float):
+        self.tables = tables
+        self.repository_name = repository_name
+        self.avg_mccabe_complexity = avg_mccabe_complexity
+        self.kinds = array('I')
+        self.modules = array('I')
+        self.paths = array('I')
+        self.texts = array('I')
+        self.lines = array('i')
+        self.confidences = array('B')
+
+    @classmethod
+    def from_messages(cls,
+                      messages: list['Message'],
+                      tables: LintTables,
+                      repository_name: str,
+                      avg_mccabe_complexity: float) -> 'LintMessages':
+        """Builds the compact messages of a commit from the messages collected by the Pylint reporter."""
+
+        compact = cls(tables, repository_name, avg_mccabe_complexity)
+        for msg in messages:
+            compact.kinds.append(tables.kinds.intern(MessageKind(msg.msg_id, msg.symbol, msg.category)))
+            compact.modules.append(tables.modules.intern(msg.module))
+            compact.paths.append(tables.paths.intern(msg.path))
+            compact.texts.append(tables.texts.intern(msg.msg))
+            compact.lines.append(-1 if msg.line is None else msg.line)
+            compact.confidences.append(tables.confidences.intern(msg.confidence))
+        return compact
+
+    def with_tables(self, tables: LintTables, relocate: Callable[[str], str] | None = None) -> 'LintMessages':
+        """
+        Returns the messages with their values interned in the given tables, such as those of their repository, and
+        their paths passed through relocate if given.
+        """
+
+        compact = LintMessages(tables, self.repository_name, self.avg_mccabe_complexity)
+        for message in self:
+            compact.kinds.append(tables.kinds.intern(message.kind))
+            compact.modules.append(tables.modules.intern(message.module))
+            compact.paths.append(tables.paths.intern(message.path if relocate is None else relocate(message.path)))
+            compact.texts.append(tables.texts.intern(message.msg))
+            compact.lines.append(-1 if message.line is None else message.line)
+            compact.confidences.append(tables.confidences.intern(message.confidence))
+        return compact
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[CompactMessage]:
+        tables = self.tables
+        for kind, module, path, text, line, confidence in zip(self.kinds, self.modules, self.paths, self.texts,
+                                                                self.lines, self.confidences):
+            yield CompactMessage(tables.modules.values[module],
+                                 tables.kinds.values[kind],
+                                 tables.texts.values[text],
+                                 tables.paths.values[path],
+                                 None if line == -1 else line,
+                                 tables.confidences.values[confidence])
+
+    def to_dict(self) -> dict[str, any]:
+        """Returns the messages as a nested dict of modules, categories and message IDs, as written to the outputs."""
+
+        data = {}
+        for message in self:
+            module = data.setdefault(message.module, {'total_messages': 0, 'categories': {}})
+            category = module['categories'].setdefault(message.kind.category, {'total': 0, 'message_ids': {}})
+            category['message_ids'].setdefault(message.kind.msg_id, []).append({
+                'symbol': message.kind.symbol,
+                'msg': message.msg,
+                'confidence': message.confidence,
+                'path': message.path
+            })
+
+            module['total_messages'] += 1
+            category['total'] += 1
+
+        data['avg_mccabe_complexity'] = self.avg_mccabe_complexity
+        data['repository_name'] = self.repository_name
+
+        return data
+
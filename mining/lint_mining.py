@@ -1,20 +1,56 @@
+import configparser
+import hashlib
+import importlib
 import logging
+import os
+import threading
 from datetime import datetime
+from functools import partial
 from io import StringIO
 from pathlib import Path
+from typing import Callable, Iterator
 
+from astroid import MANAGER, __version__ as astroid_version
+from astroid.inference_tip import clear_inference_tip_cache
 from git import Repo
-from pylint.lint import Run
+from pylint import __version__ as pylint_version
+from pylint.lint import PyLinter, Run
 from pylint.message import Message, MessageIdStore
 from pylint.reporters.text import TextReporter
 from pylint.reporters.ureports.nodes import Section
+from pylint.utils import FileState, LinterStats
 from rich.progress import (
     Progress,
 )
 
-from utility import config, util
+from data_io import result_store, worktree_management
+from mining import ast_lint, guards, records
+from mining.lint_messages import LintMessages, LintTables
+from utility import config, skips, telemetry, util
 from utility.progress_bars import IterableProgressWrapper
 
+try:
+    from astroid.context import _invalidate_cache
+except ImportError:
+    # A private function of astroid, without which _evict_modules clears the whole astroid cache.
+    _invalidate_cache = None
+
+
+def _import_plugins():
+    """
+    Import the Pylint plugins of PYLINT_CONFIG up front. Pylint imports them on every run, and runs in parallel threads
+    can otherwise see a partially initialized plugin module.
+    """
+
+    parser = configparser.ConfigParser()
+    parser.read(config.PYLINT_CONFIG)
+    for plugin in parser.get('MAIN', 'load-plugins', fallback='').split(','):
+        if plugin.strip():
+            importlib.import_module(plugin.strip())
+
+
+_import_plugins()
+
 
 class LintReporter(TextReporter):
     """Custom Pylint reporter, collects linting messages and allows for further processing"""
@@ -30,71 +66,263 @@ class LintReporter(TextReporter):
         self.messages.append(msg)
 
 
+class LintSession:
+    """
+    A Pylint linter that is kept between the commits linted by a thread. The configuration and the checkers are
+    loaded on the first commit, and only the state of a run is reset for the next ones. The ASTs of the files that
+    did not change since the previous commit are kept in the astroid cache, see _evict_modules.
+    """
+
+    def __init__(self):
+        self.options: list[str] | None = None
+        self.linter: PyLinter | None = None
+
+    def run(self, repository_path: Path, reporter: LintReporter) -> PyLinter:
+        """Lints a repository and passes the messages to the reporter, returns the linter with the stats of the run."""
+
+        options = _pylint_options()
+        if self.linter is None or options != self.options:
+            self.options = options
+            self.linter = Run([str(repository_path), *options], reporter=reporter, exit=False).linter
+            return self.linter
+
+        linter = self.linter
+        linter.set_reporter(reporter)
+        linter.stats = LinterStats()
+        # A new Run records the configuration as modules, before the linted modules, see _config_initialization.
+        for module in (str(config.PYLINT_CONFIG), 'Command line', 'Command line or configuration file'):
+            linter.stats.init_single_module(module)
+        linter.file_state = FileState('', linter.msgs_store, is_base_filestate=True)
+        linter.msg_status = 0
+        linter.check([str(repository_path)])
+        linter.generate_reports()
+        return linter
+
+
+_sessions = threading.local()
+
+
+def _lint_session() -> LintSession:
+    """Returns the lint session of the current thread."""
+
+    if not hasattr(_sessions, 'session'):
+        _sessions.session = LintSession()
+    return _sessions.session
+
+
 def mine_lint_data(repo_paths_with_commit_metadata: dict[str, list[tuple[str, datetime]]],
-                   progress: Progress) -> dict[str, any]:
-    """Mine lint data from the commits of multiple git repositories"""
+                   progress: Progress,
+                   sink: Callable[[str, dict[str, any], str], None] | None = None) -> dict[str, any]:
+    """
+    Mine lint data from the commits of multiple git repositories.
+
+    If a sink is given, the data of each repository is passed to it in batches of config.SNAPSHOT_BATCH_SIZE commits
+    together with the hash of the last processed commit, instead of being collected and returned.
+    """
+
+    data = {util.get_repo_name_from_url_or_path(repo_path): {} for repo_path in repo_paths_with_commit_metadata}
+    data.update(records.collect_commits(iter_lint_data(repo_paths_with_commit_metadata, progress),
+                                        sink,
+                                        config.SNAPSHOT_BATCH_SIZE))
+    return data
+
+
+def iter_lint_data(repo_paths_with_commit_metadata: dict[str, list[tuple[str, datetime]]],
+                   progress: Progress) -> Iterator[records.CommitRecord]:
+    """Mine lint data from the commits of multiple git repositories, yielding a record as each commit is linted."""
 
-    data = {}
     for repo_path, commit_metadata in IterableProgressWrapper(repo_paths_with_commit_metadata.items(),
                                                               progress,
                                                               description="Mining lint data",
                                                               postfix="Repos"):
-        data[util.get_repo_name_from_url_or_path(repo_path)] = _mine_commit_data(Path(repo_path),
-                                                                                 commit_metadata,
-                                                                                 progress)
-
-    return data
+        yield from _iter_commit_data(Path(repo_path), commit_metadata, progress)
 
 
-def _mine_commit_data(repo_path: Path,
+def _iter_commit_data(repo_path: Path,
                       commit_metadata: [tuple[str, datetime]],
-                      progress: Progress) -> dict[str, any]:
+                      progress: Progress) -> Iterator[records.CommitRecord]:
     """Mines lint data from the commits of a repository"""
 
-    data = {}
-    repo = Repo(repo_path)
-    for commit_hash, date in IterableProgressWrapper(commit_metadata,
-                                                     progress,
-                                                     description=util.get_repo_name_from_url_or_path(repo_path),
-                                                     postfix='Commits'):
+    repo_name = util.get_repo_name_from_url_or_path(repo_path)
+    tables = LintTables()
+    previous_commit = None
+    guard = guards.commit_guard()
+    store_fingerprint = _store_fingerprint()
+    with worktree_management.snapshot_worktree(repo_path) as checkout_path:
+        repo = Repo(checkout_path)
+        checkout_prefix = _checkout_prefix(checkout_path)
+        # The data refers to the files of the repository, not to those of the worktree they were linted in.
+        repo_prefix = _checkout_prefix(repo_path)
+        try:
+            with telemetry.span('checkout', repo_name) as checkout_span, \
+                    telemetry.span('pylint', repo_name) as pylint_span:
+                for commit_hash, date in IterableProgressWrapper(commit_metadata,
+                                                                 progress,
+                                                                 description=repo_name,
+                                                                 postfix='Commits'):
+
+                    with checkout_span.timing():
+                        tree = result_store.tree_key(repo, commit_hash)
+                    stored = result_store.get('lint', repo_name, tree, store_fingerprint)
+                    if stored is not None:
+                        # The commit is neither checked out nor linted, so the previous commit stays the last linted.
+                        lint_data = {'messages': stored['messages'].with_tables(tables, partial(
+                                         _relocate, old_prefix=STORED_CHECKOUT_PREFIX, new_prefix=repo_prefix)),
+                                     'stats': _relocate_stats(stored['stats'], STORED_CHECKOUT_PREFIX, repo_prefix),
+                                     'date': date}
+                        pylint_span.add('commits')
+                        pylint_span.add('stored')
+                        yield records.CommitRecord(repo_name, commit_hash, lint_data)
+                        continue
+
+                    with checkout_span.timing():
+                        # Ensure the repo is in a clean state
+                        repo.git.reset('--hard')
+                        repo.git.clean('-fdx')
+
+                        repo.git.checkout(commit_hash)
+                        guards.guard_files(repo, commit_hash, 'lint')
+                        # Only the Pylint backend keeps the ASTs of a repository between its commits.
+                        changed_files = None
+                        if config.LINT_BACKEND == 'pylint' and previous_commit is not None:
+                            changed_files = repo.git.diff('--name-only', '--no-renames', previous_commit,
+                                                          commit_hash).splitlines()
+                        previous_commit = commit_hash
+                    checkout_span.add('commits')
+
+                    with pylint_span.timing():
+                        try:
+                            lint_data = guards.run_guarded(guard, _lint_commit, checkout_path, commit_hash,
+                                                           changed_files, None if guard is not None else tables)
+                        except guards.CommitBudgetExceeded as exceeded:
+                            skips.record('lint', repo_name, commit_hash, str(exceeded))
+                            pylint_span.add('skipped')
+                            lint_data = None
+                            # The next worker starts without the ASTs of this repository.
+                            previous_commit = None
+                    pylint_span.add('commits')
+
+                    if lint_data is not None:
+                        result_store.put('lint', repo_name, tree, store_fingerprint, {
+                            'messages': lint_data['messages'].with_tables(LintTables(), partial(
+                                _relocate, old_prefix=checkout_prefix, new_prefix=STORED_CHECKOUT_PREFIX)),
+                            'stats': _relocate_stats(lint_data['stats'], checkout_prefix, STORED_CHECKOUT_PREFIX)
+                        })
+                        # The messages of a guarded commit are interned in the tables of the worker process.
+                        if guard is not None or checkout_prefix != repo_prefix:
+                            lint_data['messages'] = lint_data['messages'].with_tables(tables, partial(
+                                _relocate, old_prefix=checkout_prefix, new_prefix=repo_prefix))
+                            lint_data['stats'] = _relocate_stats(lint_data['stats'], checkout_prefix, repo_prefix)
+                        pylint_span.add('files', len(lint_data['stats'].get('by_module', {})))
+                        pylint_span.add('statements', lint_data['stats'].get('statement', 0))
+                        lint_data['date'] = date
+
+                    yield records.CommitRecord(repo_name, commit_hash, lint_data)
+        finally:
+            # The next repository linted by this thread does not need the modules of this one.
+            if guard is None or guard.running:
+                guards.run_guarded(guard, _evict_modules, checkout_path)
+            repo.close()
+
+
+# The start of the paths of the stored messages, in place of the checkout of the repository that they were linted in.
+STORED_CHECKOUT_PREFIX = '<checkout>/'
+
+
+def _store_fingerprint() -> str:
+    """Returns the fingerprint of the settings and versions that the lint results of a commit depend on."""
+
+    with open(config.PYLINT_CONFIG, 'rb') as file:
+        rcfile = hashlib.sha1(file.read()).hexdigest()
+    return result_store.fingerprint('lint', config.LINT_BACKEND, rcfile, pylint_version, astroid_version)
+
+
+def _checkout_prefix(checkout_path: Path) -> str:
+    """Returns the start of the paths of the messages of the files of a checkout, as both lint backends show them."""
+
+    return os.path.join(os.path.abspath(checkout_path), '').replace(os.getcwd() + os.sep, '', 1)
+
+
+def _relocate(path: str, old_prefix: str, new_prefix: str) -> str:
+    """Replaces the start of a path, if it starts with the old prefix."""
+
+    return new_prefix + path[len(old_prefix):] if path.startswith(old_prefix) else path
+
+
+def _relocate_stats(stats: dict[str, any], old_prefix: str, new_prefix: str) -> dict[str, any]:
+    """Returns the stats with the start of the modules of by_module that are named by their path replaced."""
+
+    if 'by_module' not in stats:
+        return stats
+
+    by_module = {_relocate(module, old_prefix, new_prefix): module_stats
+                 for module, module_stats in stats['by_module'].items()}
+    return {**stats, 'by_module': by_module}
+
+
+def _lint_commit(repository_path: Path,
+                 commit: str,
+                 changed_files: list[str] | None,
+                 tables: LintTables | None) -> dict[str, any] | None:
+    """
+    Lints the checked out commit of a repository with the backend of config.LINT_BACKEND. The Pylint backend first
+    evicts the modules of the files changed since the previous commit, or all modules of the repository if not given.
+    """
+
+    if config.LINT_BACKEND == 'pylint':
+        _evict_modules(repository_path, changed_files)
+    return LINT_BACKENDS[config.LINT_BACKEND](repository_path, commit, tables)
 
-        # Ensure the repo is in a clean state
-        repo.git.reset('--hard')
-        repo.git.clean('-fdx')
 
-        repo.git.checkout(commit_hash)
-        lint_data = _run_pylint(repo_path, commit_hash)
+def _evict_modules(repository_path: Path, files: list[str] | None = None):
+    """
+    Removes the modules of a repository from the astroid cache, only those of the given files if any, together with
+    the module lookups made from the repository and the inference caches that may refer to the removed modules.
 
-        if lint_data is not None:
-            data[commit_hash] = lint_data
-            data[commit_hash]['date'] = date
+    The lookups and the inference context are private caches of astroid. If this version of astroid does not have
+    them, its whole cache is cleared instead, so that every commit is linted from scratch.
+    """
 
-    return data
+    if files is not None and len(files) == 0:
+        return
 
+    mod_file_cache = getattr(MANAGER, '_mod_file_cache', None)
+    if _invalidate_cache is None or not isinstance(mod_file_cache, dict):
+        MANAGER.clear_cache()
+        return
 
-def _run_pylint(repository_path: Path, commit: str) -> dict[str, any] | None:
-    """Runs Pylint on Python files"""
+    root = os.path.join(os.path.abspath(repository_path), '')
+    paths = None if files is None else {os.path.abspath(repository_path / file) for file in files}
 
-    data = {}
+    for name, module in list(MANAGER.astroid_cache.items()):
+        path = os.path.abspath(module.file) if module.file else None
+        if path is not None and path.startswith(root) and (paths is None or path in paths):
+            MANAGER.astroid_cache.pop(name, None)
 
-    out = StringIO()
-    reporter = LintReporter(output=out)
+    # Files that were added or removed change the outcome of imports, which are cached per importing file.
+    for key, value in list(mod_file_cache.items()):
+        location = getattr(value, 'location', None)
+        if (key[1] or '').startswith(root) or (location or '').startswith(root):
+            mod_file_cache.pop(key, None)
 
-    escaped_chars = [f'\\{char}' if char in {'.', '^', '$', '*', '+', '?', '{', '}', '[', ']', '\\', '|', '(', ')'}
-                     else char for char in config.IGNORE_STARTSWITH]
+    clear_inference_tip_cache()
+    _invalidate_cache()
 
-    re_ignore = r'.*[/\\]' + r'[' + r'|'.join(escaped_chars) + r']' + r'.*[/\\].*$'
 
-    pylint_options = [
-        str(repository_path),
-        f'--rcfile={config.PYLINT_CONFIG}',
-        f'--ignore={",".join(util.generate_dir_name_variations(config.IGNORE_DIRECTORIES))}',
-        f"--ignore-paths={re_ignore}",
-    ]
+def _run_pylint(repository_path: Path, commit: str, tables: LintTables | None = None) -> dict[str, any] | None:
+    """
+    Runs Pylint on Python files. The messages are interned in the given tables, which are shared by the commits of a
+    repository.
+    """
 
-    run = Run(pylint_options, reporter=reporter, exit=False)
+    data = {}
 
-    stats = run.linter.stats
+    out = StringIO()
+    reporter = LintReporter(output=out)
+
+    linter = _lint_session().run(repository_path, reporter)
+
+    stats = linter.stats
     if not isinstance(stats, dict):
         stats_dict = {str(attr): getattr(stats, attr) for attr in dir(stats) if
                       not attr.startswith('__') and not callable(getattr(stats, attr))}
@@ -103,45 +331,50 @@ def _run_pylint(repository_path: Path, commit: str) -> dict[str, any] | None:
 
     repo_name = util.get_repo_name_from_url_or_path(str(repository_path))
 
-    data['messages'] = _parse_pylint_messages(reporter.messages, commit)
-    data['messages']['repository_name'] = repo_name
+    data['messages'] = _parse_pylint_messages(reporter.messages, commit, repo_name,
+                                              tables if tables is not None else LintTables())
 
-    stats_dict = _append_message_ids(stats_dict, run.linter.msgs_store.message_id_store)
+    stats_dict = _append_message_ids(stats_dict, linter.msgs_store.message_id_store)
 
     data['stats'] = stats_dict
-    data['stats']['avg_mccabe_complexity'] = data['messages']['avg_mccabe_complexity']
+    data['stats']['avg_mccabe_complexity'] = data['messages'].avg_mccabe_complexity
     data['stats']['repository_name'] = repo_name
 
     return data
 
 
-def _parse_pylint_messages(messages: list[Message], commit: str) -> dict[str, any]:
-    """Parses Pylint Messages and returns them in a formatted dictionary using strings"""
+# The lint backends by name, selected with config.LINT_BACKEND. A backend lints the checked out commit of a repository
+# and returns its messages and the stats keys of Pylint, or None if the commit cannot be linted.
+LINT_BACKENDS: dict[str, Callable[[Path, str, LintTables], dict[str, any] | None]] = {
+    'pylint': _run_pylint,
+    'ast': ast_lint.lint_repository,
+}
 
-    data = {}
-    for msg in messages:
-        module = msg.module
-        if module not in data:
-            data[module] = {'total_messages': 0, 'categories': {}}
-
-        category = msg.category
-        if category not in data[module]['categories']:
-            data[module]['categories'][category] = {'total': 0, 'message_ids': {}}
-
-        msg_id = msg.msg_id
-        if msg_id not in data[module]['categories'][category]['message_ids']:
-            data[module]['categories'][category]['message_ids'][msg_id] = []
-        data[module]['categories'][category]['message_ids'][msg_id].append({
-            'symbol': msg.symbol,
-            'msg': msg.msg,
-            'confidence': msg.confidence,
-            'path': msg.path
-        })
-
-        data[module]['total_messages'] += 1
-        data[module]['categories'][category]['total'] += 1
-
-    data['avg_mccabe_complexity'] = _calculate_avg_mccabe_complexity(messages)
+
+def _pylint_options() -> list[str]:
+    """Returns the Pylint options of the current configuration."""
+
+    escaped_chars = [f'\\{char}' if char in {'.', '^', '$', '*', '+', '?', '{', '}', '[', ']', '\\', '|', '(', ')'}
+                     else char for char in config.IGNORE_STARTSWITH]
+
+    re_ignore = r'.*[/\\]' + r'[' + r'|'.join(escaped_chars) + r']' + r'.*[/\\].*$'
+
+    pylint_options = [
+        f'--rcfile={config.PYLINT_CONFIG}',
+        '--load-plugins=mining.duplicate_index',
+        f'--ignore={",".join(util.generate_dir_name_variations(config.IGNORE_DIRECTORIES))}',
+        f"--ignore-paths={re_ignore}",
+    ]
+    if config.PYLINT_JOBS is not None:
+        pylint_options.append(f'--jobs={config.PYLINT_JOBS}')
+
+    return pylint_options
+
+
+def _parse_pylint_messages(messages: list[Message], commit: str, repo_name: str, tables: LintTables) -> LintMessages:
+    """Parses Pylint Messages into compact messages, whose strings are interned in the tables of the repository"""
+
+    data = LintMessages.from_messages(messages, tables, repo_name, _calculate_avg_mccabe_complexity(messages))
 
     logging.info(f"{commit}: {len(messages)} Pylint messages\n")
 
@@ -0,0 +1,117 @@
+"""
+This module contains the records that the miners yield as they mine, and the functions that collect them into the
+nested dicts of the dict-returning miners or pass them on to the sinks in batches.
+
+The iter_* miners yield a record as soon as a commit, a repository or a page of stargazers is mined, so the data can
+be written while the mining continues and the memory use does not grow with the chunk size or the history length.
+"""
+
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+Record = TypeVar('Record')
+
+
+class CommitRecord(NamedTuple):
+    """The lint or test data of a commit of a repository. The data is None if the commit could not be mined."""
+
+    repo_name: str
+    commit_hash: str
+    data: dict[str, any] | None
+
+
+class RepoRecord(NamedTuple):
+    """The git data or metadata of a repository."""
+
+    repo_name: str
+    data: dict[str, any]
+
+
+class StargazersPage(NamedTuple):
+    """A page of the stargazers of a repository, as edges of the GraphQL API. The last page of a repository is empty."""
+
+    repo_name: str
+    edges: list[dict[str, any]]
+    last: bool
+
+
+def collect_commits(records: Iterable[CommitRecord],
+                    sink: Callable[[str, dict[str, any], str], None] | None = None,
+                    batch_size: int | None = None) -> dict[str, dict[str, any]]:
+    """
+    Collects commit records into a dict of repositories and the data of their commits.
+
+    If a sink is given, the commits of each repository are instead passed to it in batches of batch_size commits,
+    together with the hash of the last commit of the batch. Commits without data count towards the batch size, so
+    that the sink can record how far the mining has come.
+    """
+
+    data = {}
+    batch = {}
+    batch_commits = 0
+    last_record = None
+    for record in records:
+        if sink is not None and last_record is not None and record.repo_name != last_record.repo_name and batch_commits:
+            sink(last_record.repo_name, batch, last_record.commit_hash)
+            batch, batch_commits = {}, 0
+
+        data.setdefault(record.repo_name, {})
+        if record.data is not None:
+            (batch if sink is not None else data[record.repo_name])[record.commit_hash] = record.data
+        batch_commits += 1
+        last_record = record
+
+        if sink is not None and batch_commits == batch_size:
+            sink(record.repo_name, batch, record.commit_hash)
+            batch, batch_commits = {}, 0
+
+    if sink is not None and batch_commits:
+        sink(last_record.repo_name, batch, last_record.commit_hash)
+
+    return data
+
+
+def collect_repos(records: Iterable[RepoRecord]) -> dict[str, dict[str, any]]:
+    """Collects repository records into a dict of repositories and their data."""
+
+    return {record.repo_name: record.data for record in records}
+
+
+def group_stargazers(pages: Iterable[StargazersPage]) -> Iterator[RepoRecord]:
+    """
+    Groups the pages of stargazers of each repository into a record with the response shape of the GraphQL API.
+    The stargazers of a repository whose pages stopped early, because of the rate limit, are yielded as well.
+    """
+
+    repo_name = None
+    edges = []
+    for page in pages:
+        if repo_name is not None and page.repo_name != repo_name:
+            yield _stargazers_record(repo_name, edges)
+            edges = []
+
+        repo_name = page.repo_name
+        edges.extend(page.edges)
+        if page.last:
+            yield _stargazers_record(repo_name, edges)
+            repo_name, edges = None, []
+
+    if repo_name is not None:
+        yield _stargazers_record(repo_name, edges)
+
+
+def batched(records: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    """Groups records into lists of at most size records."""
+
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _stargazers_record(repo_name: str, edges: list[dict[str, any]]) -> RepoRecord:
+    return RepoRecord(repo_name, {'data': {'repository': {'stargazers': {'edges': edges}, 'name': repo_name}}})
@@ -1,221 +1,390 @@
 import ast
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain, repeat
 from pathlib import Path
+from typing import Callable, Iterator, NamedTuple
 
 from git import Repo
 from rich.progress import (
     Progress
 )
 
-from utility import config, util
+from data_io import result_store, worktree_management
+from mining import guards, records
+from utility import config, skips, telemetry, util
 from utility.progress_bars import IterableProgressWrapper
 
 
-class StatementVisitor(ast.NodeVisitor):
-    """Used to find unit-testing imports and count test/production statements in a Python file"""
+# The kinds of nodes that StatementVisitor counts, by their type.
+_IMPORT, _CLASS, _FUNCTION, _STATEMENT = range(4)
+_KINDS: dict[type, int] = {
+    ast.Import: _IMPORT,
+    ast.ClassDef: _CLASS,
+    ast.FunctionDef: _FUNCTION,
+    ast.Assign: _STATEMENT,
+    ast.Call: _STATEMENT,
+    ast.Expr: _STATEMENT,
+}
+# The fields that hold no nodes, or only nodes without statements, such as the names of an import or the context of a
+# name. They are not walked.
+_SKIPPED_FIELDS = frozenset({'ctx', 'op', 'ops', 'names', 'kwd_attrs', 'type_ignores', 'name', 'id', 'attr', 'arg',
+                             'module', 'level', 'type_comment', 'kind', 'conversion', 'is_async', 'rest', 'tag'})
+# The fields that are walked per type of node, in reverse order, which are found on the first node of a type. Values
+# that are not nodes have no fields.
+_CHILD_FIELDS: dict[type, tuple[str, ...]] = {type(None): (), ast.Constant: ()}
+# Marks the end of the nodes in the context of a test, on the stack of StatementVisitor.
+_END_OF_TEST = object()
+
+
+class StatementVisitor:
+    """
+    Used to find unit-testing imports and count test/production statements in a Python file.
+
+    The tree is walked depth-first with a stack in the order of ast.NodeVisitor, and the nodes are dispatched on their
+    type. The nodes in a test class or test function are in the context of a test until the end marker that is pushed
+    below them is popped.
+    """
+
+    __slots__ = ('known_test_modules', 'test_imports', 'test_classes', 'test_functions', 'test_statements',
+                 'production_statements', 'in_test_context')
 
     def __init__(self):
         self.known_test_modules = ['unittest', 'pytest', 'nose2']
+        self.in_test_context = False
+        self.reset()
+
+    def reset(self):
+        """Clears the names and counts of the previous file"""
+
         self.test_imports = []
         self.test_classes = []
         self.test_functions = []
         self.test_statements = 0
         self.production_statements = 0
-        self.in_test_context = False
 
-    def visit_Import(self, node):
-        """Parse an import"""
+    def visit(self, tree: ast.AST):
+        """Count the test and production statements of a tree, and collect its test imports, classes and functions"""
+
+        known_test_modules = self.known_test_modules
+        kinds = _KINDS
+        child_fields = _CHILD_FIELDS
+        test_statements = self.test_statements
+        production_statements = self.production_statements
+        in_test_context = self.in_test_context
+
+        stack = [tree]
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        while stack:
+            node = pop()
+            if node is _END_OF_TEST:
+                in_test_context = False
+                continue
+
+            node_type = node.__class__
+            kind = kinds.get(node_type)
+            if kind is _STATEMENT:
+                if in_test_context:
+                    test_statements += 1
+                else:
+                    production_statements += 1
+
+            elif kind is _IMPORT:
+                for alias in node.names:
+                    if alias.name in known_test_modules:
+                        test_statements += 1
+                        self.test_imports.append(alias.name)
+
+                    elif not in_test_context:
+                        production_statements += 1
+
+            elif kind is _CLASS:
+                for base in node.bases:
+                    if (base.__class__ is ast.Name and base.id == 'TestCase') or \
+                            (base.__class__ is ast.Attribute and base.attr == 'TestCase'):
+                        test_statements += 1
+                        self.test_classes.append(node.name)
+                        if not in_test_context:
+                            push(_END_OF_TEST)
+                            in_test_context = True
+                        break
+
+                else:
+                    if not in_test_context:
+                        production_statements += 1
+
+            elif kind is _FUNCTION:
+                if node.name.startswith('test_'):
+                    self.test_functions.append(node.name)
+                    test_statements += 1
+                    if not in_test_context:
+                        push(_END_OF_TEST)
+                        in_test_context = True
+
+                elif not in_test_context:
+                    production_statements += 1
+
+            fields = child_fields.get(node_type)
+            if fields is None:
+                fields = child_fields[node_type] = tuple(field for field in reversed(getattr(node_type, '_fields', ()))
+                                                         if field not in _SKIPPED_FIELDS)
+            for field in fields:
+                value = getattr(node, field, None)
+                if value.__class__ is list:
+                    extend(reversed(value))
+                elif value is not None:
+                    push(value)
+
+        self.test_statements = test_statements
+        self.production_statements = production_statements
+
+
+def mine_test_data(repo_paths_with_commit_metadata: dict[str, list[tuple[str, datetime]]],
+                   progress: Progress,
+                   sink: Callable[[str, dict[str, any], str], None] | None = None) -> dict[str, any]:
+    """
+    Mine unit-testing data from the commits of multiple git repositories.
+
+    If a sink is given, the data of each repository is passed to it in batches of config.SNAPSHOT_BATCH_SIZE commits
+    together with the hash of the last processed commit, instead of being collected and returned.
+    """
+
+    data = {util.get_repo_name_from_url_or_path(repo_path): {} for repo_path in repo_paths_with_commit_metadata}
+    data.update(records.collect_commits(iter_test_data(repo_paths_with_commit_metadata, progress),
+                                        sink,
+                                        config.SNAPSHOT_BATCH_SIZE))
+    return data
 
-        for alias in node.names:
-            if alias.name in self.known_test_modules:
-                self.test_statements += 1
-                self.test_imports.append(alias.name)
 
-            elif not self.in_test_context:
-                self.production_statements += 1
+def iter_test_data(repo_paths_with_commit_metadata: dict[str, list[tuple[str, datetime]]],
+                   progress: Progress) -> Iterator[records.CommitRecord]:
+    """Mine unit-testing data from the commits of multiple git repositories, yielding a record per mined commit."""
 
-        self.generic_visit(node)
+    for repo_path, commit_metadata in IterableProgressWrapper(repo_paths_with_commit_metadata.items(),
+                                                              progress,
+                                                              description="Mining test data",
+                                                              postfix="Repos"):
+        logging.info(f"\nMining test data: {repo_path}")
+        yield from _iter_commit_data(Path(repo_path), commit_metadata, progress)
 
-    def visit_ClassDef(self, node):
-        """Parse a class definition, set the context for coming visits"""
 
-        original_in_test_context = self.in_test_context
-        test_base_found = False
-        for base in node.bases:
-            if isinstance(base, ast.Name) and base.id == "TestCase":
-                test_base_found = True
-                break
+def _iter_commit_data(repo_path: Path,
+                      commit_metadata: [tuple[str, datetime]],
+                      progress: Progress) -> Iterator[records.CommitRecord]:
+    """Mines test data from the commits of a repository"""
 
-            elif isinstance(base, ast.Attribute) and base.attr == "TestCase":
-                test_base_found = True
-                break
+    repo_name = util.get_repo_name_from_url_or_path(repo_path)
+    store_fingerprint = result_store.fingerprint('test')
+    with worktree_management.snapshot_worktree(repo_path) as checkout_path, Repo(checkout_path) as repo, \
+            telemetry.span('checkout', repo_name) as checkout_span, telemetry.span('ast_parse', repo_name) as ast_span:
+        for commit_hash, date in IterableProgressWrapper(commit_metadata,
+                                                         progress,
+                                                         description=repo_name,
+                                                         postfix='Commits'):
+
+            with checkout_span.timing():
+                tree = result_store.tree_key(repo, commit_hash)
+            test_data = result_store.get('test', repo_name, tree, store_fingerprint)
+            if test_data is not None:
+                test_data['date'] = date
+                ast_span.add('commits')
+                ast_span.add('stored')
+                yield records.CommitRecord(repo_name, commit_hash, test_data)
+                continue
+
+            with checkout_span.timing():
+                # Ensure the repo is in a clean state
+                repo.git.reset('--hard')
+                repo.git.clean('-fdx')
+
+                repo.git.checkout(commit_hash)
+            checkout_span.add('commits')
+
+            with ast_span.timing():
+                try:
+                    test_data = _run_ast_mining(repo, commit_hash, progress, ast_span)
+                except guards.CommitBudgetExceeded as exceeded:
+                    skips.record('test', repo_name, commit_hash, str(exceeded))
+                    ast_span.add('skipped')
+                    test_data = None
+            ast_span.add('commits')
+
+            if test_data is not None:
+                result_store.put('test', repo_name, tree, store_fingerprint, test_data)
+                test_data['date'] = date
+
+            yield records.CommitRecord(repo_name, commit_hash, test_data)
+
+
+def _run_ast_mining(repo: Repo,
+                    commit: str,
+                    progress: Progress,
+                    span: telemetry.Span | None = None) -> dict[str, any] | None:
+    """
+    Runs AST mining on the Python files of the checked out commit of a repository, counting the parsed files and bytes
+    in the span if given. The files are named by their path in the repository, after the name of the repository.
+    The files are parsed in the worker of the commit guard of the thread, if the commits are mined with a budget.
+    """
+
+    repo_path = Path(repo.working_tree_dir)
+    target_files = guards.guard_files(repo, commit, 'test')
+    if target_files is None or len(target_files) == 0:
+        logging.warning(f"\nThis commit has no Python files\n"
+                        f"Skipping commit: {commit}")
+        return None
 
-        if test_base_found:
-            self.test_statements += 1
-            self.test_classes.append(node.name)
-            self.in_test_context = True
+    logging.info(f'\n[{util.get_repo_name_from_url_or_path(repo_path)}]: {commit}\n'
+                 f'Mining {len(target_files)} Python files')
 
-        else:
-            if not self.in_test_context:
-                self.production_statements += 1
+    guard = guards.commit_guard()
+    # The progress of the files of a commit is not shown while they are parsed in a worker. The worker of a commit
+    # guard cannot start processes of its own, and parses the files of a commit by itself.
+    data, parsed_bytes = guards.run_guarded(guard, _mine_files, repo_path, target_files, commit,
+                                            progress if guard is None else None,
+                                            _parse_processes(len(target_files)) if guard is None else 1)
 
-        self.generic_visit(node)
-        self.in_test_context = original_in_test_context
+    if span is not None:
+        span.add('files', len(data['files']))
+        span.add('bytes', parsed_bytes)
 
-    def visit_FunctionDef(self, node):
-        """Parse a function definition"""
+    return data
 
-        original_in_test_context = self.in_test_context
-        if node.name.startswith('test_'):
-            self.test_functions.append(node.name)
-            self.test_statements += 1
-            self.in_test_context = True
 
-        else:
-            if not self.in_test_context:
-                self.production_statements += 1
+class ParsedFile(NamedTuple):
+    """The test data of a Python file, or the syntax error that it could not be parsed with."""
 
-        self.generic_visit(node)
-        self.in_test_context = original_in_test_context
+    file_name: str
+    imports: list[str]
+    unittest_classes: list[str]
+    pytest_functions: list[str]
+    production_statements: int
+    test_statements: int
+    size: int
+    error: str | None = None
 
-    def visit_Assign(self, node):
-        """Parse an assignment"""
 
-        if self.in_test_context:
-            self.test_statements += 1
-        else:
-            self.production_statements += 1
+def _mine_files(repo_path: Path,
+                target_files: list[str],
+                commit: str,
+                progress: Progress | None,
+                processes: int = 1) -> tuple[dict[str, any], int]:
+    """
+    Parses the given Python files of a repository, returns the test data of the commit and the bytes parsed. With more
+    than one process, the files are split into shards in their order, which are parsed in the parse pool and merged in
+    the same order.
+    """
 
-        self.generic_visit(node)
+    data = {
+        'files': {},
+        'test-to-code-ratio': 0.0
+    }
 
-    def visit_Call(self, node):
-        """Parse a function call"""
+    total_production_statements = 0
+    total_test_statements = 0
+    parsed_bytes = 0
+    if processes > 1:
+        shards = _parse_pool(processes).map(_mine_shard, repeat(repo_path), _shards(target_files, processes * 4))
+        parsed_files = chain.from_iterable(shards)
+    else:
+        visitor = StatementVisitor()
+        if progress is not None:
+            target_files = IterableProgressWrapper(target_files, progress, description=commit, postfix='Python Files')
+        parsed_files = (_mine_file(repo_path, file_name, visitor) for file_name in target_files)
+
+    for parsed in parsed_files:
+        relative_path = f'{repo_path.name}/{parsed.file_name}'
+        if parsed.error is not None:
+            logging.warning(f"\nTest Mining Syntax Error: "
+                            f"{relative_path}: \n[{parsed.error}]\n\nSkipping this file.\n")
 
-        if self.in_test_context:
-            self.test_statements += 1
-        else:
-            self.production_statements += 1
+            continue
 
-        self.generic_visit(node)
+        parsed_bytes += parsed.size
+        data['files'][relative_path] = {
+            'imports': parsed.imports,
+            'unittest_classes': parsed.unittest_classes,
+            'pytest_functions': parsed.pytest_functions,
+            'production_statements': parsed.production_statements,
+            'test_statements': parsed.test_statements
+        }
 
-    def visit_Expr(self, node):
-        """Parse an expression"""
+        total_test_statements += parsed.test_statements
+        total_production_statements += parsed.production_statements
 
-        if self.in_test_context:
-            self.test_statements += 1
-        else:
-            self.production_statements += 1
+    data['test-to-code-ratio'] = _calculate_test_to_code_ratio(total_test_statements,
+                                                               total_production_statements)
 
-        self.generic_visit(node)
+    return data, parsed_bytes
 
 
-def mine_test_data(repo_paths_with_commit_metadata: dict[str, list[tuple[str, datetime]]],
-                   progress: Progress) -> dict[str, any]:
-    """Mine unit-testing data from the commits of multiple git repositories"""
+def _mine_file(repo_path: Path, file_name: str, visitor: StatementVisitor) -> ParsedFile:
+    """Parses a Python file of a repository with the given visitor, which is reset first."""
 
-    data = {}
-    for repo_path, commit_metadata in IterableProgressWrapper(repo_paths_with_commit_metadata.items(),
-                                                              progress,
-                                                              description="Mining test data",
-                                                              postfix="Repos"):
-        logging.info(f"\nMining test data: {repo_path}")
-        data[util.get_repo_name_from_url_or_path(repo_path)] = _mine_commit_data(Path(repo_path),
-                                                                                 commit_metadata,
-                                                                                 progress)
+    path = repo_path / file_name
+    visitor.reset()
 
-    return data
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            tree = ast.parse(file.read())
+    except SyntaxError as e:
+        return ParsedFile(file_name, [], [], [], 0, 0, 0, str(e))
 
+    visitor.visit(tree)
+    return ParsedFile(file_name, visitor.test_imports, visitor.test_classes, visitor.test_functions,
+                      visitor.production_statements, visitor.test_statements, os.path.getsize(path))
 
-def _mine_commit_data(repo_path: Path,
-                      commit_metadata: [tuple[str, datetime]],
-                      progress: Progress) -> dict[str, any]:
-    """Mines test data from the commits of a repository"""
 
-    data = {}
-    repo = Repo(repo_path)
-    for commit_hash, date in IterableProgressWrapper(commit_metadata,
-                                                     progress,
-                                                     description=util.get_repo_name_from_url_or_path(repo_path),
-                                                     postfix='Commits'):
+def _mine_shard(repo_path: Path, file_names: list[str]) -> list[ParsedFile]:
+    """Parses a shard of the Python files of a commit in a process of the parse pool."""
 
-        # Ensure the repo is in a clean state
-        repo.git.reset('--hard')
-        repo.git.clean('-fdx')
+    visitor = StatementVisitor()
+    return [_mine_file(repo_path, file_name, visitor) for file_name in file_names]
 
-        repo.git.checkout(commit_hash)
-        test_data = _run_ast_mining(repo_path, commit_hash, progress)
 
-        if test_data is not None:
-            data[commit_hash] = test_data
-            data[commit_hash]['date'] = date
+def _shards(file_names: list[str], count: int) -> list[list[str]]:
+    """Splits the files of a commit into at most count shards of consecutive files of about the same size."""
 
-    return data
+    size = -(-len(file_names) // count)
+    return [file_names[start:start + size] for start in range(0, len(file_names), size)]
 
 
-def _run_ast_mining(repo_path: Path,
-                    commit: str,
-                    progress: Progress) -> dict[str, any] | None:
-    """Runs AST mining on Python files"""
+def _parse_processes(file_count: int) -> int:
+    """
+    Returns the number of processes that parse the files of a commit, config.AST_PARSE_PROCESSES from
+    config.AST_PARSE_THRESHOLD files on and one otherwise.
+    """
 
-    target_files = util.get_python_files_from_directory(repo_path,
-                                                        config.IGNORE_DIRECTORIES,
-                                                        config.IGNORE_STARTSWITH)
-    if target_files is None or len(target_files) == 0:
-        logging.warning(f"\nThis commit has no Python files\n"
-                        f"Skipping commit: {commit}")
-        return None
+    if config.AST_PARSE_PROCESSES is None or file_count < config.AST_PARSE_THRESHOLD:
+        return 1
+    return config.AST_PARSE_PROCESSES or os.cpu_count() or 1
 
-    data = {
-        'files': {},
-        'test-to-code-ratio': 0.0
-    }
 
-    logging.info(f'\n[{util.get_repo_name_from_url_or_path(repo_path)}]: {commit}\n'
-                 f'Mining {len(target_files)} Python files')
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_processes = 0
 
-    total_production_statements = 0
-    total_test_statements = 0
-    visitor = StatementVisitor()
-    for path in IterableProgressWrapper(target_files,
-                                        progress,
-                                        description=commit,
-                                        postfix='Python Files'):
-
-        visitor.test_imports = []
-        visitor.test_classes = []
-        visitor.test_functions = []
-        visitor.test_statements = 0
-        visitor.production_statements = 0
-
-        try:
-            with open(path, 'r', encoding='utf-8') as file:
-
-                relative_path = util.absolute_repos_to_relative(path)
-                tree = ast.parse(file.read())
-                visitor.visit(tree)
-
-                data['files'][relative_path] = {
-                    'imports': visitor.test_imports,
-                    'unittest_classes': visitor.test_classes,
-                    'pytest_functions': visitor.test_functions,
-                    'production_statements': visitor.production_statements,
-                    'test_statements': visitor.test_statements
-                }
-
-                total_test_statements += visitor.test_statements
-                total_production_statements += visitor.production_statements
-
-        except SyntaxError as e:
-            logging.warning(f"\nTest Mining Syntax Error: "
-                            f"{relative_path}: \n[{e}]\n\nSkipping this file.\n")
 
-            continue
+def _parse_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Returns the pool of spawned processes that parse the files of large commits, which is shared by the threads of
+    this process. A pool with another number of processes, or a pool whose process was killed, is replaced.
+    """
 
-    data['test-to-code-ratio'] = _calculate_test_to_code_ratio(total_test_statements,
-                                                               total_production_statements)
+    global _pool, _pool_processes
 
-    return data
+    with _pool_lock:
+        if _pool is None or _pool_processes != processes or _pool._broken:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+            _pool_processes = processes
+        return _pool
 
 
 def _calculate_test_to_code_ratio(test_statements: float, production_statements: float) -> float:
@@ -1,43 +1,39 @@
 """This module provides the main entry point for the PyCIRAS application and the main mining functionality."""
 
+import argparse
+import asyncio
+import json
 import logging
 import time
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
-import rich.traceback
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TaskProgressColumn,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
-)
-
-from data_io import data_management, repo_management
-from data_io.database_management import DatabaseManager
-from mining import git_mining, lint_mining, test_mining
-from utility import config, logger_setup, ntfyer, util
-from utility.progress_bars import IterableColumn
+from mining import records
+from utility import config, profiling, skips, telemetry, util
 from utility.timer import timed
 
-rich.traceback.install()
-data_directory = data_management.make_data_directory()
-logger, rich_console = logger_setup.get_logger('pyciras_logger')
-progress = Progress(
-    SpinnerColumn(),
-    TextColumn('[bold blue]{task.description}', justify='right'),
-    BarColumn(bar_width=None),
-    IterableColumn(),
-    TaskProgressColumn(),
-    TimeRemainingColumn(),
-    TimeElapsedColumn(),
-    console=rich_console,
-    disable=util.config.DISABLE_PROGRESS_BARS
-)
+# The miners, the sinks and their dependencies are imported on first use, so that importing this module is fast.
+checkpoint_management = util.lazy_import('data_io.checkpoint_management')
+data_management = util.lazy_import('data_io.data_management')
+database_management = util.lazy_import('data_io.database_management')
+repo_management = util.lazy_import('data_io.repo_management')
+result_store = util.lazy_import('data_io.result_store')
+work_queue = util.lazy_import('data_io.work_queue')
+git_mining = util.lazy_import('mining.git_mining')
+lint_mining = util.lazy_import('mining.lint_mining')
+test_mining = util.lazy_import('mining.test_mining')
+logger_setup = util.lazy_import('utility.logger_setup')
+ntfyer = util.lazy_import('utility.ntfyer')
+
+# Set up by _init_run when the first run starts.
+data_directory: Path | None = None
+logger: logging.Logger | None = None
+rich_console = None
+progress = None
+clone_strategy: str | None = 'full'
 
 
 def run_repo_cloner(repo_urls: list[str] = None,
@@ -59,6 +55,9 @@ def run_repo_cloner(repo_urls: list[str] = None,
         None. The cloned repositories are saved in a predefined directory.
     """
 
+    global clone_strategy
+
+    _init_run()
     with progress:
 
         start_time = time.time()
@@ -71,15 +70,20 @@ def run_repo_cloner(repo_urls: list[str] = None,
                 'Please provide a list of repository URLs or a file that is not empty.')
             return
 
+        clone_strategy = config.CLONE_STRATEGY if config.CLONE_STRATEGY != 'auto' else 'full'
+        telemetry.configure(data_directory / 'telemetry.jsonl')
+        skips.configure(data_directory / 'skipped.jsonl')
+
         logging.info(f'\nCloning {len(repo_urls)} repositories')
 
         logging.info(f"Cloning will run with the current settings:"
-                     f"\n - chunk_size={chunk_size}, multiprocessing={multiprocessing}\n\n"
+                     f"\n - chunk_size={chunk_size}, multiprocessing={multiprocessing}"
+                     f"\n - clone_strategy={clone_strategy}\n\n"
                      f"\nLog directory\n{config.LOGGING_FOLDER}\n"
                      f"\nRepositories direvtory\n{config.REPOSITORIES_FOLDER}\n\n")
 
         _process_chunk(repo_urls,
-                       pyciras_functions=[_clone_repos],
+                       pyciras_functions=[_clone_chunk],
                        stargazers=False,
                        metadata=False,
                        chunk_size=chunk_size,
@@ -88,6 +92,8 @@ def run_repo_cloner(repo_urls: list[str] = None,
 
         duration = util.format_duration(time.time() - start_time)
 
+        telemetry.log_summary(rich_console)
+
         ntfyer.ntfy(data=f'PyCIRAS cloning completed! Cloned {len(repo_urls)} repos in the duration of: {duration}',
                     title='PyCIRAS cloning Completed')
 
@@ -102,7 +108,9 @@ def run_mining(repo_urls: list[str] = None,
                metadata: bool = True,
                lint: bool = True,
                test: bool = True,
-               git: bool = True):
+               git: bool = True,
+               resume_from: str | None = None,
+               prefetch: int = 0):
     """
     Executes a series of mining operations on a given list of repository URLs to analyze their code quality,
     testing practices, and other characteristics.
@@ -126,6 +134,10 @@ def run_mining(repo_urls: list[str] = None,
         lint (bool, optional): Enables or disables linting analysis. Defaults to True.
         test (bool, optional): Enables or disables testing analysis. Defaults to True.
         git (bool, optional): Enables or disables Git history analysis. Defaults to True.
+        resume_from (str, optional): Name of an existing data directory in the data folder to continue writing to.
+            Lint and test mining skip the commits recorded in its checkpoints. Defaults to None, a new directory.
+        prefetch (int, optional): Number of repositories to clone ahead in the background while the current chunk is
+            mined, limited by config.PREFETCH_DISK_BUDGET_MB. Defaults to 0, cloning inside the miners.
 
     Returns:
         None. Results of the mining operations are logged and saved in predefined directories.
@@ -136,6 +148,9 @@ def run_mining(repo_urls: list[str] = None,
         - Notifies the user upon completion of the mining process via a notification system if correctly configured.
     """
 
+    global clone_strategy
+
+    _init_run(resume_from)
     with progress:
         start_time = time.time()
         if repo_urls is None:
@@ -147,11 +162,21 @@ def run_mining(repo_urls: list[str] = None,
                 'Please provide a list of repository URLs or a file that is not empty.')
             return
 
+        if resume_from is not None:
+            logging.info(f'\nResuming mining in {data_directory}')
+
+        clone_strategy = repo_management.select_clone_strategy(git, lint, test)
+        telemetry.configure(data_directory / 'telemetry.jsonl')
+        skips.configure(data_directory / 'skipped.jsonl')
+        result_store.configure((config.RESULT_STORE_FOLDER or data_directory) / 'results.db'
+                               if config.USE_RESULT_STORE else None)
+        profiling.configure(data_directory / 'profiles')
+
         logging.info(f'\nMining {len(repo_urls)} repositories')
 
         logging.info(f"The analysis will run with the current settings:"
                      f"\n - chunk_size={chunk_size}, multiprocessing={multiprocessing}"
-                     f"\n - persist_repos={persist_repos}"
+                     f"\n - persist_repos={persist_repos}, prefetch={prefetch}, clone_strategy={clone_strategy}"
                      f"\n - stagazers={stargazers}"
                      f"\n - lint={lint}"
                      f"\n - test={test}"
@@ -160,32 +185,231 @@ def run_mining(repo_urls: list[str] = None,
                      f"\nLog directory\n{config.LOGGING_FOLDER}\n"
                      f"\nRepositories directory\n{config.REPOSITORIES_FOLDER}\n\n")
 
-        mining_functions = []
-        if git:
-            mining_functions.append(_mine_git)
-        if lint:
-            mining_functions.append(_mine_lint)
-        if test:
-            mining_functions.append(_mine_test)
-
         _process_chunk(repo_urls,
-                       mining_functions,
+                       _mining_functions(git, lint, test),
                        stargazers,
                        metadata,
                        chunk_size,
                        multiprocessing,
-                       persist_repos)
+                       persist_repos,
+                       prefetch)
 
         duration = util.format_duration(time.time() - start_time)
 
+        telemetry.log_summary(rich_console)
+        result_store.log_summary(rich_console)
+        profiling.write_report(config.PROFILE_TOP_N)
+
         ntfyer.ntfy(data=f'PyCIRAS mining completed! Analyzed {len(repo_urls)} repos in the duration of: {duration}',
                     title='PyCIRAS Mining Completed')
         logging.info(f"\nPyCIRAS Mining completed - Duration: {duration}.")
 
 
+def run_worker(queue_path: Path,
+               node: str | None = None,
+               chunk_size: int = 1,
+               multiprocessing: bool = False,
+               persist_repos: bool = True,
+               stargazers: bool = True,
+               metadata: bool = True,
+               lint: bool = True,
+               test: bool = True,
+               git: bool = True):
+    """
+    Runs a mining node, which claims repositories from a shared work queue until the queue is drained.
+
+    The node claims chunk_size repositories at a time with a lease, keeps the lease alive with heartbeats while it
+    mines them, and marks them as done in the queue. Repositories of nodes that stop are claimed again once their
+    leases expire. Each node writes to its own data directory, named after the queue and the node, and the data of all
+    nodes is combined with run_merge. Restarting a node with the same name continues in its data directory.
+
+    Parameters:
+        queue_path (Path): Path of the SQLite work queue, on a filesystem shared by the nodes. Repositories are added
+            to it with work_queue.WorkQueue.add, or python pyciras.py queue.
+        node (str, optional): Unique name of the node. Defaults to the host name and the process id.
+        chunk_size (int, optional): The number of repositories claimed and mined at a time. Defaults to 1.
+        multiprocessing (bool, optional): Enables or disables parallel mining of a chunk. Defaults to False.
+        persist_repos (bool, optional): If True, cloned repositories are kept. Defaults to True.
+        stargazers (bool, optional): Enable or disable the stargazers mining. Defaults to True.
+        metadata (bool, optional): Enable or disable the metadata mining. Defaults to True.
+        lint (bool, optional): Enables or disables linting analysis. Defaults to True.
+        test (bool, optional): Enables or disables testing analysis. Defaults to True.
+        git (bool, optional): Enables or disables Git history analysis. Defaults to True.
+
+    Returns:
+        None. The results are saved in the data directory of the node.
+    """
+
+    global clone_strategy
+
+    queue_path = Path(queue_path)
+    node = node or work_queue.default_node_name()
+    _init_run(f'{queue_path.stem}_{node}')
+    with progress:
+        start_time = time.time()
+        queue = work_queue.WorkQueue(queue_path)
+        queue.register_node(node, data_directory)
+
+        clone_strategy = repo_management.select_clone_strategy(git, lint, test)
+        telemetry.configure(data_directory / 'telemetry.jsonl')
+        skips.configure(data_directory / 'skipped.jsonl')
+        result_store.configure((config.RESULT_STORE_FOLDER or data_directory) / 'results.db'
+                               if config.USE_RESULT_STORE else None)
+        profiling.configure(data_directory / 'profiles')
+
+        logging.info(f'\nMining node {node} started on queue {queue_path}: {queue.counts()}'
+                     f'\n - chunk_size={chunk_size}, multiprocessing={multiprocessing}'
+                     f'\n - persist_repos={persist_repos}, clone_strategy={clone_strategy}'
+                     f'\n - stargazers={stargazers}, metadata={metadata}, lint={lint}, test={test}, git={git}\n'
+                     f'\nData directory\n{data_directory}\n')
+
+        mining_functions = _mining_functions(git, lint, test)
+        mined = 0
+        while True:
+            repo_urls = queue.claim(node, chunk_size)
+            if len(repo_urls) == 0:
+                if queue.is_drained():
+                    break
+                logging.debug(f'No pending repositories, waiting for the leases of other nodes')
+                time.sleep(config.QUEUE_POLL_SECONDS)
+                continue
+
+            try:
+                with work_queue.Heartbeat(queue, node, repo_urls):
+                    failed_urls = _process_chunk(repo_urls,
+                                                 mining_functions,
+                                                 stargazers,
+                                                 metadata,
+                                                 chunk_size=len(repo_urls),
+                                                 multiprocessing=multiprocessing,
+                                                 persist_repos=persist_repos)
+            except Exception as error:
+                logging.error(f'Error while mining {repo_urls} on node {node}', exc_info=True)
+                queue.fail(node, repo_urls, repr(error))
+                continue
+            except BaseException:
+                queue.release(node, repo_urls)
+                raise
+
+            if failed_urls:
+                logging.error(f'A miner failed on {failed_urls} on node {node}, see the log for the error')
+                queue.fail(node, failed_urls, f'A miner failed on node {node}, see its log')
+            done_urls = [url for url in repo_urls if url not in failed_urls]
+            queue.complete(node, done_urls)
+            mined += len(done_urls)
+
+        duration = util.format_duration(time.time() - start_time)
+
+        telemetry.log_summary(rich_console)
+        result_store.log_summary(rich_console)
+        profiling.write_report(config.PROFILE_TOP_N)
+
+        ntfyer.ntfy(data=f'PyCIRAS node {node} completed! Mined {mined} repos in the duration of: {duration}',
+                    title='PyCIRAS Node Completed')
+        logging.info(f"\nPyCIRAS node {node} completed - Mined {mined} repos, queue: {queue.counts()}, "
+                     f"Duration: {duration}.")
+
+
+def run_merge(queue_path: Path, name: str | None = None) -> Path:
+    """
+    Merges the data directories of the nodes of a work queue into one data directory.
+
+    Repositories that were mined by more than one node, because a lease expired, are deduplicated: each repository and
+    commit appears once in the merged data.
+
+    Parameters:
+        queue_path (Path): Path of the SQLite work queue that the nodes mined.
+        name (str, optional): Name of the merged data directory in the data folder. Defaults to the queue name with a
+            _merged suffix.
+
+    Returns:
+        Path: The merged data directory.
+    """
+
+    queue_path = Path(queue_path)
+    _init_run(name or f'{queue_path.stem}_merged')
+    with progress:
+        queue = work_queue.WorkQueue(queue_path)
+        counts = queue.counts()
+        if counts[work_queue.PENDING] > 0 or counts[work_queue.LEASED] > 0:
+            logging.warning(f'\nMerging a queue that is not drained: {counts}')
+
+        for node, node_directory in queue.nodes().items():
+            if not node_directory.is_dir():
+                logging.warning(f'\nData directory {node_directory} of node {node} does not exist, skipping it')
+                continue
+
+            logging.info(f'\nMerging the data of node {node} from {node_directory}')
+            data_management.merge_data_directory(node_directory, data_directory, progress)
+            if (node_directory / 'database.db').exists():
+                with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+                    dbm.merge_database(node_directory / 'database.db', progress)
+
+        logging.info(f'\nMerged the data of {len(queue.nodes())} nodes into {data_directory}')
+
+    return data_directory
+
+
+def _mining_functions(git: bool, lint: bool, test: bool) -> list[Callable[[list[str]], bool]]:
+    """ Returns the enabled miners that run on the chunks of repositories. """
+
+    mining_functions = []
+    if git:
+        mining_functions.append(_mine_git)
+    if lint:
+        mining_functions.append(_mine_lint)
+    if test:
+        mining_functions.append(_mine_test)
+
+    return mining_functions
+
+
+def _init_run(resume_from: str | None = None):
+    """
+    Set up the traceback handler, logging and progress bars on the first run, and the data directory of the run.
+    The data directory is created once per process and shared by later runs, unless a run resumes another directory.
+    """
+
+    global data_directory, logger, rich_console, progress
+
+    if progress is None:
+        import rich.traceback
+        from rich.progress import (
+            BarColumn,
+            Progress,
+            SpinnerColumn,
+            TaskProgressColumn,
+            TextColumn,
+            TimeElapsedColumn,
+            TimeRemainingColumn,
+        )
+
+        from utility.progress_bars import IterableColumn
+
+        rich.traceback.install()
+        logger, rich_console = logger_setup.get_logger('pyciras_logger')
+        progress = Progress(
+            SpinnerColumn(),
+            TextColumn('[bold blue]{task.description}', justify='right'),
+            BarColumn(bar_width=None),
+            IterableColumn(),
+            TaskProgressColumn(),
+            TimeRemainingColumn(),
+            TimeElapsedColumn(),
+            console=rich_console,
+            disable=util.config.DISABLE_PROGRESS_BARS
+        )
+
+    if resume_from is not None:
+        data_directory = data_management.make_data_directory(resume_from)
+    elif data_directory is None:
+        data_directory = data_management.make_data_directory()
+
+
 @timed
-def _mine_lint(repo_urls: list[str]):
-    """ Mine lint data from a list of repositories. """
+@profiling.profiled
+def _mine_lint(repo_urls: list[str]) -> bool:
+    """ Mine lint data from a list of repositories, returns whether it succeeded. """
 
     try:
         repo_paths = _clone_repos(repo_urls)
@@ -193,69 +417,98 @@ def _mine_lint(repo_urls: list[str]):
         repos_and_commit_metadata = repo_management.get_repo_paths_and_commit_metadata(config.REPOSITORIES_FOLDER,
                                                                                        repo_paths,
                                                                                        progress)
+        repos_and_commit_metadata = repo_management.sample_commits(repos_and_commit_metadata,
+                                                                   config.SNAPSHOT_SAMPLE_EVERY,
+                                                                   config.SNAPSHOT_MAX_COMMITS)
+        repos_and_commit_metadata = checkpoint_management.skip_processed_commits(data_directory,
+                                                                                 'lint',
+                                                                                 repos_and_commit_metadata)
         start_time = time.time()
 
         logging.info(f'\nMining Lint Data for {repo_urls}')
 
-        lint_data = lint_mining.mine_lint_data(repos_and_commit_metadata, progress)
-
-        if config.WRITE_DATABASE:
-            with DatabaseManager(data_directory / 'database.db') as dbm:
-                dbm.insert_lint_data(lint_data, progress)
-
-        if config.WRITE_JSON:
-            data_management.write_json(lint_data, data_directory / 'lint-raw.json', progress)
-
-        if config.WRITE_CSV:
-            data_management.lint_data_to_csv(lint_data, data_directory / 'lint.csv', progress)
+        records.collect_commits(lint_mining.iter_lint_data(repos_and_commit_metadata, progress),
+                                sink=_write_lint_data,
+                                batch_size=config.SNAPSHOT_BATCH_SIZE)
 
         duration = util.format_duration(time.time() - start_time)
         logging.info(f'\nMINE LINT COMPLETED'
                      f'\nRepo: {repo_urls} Duration: {duration}')
+        return True
 
     except Exception:
         repos = [util.get_repo_name_from_url_or_path(url) for url in repo_urls]
         logging.error(f'Error while linting repositories {repos}'
                       f'Skipping Mine Lint', exc_info=True)
-        return
+        return False
+
+
+@profiling.profiled
+def _write_lint_data(repo_name: str, commit_data: dict[str, any], last_commit: str):
+    """ Write a batch of lint data to the enabled outputs and record the checkpoint of the repository. """
+
+    lint_data = {repo_name: commit_data}
+
+    if config.WRITE_DATABASE:
+        with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+            dbm.insert_lint_data(lint_data, progress)
+
+    if config.WRITE_JSON:
+        data_management.append_json_lines(lint_data, data_directory / 'lint-raw.jsonl', progress)
+
+    if config.WRITE_CSV:
+        data_management.lint_data_to_csv(lint_data, data_directory / 'lint.csv', progress)
+
+    checkpoint_management.record_checkpoint(data_directory, 'lint', repo_name, last_commit)
 
 
 @timed
-def _mine_git(repo_urls: list[str]):
-    """ Mine git data from a list of repositories. """
+@profiling.profiled
+def _mine_git(repo_urls: list[str]) -> bool:
+    """ Mine git data from a list of repositories, returns whether it succeeded. """
 
     try:
+        _clone_repos(repo_urls)
 
         start_time = time.time()
 
         logging.info(f'\nMining Git Data for {repo_urls}')
 
-        git_data = git_mining.mine_git_data(config.REPOSITORIES_FOLDER, repo_urls, progress)
-
-        if config.WRITE_DATABASE:
-            with DatabaseManager(data_directory / 'database.db') as dbm:
-                dbm.insert_git_data(git_data, progress)
-
-        if config.WRITE_JSON:
-            data_management.write_json(git_data, data_directory / 'git-raw.json', progress)
-
-        if config.WRITE_CSV:
-            data_management.git_data_to_csv(git_data, data_directory / 'git.csv', progress)
+        for batch in records.batched(git_mining.iter_git_data(config.REPOSITORIES_FOLDER, repo_urls, progress),
+                                     config.REPOSITORY_BATCH_SIZE):
+            _write_git_data(records.collect_repos(batch))
 
         duration = util.format_duration(time.time() - start_time)
         logging.info(f'\nMINE GIT COMPLETED'
                      f'\nRepo: {repo_urls} Duration: {duration}')
+        return True
 
     except Exception:
         repos = [util.get_repo_name_from_url_or_path(url) for url in repo_urls]
         logging.error(f'Error while mining git repositories {repos}'
                       f'Skipping Mine Git', exc_info=True)
-        return
+        return False
+
+
+@profiling.profiled
+def _write_git_data(git_data: dict[str, any]):
+    """ Write a batch of git data to the enabled outputs. """
+
+    if config.WRITE_DATABASE:
+        with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+            dbm.insert_git_data(git_data, progress)
+
+    if config.WRITE_JSON:
+        data_management.write_json(git_data, data_directory / 'git-raw.json', progress)
+
+    if config.WRITE_CSV:
+        data_management.git_data_to_csv(git_data, data_directory / 'git.csv', progress)
 
 
 @timed
-def _mine_test(repo_urls: list[str]):
-    """ Mine test data from a list of repositories. """
+@profiling.profiled
+def _mine_test(repo_urls: list[str]) -> bool:
+    """ Mine test data from a list of repositories, returns whether it succeeded. """
 
     try:
         repo_paths = _clone_repos(repo_urls)
@@ -264,37 +517,56 @@ def _mine_test(repo_urls: list[str]):
                                                                                        repo_paths,
                                                                                        progress)
 
+        repos_and_commit_metadata = repo_management.sample_commits(repos_and_commit_metadata,
+                                                                   config.SNAPSHOT_SAMPLE_EVERY,
+                                                                   config.SNAPSHOT_MAX_COMMITS)
+        repos_and_commit_metadata = checkpoint_management.skip_processed_commits(data_directory,
+                                                                                 'test',
+                                                                                 repos_and_commit_metadata)
+
         start_time = time.time()
 
         logging.info(f'\nMining Test Data for {repo_urls}')
 
-        test_data = test_mining.mine_test_data(repos_and_commit_metadata, progress)
-
-        if config.WRITE_DATABASE:
-            with DatabaseManager(data_directory / 'database.db') as dbm:
-                dbm.insert_test_data(test_data, progress)
-
-        if config.WRITE_JSON:
-            data_management.write_json(test_data, data_directory / 'test-raw.json', progress)
-
-        if config.WRITE_CSV:
-            data_management.test_data_to_csv(test_data, data_directory / 'test.csv', progress)
+        records.collect_commits(test_mining.iter_test_data(repos_and_commit_metadata, progress),
+                                sink=_write_test_data,
+                                batch_size=config.SNAPSHOT_BATCH_SIZE)
 
         duration = util.format_duration(time.time() - start_time)
         logging.info(f'\nMINE TEST COMPLETED'
                      f'\nRepo: {repo_urls} Duration: {duration}')
+        return True
 
     except Exception:
         repos = [util.get_repo_name_from_url_or_path(url) for url in repo_urls]
         logging.error(f'Error while mining test data from repositories {repos}\n'
                       f'Skipping Mine Test', exc_info=True)
+        return False
 
-        return
+
+@profiling.profiled
+def _write_test_data(repo_name: str, commit_data: dict[str, any], last_commit: str):
+    """ Write a batch of test data to the enabled outputs and record the checkpoint of the repository. """
+
+    test_data = {repo_name: commit_data}
+
+    if config.WRITE_DATABASE:
+        with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+            dbm.insert_test_data(test_data, progress)
+
+    if config.WRITE_JSON:
+        data_management.append_json_lines(test_data, data_directory / 'test-raw.jsonl', progress)
+
+    if config.WRITE_CSV:
+        data_management.test_data_to_csv(test_data, data_directory / 'test.csv', progress)
+
+    checkpoint_management.record_checkpoint(data_directory, 'test', repo_name, last_commit)
 
 
 @timed
-def _mine_stargazers(repo_urls: list[str]):
-    """ Mine stargazers data from a list of repositories. """
+@profiling.profiled
+def _mine_stargazers(repo_urls: list[str]) -> bool:
+    """ Mine stargazers data from a list of repositories, returns whether it succeeded. """
 
     try:
 
@@ -302,32 +574,41 @@ def _mine_stargazers(repo_urls: list[str]):
 
         logging.info(f'\nMining Stargazers for {repo_urls}')
 
-        stargazers_data = git_mining.mine_stargazers_data(repo_urls, progress)
-
-        if config.WRITE_DATABASE:
-            with DatabaseManager(data_directory / 'database.db') as dbm:
-                dbm.insert_stargazers_data(stargazers_data, progress)
-
-        if config.WRITE_JSON:
-            data_management.write_json(stargazers_data, data_directory / 'stargazers-raw.json', progress)
-
-        if config.WRITE_CSV:
-            data_management.stargazers_data_to_csv(stargazers_data, data_directory / 'stargazers.csv', progress)
+        stargazers = records.group_stargazers(git_mining.iter_stargazers_data(repo_urls, progress))
+        for batch in records.batched(stargazers, config.REPOSITORY_BATCH_SIZE):
+            _write_stargazers_data(records.collect_repos(batch))
 
         duration = util.format_duration(time.time() - start_time)
         logging.info(f'\nMINE STARGAZERS COMPLETED'
                      f'\nRepo: {repo_urls} Duration: {duration}')
+        return True
 
     except Exception:
         repos = [util.get_repo_name_from_url_or_path(url) for url in repo_urls]
         logging.error(f'Error while fetching stargazer data for {repos}'
                       f'Skipping Mine Stargazers', exc_info=True)
-        return
+        return False
+
+
+@profiling.profiled
+def _write_stargazers_data(stargazers_data: dict[str, any]):
+    """ Write a batch of stargazers data to the enabled outputs. """
+
+    if config.WRITE_DATABASE:
+        with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+            dbm.insert_stargazers_data(stargazers_data, progress)
+
+    if config.WRITE_JSON:
+        data_management.write_json(stargazers_data, data_directory / 'stargazers-raw.json', progress)
+
+    if config.WRITE_CSV:
+        data_management.stargazers_data_to_csv(stargazers_data, data_directory / 'stargazers.csv', progress)
 
 
 @timed
-def _mine_metadata(repo_urls: list[str]):
-    """ Mine repo metadata from a list of repositories. """
+@profiling.profiled
+def _mine_metadata(repo_urls: list[str]) -> bool:
+    """ Mine repo metadata from a list of repositories, returns whether it succeeded. """
 
     try:
 
@@ -335,27 +616,34 @@ def _mine_metadata(repo_urls: list[str]):
 
         logging.info(f'\nMining Metadata for {repo_urls}')
 
-        metadata = git_mining.mine_repo_metadata(repo_urls, progress)
-
-        if config.WRITE_DATABASE:
-            with DatabaseManager(data_directory / 'database.db') as dbm:
-                dbm.insert_metadata(metadata, progress)
-
-        if config.WRITE_JSON:
-            data_management.write_json(metadata, data_directory / 'metadata-raw.json', progress)
-
-        if config.WRITE_CSV:
-            data_management.metadata_to_csv(metadata, data_directory / 'metadata.csv', progress)
+        for batch in records.batched(git_mining.iter_repo_metadata(repo_urls, progress), config.REPOSITORY_BATCH_SIZE):
+            _write_metadata(records.collect_repos(batch))
 
         duration = util.format_duration(time.time() - start_time)
         logging.info(f'\nMINE METADATA COMPLETED'
                      f'\nRepo: {repo_urls} Duration: {duration}')
+        return True
 
     except Exception:
         repos = [util.get_repo_name_from_url_or_path(url) for url in repo_urls]
         logging.error(f'Error while mining metadata data for repositories {repos}'
                       f'Skipping Mine Metadata', exc_info=True)
-        return
+        return False
+
+
+@profiling.profiled
+def _write_metadata(metadata: dict[str, any]):
+    """ Write a batch of metadata to the enabled outputs. """
+
+    if config.WRITE_DATABASE:
+        with database_management.DatabaseManager(data_directory / 'database.db') as dbm:
+            dbm.insert_metadata(metadata, progress)
+
+    if config.WRITE_JSON:
+        data_management.write_json(metadata, data_directory / 'metadata-raw.json', progress)
+
+    if config.WRITE_CSV:
+        data_management.metadata_to_csv(metadata, data_directory / 'metadata.csv', progress)
 
 
 @timed
@@ -366,7 +654,7 @@ def _clone_repos(repo_urls: list[str]) -> list[Path]:
 
     logging.info(f'\nCloning Repos: {repo_urls}')
 
-    repos = repo_management.clone_repos(config.REPOSITORIES_FOLDER, repo_urls, progress)
+    repos = repo_management.clone_repos(config.REPOSITORIES_FOLDER, repo_urls, progress, clone_strategy)
 
     duration = util.format_duration(time.time() - start_time)
     logging.info(f'\nCLONE REPOS COMPLETED'
@@ -375,67 +663,482 @@ def _clone_repos(repo_urls: list[str]) -> list[Path]:
     return repos
 
 
+def _clone_chunk(repo_urls: list[str]) -> bool:
+    """ Clone a chunk of repositories, returns whether every repository was cloned. """
+
+    return len(_clone_repos(repo_urls)) == len(repo_urls)
+
+
 def _process_chunk(repo_urls: list[str],
-                   pyciras_functions: list[Callable[..., list[Path] | None]],
+                   pyciras_functions: list[Callable[[list[str]], bool]],
                    stargazers: bool,
                    metadata: bool,
                    chunk_size: int = 1,
                    multiprocessing: bool = False,
-                   persist_repos: bool = True):
-    """ Processes repos in chunks. """
+                   persist_repos: bool = True,
+                   prefetch: int = 0) -> list[str]:
+    """
+    Processes repos in chunks, while the network miners (metadata and stargazers) run alongside the chunks.
+
+    The network miners mostly wait for the GraphQL API, so they run as asyncio tasks on batches of repositories, at
+    most NETWORK_CONCURRENCY at a time, while the CPU miners work through the chunks with at most MAX_WORKERS
+    repositories in parallel. The wall time is then close to the longer of the two instead of their sum.
+
+    Returns the repos that a miner failed on, which the miners log and skip.
+    """
 
     if stargazers is False and metadata is False and len(pyciras_functions) == 0:
         logging.error('At least one PyCIRAS function must be selected!')
-        return
+        return []
+
+    network_miners = ([_mine_metadata] if metadata else []) + ([_mine_stargazers] if stargazers else [])
+    failed_urls = util.run_coroutine(_orchestrate(repo_urls, network_miners, pyciras_functions, chunk_size,
+                                                  multiprocessing, persist_repos, prefetch))
+    return [url for url in repo_urls if url in failed_urls]
 
-    if metadata:
-        _mine_metadata(repo_urls)
 
-    if stargazers:
-        _mine_stargazers(repo_urls)
+async def _orchestrate(repo_urls: list[str],
+                       network_miners: list[Callable[[list[str]], bool]],
+                       pyciras_functions: list[Callable[[list[str]], bool]],
+                       chunk_size: int,
+                       multiprocessing: bool,
+                       persist_repos: bool,
+                       prefetch: int) -> set[str]:
+    """
+    Runs the network miners as tasks with their own concurrency limit, alongside the chunks of CPU miners. Returns the
+    repos that a miner failed on.
+    """
 
-    if len(pyciras_functions) != 0:
+    loop = asyncio.get_running_loop()
+    network_slots = asyncio.Semaphore(config.NETWORK_CONCURRENCY)
+
+    async def mine_network(miner: Callable[[list[str]], bool], urls: list[str]) -> list[str]:
+        async with network_slots:
+            succeeded = await loop.run_in_executor(executor, miner, urls)
+            return [] if succeeded else urls
+
+    # One thread per network slot, and one for the chunks, so that neither class of work waits for the other.
+    with ThreadPoolExecutor(max_workers=config.NETWORK_CONCURRENCY + 1, thread_name_prefix='orchestrator') as executor:
+        tasks = [mine_network(miner, urls)
+                 for miner in network_miners
+                 for urls in records.batched(repo_urls, config.REPOSITORY_BATCH_SIZE)]
+        if len(pyciras_functions) > 0:
+            tasks.append(loop.run_in_executor(executor, _process_chunks, repo_urls, pyciras_functions, chunk_size,
+                                              multiprocessing, persist_repos, prefetch))
+        return {url for failed_urls in await asyncio.gather(*tasks) for url in failed_urls}
+
+
+def _process_chunks(repo_urls: list[str],
+                    pyciras_functions: list[Callable[[list[str]], bool]],
+                    chunk_size: int,
+                    multiprocessing: bool,
+                    persist_repos: bool,
+                    prefetch: int) -> list[str]:
+    """
+    Runs the CPU miners on the repos chunk by chunk, cloning ahead if prefetch is enabled. Returns the repos that a
+    miner failed on.
+    """
+
+    if prefetch > 0:
+        logging.debug(f'Prefetching {prefetch} repositories ahead')
+        clone_context = repo_management.ClonePrefetcher(config.REPOSITORIES_FOLDER,
+                                                        repo_urls,
+                                                        progress,
+                                                        capacity=chunk_size + prefetch,
+                                                        disk_budget_mb=config.PREFETCH_DISK_BUDGET_MB,
+                                                        strategy=clone_strategy)
+    else:
+        clone_context = nullcontext()
+
+    failed_urls = []
+    with clone_context as prefetcher:
         for i in range(0, len(repo_urls), chunk_size):
             logging.debug(f'Processing repositories {i}-{i + chunk_size}')
             chunk_of_repos = repo_urls[i:i + chunk_size]
+            if prefetcher is not None:
+                prefetcher.wait_for(chunk_of_repos)
+
             if multiprocessing:
                 logging.debug(f'Processing in parallel')
-                _execute_in_parallel(args_list=[(pyciras_functions, [repo]) for repo in chunk_of_repos])
+                failed_urls += _execute_in_parallel(args_list=[(pyciras_functions, [repo]) for repo in chunk_of_repos],
+                                                    on_done=lambda urls: _finish_repos(urls, persist_repos, prefetcher))
             else:
                 logging.debug(f'Processing sequentially')
+                succeeded = True
                 for function in pyciras_functions:
                     logging.debug(f'Running {str(function.__name__)}')
-                    function(chunk_of_repos)
-            if not persist_repos:
-                logging.debug(f'Deleting Repos')
-                repo_management.remove_repos(chunk_of_repos)
+                    succeeded &= function(chunk_of_repos)
+                if not succeeded:
+                    failed_urls += chunk_of_repos
+                _finish_repos(chunk_of_repos, persist_repos, prefetcher)
+
+    return failed_urls
+
+
+def _finish_repos(repo_urls: list[str],
+                  persist_repos: bool,
+                  prefetcher: 'repo_management.ClonePrefetcher | None'):
+    """ Removes repos that every function is done with, unless they are persisted, and releases them. """
 
+    if not persist_repos:
+        logging.debug(f'Deleting Repos')
+        repo_management.remove_repos(repo_urls)
 
-def _execute_in_parallel(args_list: list):
-    """ Executes a function in parallel with arguments. """
+    if prefetcher is not None:
+        prefetcher.release(repo_urls)
+
+
+def _execute_in_parallel(args_list: list, on_done: Callable[[list[str]], None] | None = None) -> list[str]:
+    """ Executes a function in parallel with arguments. Returns the repos that a function failed on. """
 
     def run_all(pyricas_functions, urls):
-        result = {}
+        succeeded = True
         for function in pyricas_functions:
-            result[str(function.__name__)] = function(urls)
-        return result
+            succeeded &= function(urls)
+        if on_done is not None:
+            on_done(urls)
+        return [] if succeeded else urls
+
+    with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as pool:
+        futures = [pool.submit(run_all, *args) for args in args_list]
+
+    return [url for future in futures for url in future.result()]
+
+
+RUN_CONFIG_FILE = 'run_config.json'
+MINERS = ['git', 'lint', 'test', 'stargazers', 'metadata']
+SINKS = ['db', 'json', 'csv']
+# The command-line options that override a setting in config.py.
+CONFIG_OPTIONS = {
+    'workers': 'MAX_WORKERS',
+    'network_concurrency': 'NETWORK_CONCURRENCY',
+    'clone_strategy': 'CLONE_STRATEGY',
+    'mirror_cache': 'USE_MIRROR_CACHE',
+    'prepare': 'PREPARE_REPOSITORIES',
+    'repositories_dir': 'REPOSITORIES_FOLDER',
+    'mirror_dir': 'MIRROR_FOLDER',
+    'data_dir': 'DATA_FOLDER',
+    'logs_dir': 'LOGGING_FOLDER',
+    'worktree_dir': 'SNAPSHOT_WORKTREE_FOLDER',
+    'worktree_limit_mb': 'SNAPSHOT_WORKTREE_LIMIT_MB',
+    'disk_budget_mb': 'PREFETCH_DISK_BUDGET_MB',
+    'batch_size': 'SNAPSHOT_BATCH_SIZE',
+    'sample_every': 'SNAPSHOT_SAMPLE_EVERY',
+    'max_commits': 'SNAPSHOT_MAX_COMMITS',
+    'lint_jobs': 'PYLINT_JOBS',
+    'lint_backend': 'LINT_BACKEND',
+    'parse_processes': 'AST_PARSE_PROCESSES',
+    'commit_timeout': 'COMMIT_TIMEOUT_SECONDS',
+    'commit_memory_mb': 'COMMIT_MEMORY_LIMIT_MB',
+    'result_store': 'USE_RESULT_STORE',
+    'result_store_dir': 'RESULT_STORE_FOLDER',
+    'lease_seconds': 'QUEUE_LEASE_SECONDS',
+    'heartbeat_seconds': 'QUEUE_HEARTBEAT_SECONDS',
+    'max_attempts': 'QUEUE_MAX_ATTEMPTS',
+    'poll_seconds': 'QUEUE_POLL_SECONDS',
+}
+
+
+def main(argv: list[str] | None = None):
+    """
+    Command-line entry point, see python pyciras.py {clone,mine,resume,queue,worker,merge} --help for the options.
+
+    The options override the settings of config.py for the run, and are recorded in run_config.json in the data
+    directory. Resuming a run applies its recorded options again, options given to resume take precedence.
+    """
+
+    parser = _build_parser()
+    args = vars(parser.parse_args(argv))
+    command = args.pop('command')
+
+    if command == 'queue':
+        _manage_queue(args)
+        return
+
+    if command == 'merge':
+        _apply_config(args)
+        run_merge(args['queue'], args['name'])
+        return
+
+    resume_from = None
+    if command == 'resume':
+        resume_from = args.pop('name')
+        recorded = _read_run_config(parser, Path(args.get('data_dir', config.DATA_FOLDER)) / resume_from)
+        defaults = vars(parser.parse_args(['mine']))
+        defaults.pop('command')
+        args = {**defaults, **recorded['arguments'], **args}
+
+    _validate(parser, command, args)
+    _apply_config(args)
+
+    if command == 'worker':
+        args['node'] = args['node'] or work_queue.default_node_name()
+        _init_run(f'{args["queue"].stem}_{args["node"]}')
+        _write_run_config(command, args)
+        run_worker(args['queue'],
+                   node=args['node'],
+                   chunk_size=args['chunk_size'],
+                   multiprocessing=args['workers'] > 1,
+                   persist_repos=not args['delete_repos'],
+                   stargazers='stargazers' in args['miners'],
+                   metadata='metadata' in args['miners'],
+                   lint='lint' in args['miners'],
+                   test='test' in args['miners'],
+                   git='git' in args['miners'])
+        return
+
+    _init_run(resume_from)
+    _write_run_config(command, args)
+
+    repo_urls = util.get_repository_urls_from_file(args['repos'])
+    if command == 'clone':
+        run_repo_cloner(repo_urls=repo_urls,
+                        chunk_size=args['chunk_size'],
+                        multiprocessing=args['workers'] > 1)
+        return
+
+    run_mining(repo_urls=repo_urls,
+               chunk_size=args['chunk_size'],
+               multiprocessing=args['workers'] > 1,
+               persist_repos=not args['delete_repos'],
+               stargazers='stargazers' in args['miners'],
+               metadata='metadata' in args['miners'],
+               lint='lint' in args['miners'],
+               test='test' in args['miners'],
+               git='git' in args['miners'],
+               resume_from=resume_from,
+               prefetch=args['prefetch'])
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """ Builds the parser of the command-line interface. """
+
+    parser = argparse.ArgumentParser(prog='pyciras',
+                                     description='PyCIRAS: Python Code Insight and Repository Analysis System. '
+                                                 'Options that are not given fall back to utility/config.py.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    clone = commands.add_parser('clone', help='clone repositories in advance')
+    _add_arguments(clone, mining=False)
+
+    mine = commands.add_parser('mine', help='mine repositories into a new data directory')
+    _add_arguments(mine, mining=True)
+
+    resume = commands.add_parser('resume', help='continue an interrupted run in its data directory')
+    resume.add_argument('name', help='name of the data directory of the run, in the data folder or --data-dir')
+    _add_arguments(resume, mining=True, defaults=False)
+
+    queue = commands.add_parser('queue', help='add repositories to a work queue shared by mining nodes, and show its '
+                                              'progress')
+    queue.add_argument('queue', type=Path, help='path of the SQLite work queue, on a filesystem shared by the nodes')
+    queue.add_argument('--add', type=Path, metavar='REPOS', help='file with repository URLs to add to the queue')
+    queue.add_argument('--requeue-failed', action='store_true', help='return the failed repositories to the queue')
+
+    worker = commands.add_parser('worker', help='mine repositories from a work queue until it is drained')
+    worker.add_argument('queue', type=Path, help='path of the SQLite work queue')
+    worker.add_argument('--node', help='unique name of the node (default: host name and process id)')
+    _add_arguments(worker, mining=True, worker=True)
+
+    merge = commands.add_parser('merge', help='merge the data directories of the nodes of a work queue')
+    merge.add_argument('queue', type=Path, help='path of the SQLite work queue')
+    merge.add_argument('--name', help='name of the merged data directory (default: the queue name with _merged)')
+    merge.add_argument('--data-dir', type=Path, help='where the data directories are')
+    merge.add_argument('--logs-dir', type=Path, help='where logs are written')
+
+    return parser
+
+
+def _add_arguments(parser: argparse.ArgumentParser, mining: bool, defaults: bool = True, worker: bool = False):
+    """
+    Adds the options of a command. Without defaults, only the given options are set, which resume relies on. Workers
+    take their repositories from a queue, and get the options of the queue instead of those of the repository list.
+    """
+
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
+
+    runs = parser.add_argument_group('run')
+    if not worker:
+        runs.add_argument('--repos', type=Path, default=default(config.REPOSITORY_URLS),
+                          help='file with one repository URL per line (default: %(default)s)')
+    runs.add_argument('--chunk-size', type=_positive_int, default=default(1),
+                      help='repositories per chunk (default: %(default)s)')
+    runs.add_argument('--workers', type=_positive_int, default=default(1),
+                      help='repositories mined in parallel within a chunk, at most the chunk size (default: '
+                           '%(default)s, sequential)')
+    runs.add_argument('--network-concurrency', type=_positive_int, default=default(None),
+                      help='batches of repositories mined by the metadata and stargazers miners at the same time')
+
+    clones = parser.add_argument_group('cloning')
+    clones.add_argument('--clone-strategy', choices=['auto', 'full', 'blobless', 'treeless', 'snapshot'],
+                        default=default(None))
+    clones.add_argument('--mirror-cache', action=argparse.BooleanOptionalAction, default=default(None),
+                        help='clone from persistent bare mirrors')
+    clones.add_argument('--prepare', action=argparse.BooleanOptionalAction, default=default(None),
+                        help='write commit-graph and bitmap indexes')
+
+    locations = parser.add_argument_group('locations')
+    for option, help_text in [('--repositories-dir', 'where repositories are cloned to'),
+                              ('--mirror-dir', 'where the mirror cache is kept'),
+                              ('--data-dir', 'where data directories are created'),
+                              ('--logs-dir', 'where logs are written'),
+                              ('--worktree-dir', 'where lint and test mining check out commits, such as /dev/shm'),
+                              ('--result-store-dir', 'where the lint and test results are stored between runs')]:
+        locations.add_argument(option, type=Path, default=default(None), help=help_text)
+
+    if not mining:
+        return
+
+    mines = parser.add_argument_group('mining')
+    mines.add_argument('--miners', nargs='+', choices=MINERS, default=default(MINERS),
+                       help='miners to run (default: all)')
+    mines.add_argument('--sinks', nargs='+', choices=SINKS, default=default(None),
+                       help='outputs to write (default: WRITE_DATABASE, WRITE_JSON and WRITE_CSV)')
+    mines.add_argument('--delete-repos', action='store_true', default=default(False),
+                       help='delete repositories once they are mined')
+    if not worker:
+        mines.add_argument('--prefetch', type=_non_negative_int, default=default(0),
+                           help='repositories cloned ahead in the background (default: %(default)s)')
+        mines.add_argument('--disk-budget-mb', type=_positive_int, default=default(None),
+                           help='disk space that prefetched repositories may use')
+    mines.add_argument('--worktree-limit-mb', type=_positive_int, default=default(None),
+                       help='largest size of the Python files of a repository that is mined in --worktree-dir')
+    mines.add_argument('--batch-size', type=_positive_int, default=default(None),
+                       help='commits per write of the lint and test miners, which bounds their memory')
+    mines.add_argument('--sample-every', type=_positive_int, default=default(None),
+                       help='lint and test only every nth commit, counting back from the latest')
+    mines.add_argument('--max-commits', type=_positive_int, default=default(None),
+                       help='lint and test at most this many commits per repository, evenly spaced')
+    mines.add_argument('--lint-jobs', type=_non_negative_int, default=default(None),
+                       help='Pylint processes per commit, 0 for one per CPU')
+    mines.add_argument('--lint-backend', choices=['pylint', 'ast'], default=default(None),
+                       help='lint with Pylint, or with the faster syntax tree checks without inference')
+    mines.add_argument('--parse-processes', type=_non_negative_int, default=default(None),
+                       help='processes that parse the Python files of large commits for test mining, 0 for one per '
+                            'CPU')
+    mines.add_argument('--commit-timeout', type=_positive_int, default=default(None),
+                       help='seconds that linting or test mining a commit may take before it is skipped')
+    mines.add_argument('--commit-memory-mb', type=_positive_int, default=default(None),
+                       help='memory that linting or test mining a commit may use before it is skipped')
+    mines.add_argument('--result-store', action=argparse.BooleanOptionalAction, default=default(None),
+                       help='reuse the lint and test results of commits with a tree that was mined before')
+
+    if not worker:
+        return
+
+    queues = parser.add_argument_group('queue')
+    queues.add_argument('--lease-seconds', type=_positive_int, default=None,
+                        help='seconds the claimed repositories are held without a heartbeat')
+    queues.add_argument('--heartbeat-seconds', type=_positive_int, default=None,
+                        help='seconds between the heartbeats of the node')
+    queues.add_argument('--max-attempts', type=_positive_int, default=None,
+                        help='claims of a repository before it is marked as failed')
+    queues.add_argument('--poll-seconds', type=_positive_int, default=None,
+                        help='seconds an idle node waits for the leases of other nodes to expire')
+
+
+def _validate(parser: argparse.ArgumentParser, command: str, args: dict[str, any]):
+    """ Checks the combination of options, exiting with a usage error if they are invalid. """
+
+    if command != 'worker' and not Path(args['repos']).is_file():
+        parser.error(f'repository file {args["repos"]} does not exist')
+
+    if args['workers'] > args['chunk_size']:
+        parser.error(f'--workers {args["workers"]} is larger than --chunk-size {args["chunk_size"]}, '
+                     f'at most one chunk of repositories is mined in parallel')
+
+    if command == 'clone':
+        return
+
+    if command == 'worker':
+        if args['heartbeat_seconds'] is not None and args['heartbeat_seconds'] >= (args['lease_seconds'] or
+                                                                                   config.QUEUE_LEASE_SECONDS):
+            parser.error('--heartbeat-seconds must be shorter than the lease')
+        return
+
+    if args['disk_budget_mb'] is not None and args['prefetch'] == 0:
+        parser.error('--disk-budget-mb only applies with --prefetch')
+
+
+def _apply_config(args: dict[str, any]):
+    """ Overrides the settings of config.py with the given options. """
+
+    for option, setting in CONFIG_OPTIONS.items():
+        value = args.get(option)
+        if value is not None:
+            setattr(config, setting, Path(value) if setting.endswith('_FOLDER') else value)
+
+    if args.get('sinks') is not None:
+        config.WRITE_DATABASE = 'db' in args['sinks']
+        config.WRITE_JSON = 'json' in args['sinks']
+        config.WRITE_CSV = 'csv' in args['sinks']
+
+
+def _manage_queue(args: dict[str, any]):
+    """ Adds repositories to a work queue and requeues its failed repositories, then prints its progress. """
+
+    queue = work_queue.WorkQueue(args['queue'])
+    if args['add'] is not None:
+        repo_urls = util.get_repository_urls_from_file(args['add'])
+        print(f'Added {queue.add(repo_urls)} of {len(repo_urls)} repositories to {args["queue"]}')
+
+    if args['requeue_failed']:
+        print(f'Requeued {queue.requeue_failed()} failed repositories')
+
+    print(', '.join(f'{state}: {count}' for state, count in queue.counts().items()))
+    for node, node_directory in queue.nodes().items():
+        print(f'{node}: {node_directory}')
+
+
+def _read_run_config(parser: argparse.ArgumentParser, directory: Path) -> dict[str, any]:
+    """ Reads the recorded options of a run, exiting with a usage error if the data directory does not exist. """
+
+    if not directory.is_dir():
+        parser.error(f'data directory {directory} does not exist')
+
+    try:
+        with open(directory / RUN_CONFIG_FILE, 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'arguments': {}}
+
+
+def _write_run_config(command: str, args: dict[str, any]):
+    """ Records the options and the resulting settings of a run in its data directory. """
+
+    path = data_directory / RUN_CONFIG_FILE
+    run = {
+        'command': command,
+        'started_at': str(datetime.now()),
+        'arguments': args,
+        'config': {setting: getattr(config, setting) for setting in [*CONFIG_OPTIONS.values(),
+                                                                      'WRITE_DATABASE', 'WRITE_JSON', 'WRITE_CSV']},
+    }
+
+    if path.exists():
+        with open(path, 'r') as file:
+            run_config = json.load(file)
+        run_config.setdefault('resumes', []).append(run)
+    else:
+        run_config = run
+
+    with open(path, 'w') as file:
+        json.dump(run_config, file, indent=4, default=str)
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive number')
+    return number
+
 
-    with ThreadPoolExecutor() as pool:
-        for args in args_list:
-            pool.submit(run_all, *args)
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'{value} is a negative number')
+    return number
 
 
 if __name__ == '__main__':
-    run_repo_cloner(repo_urls=None,
-                    chunk_size=100,
-                    multiprocessing=True)
-
-    # run_mining(repo_urls=None,
-    #           chunk_size=1,
-    #           multiprocessing=False,
-    #           persist_repos=False,
-    #           stargazers=True,
-    #           metadata=True,
-    #           test=True,
-    #           git=True,
-    #           lint=True)
+    main()
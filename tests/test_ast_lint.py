@@ -0,0 +1,172 @@
+import sys
+import tempfile
+import textwrap
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from git import Repo
+from rich.progress import Progress
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from mining import ast_lint, lint_mining
+from utility import config
+
+SOURCE = '''
+    """A module with the definitions that the checks of the AST backend tell apart."""
+    import enum
+    import unittest
+    from typing import Final, TypeVar
+
+    try:
+        from json import loads
+    except ImportError:
+        loads = None
+
+    T = TypeVar('T')
+    limit = 10
+    LIMIT: Final = 10
+    foo = [value for value in range(3)]
+    Alias = None
+
+
+    class color(enum.Enum):
+        red = 1
+
+
+    class Shape:
+        sides = 0
+
+        def __init__(self, Width):
+            self.Width = Width
+            self.area = lambda height: Width * height
+
+        @property
+        def Size(self):
+            """The size."""
+            return self.Width
+
+        def Scale(self, factor):
+            """"""
+            Total = factor
+            for index in range(3):
+                if index > factor:
+                    Total += index
+                while Total > 100:
+                    Total //= 2
+            return Total
+
+
+    class ShapeTests(unittest.TestCase):
+
+        def setUp(self):
+            self.shape = Shape(1)
+
+        def test_scale(self):
+            def inner():
+                return [x for x in range(2) if x]
+            self.assertEqual(1, self.shape.Scale(1) if inner() else 0)
+
+
+    def _helper(bar, *args):
+        global limit
+        limit = bar
+        match args:
+            case [first, *rest] if first:
+                return rest
+            case _:
+                return None
+'''
+
+
+def _checked_messages(lint_data: dict[str, any]) -> Counter:
+    return Counter((message.module, message.kind.msg_id, message.line, message.msg)
+                   for message in lint_data['messages'] if message.kind.msg_id in ast_lint.MESSAGES)
+
+
+class AstLintTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _assert_same_as_pylint(self, repo_path: Path):
+        pylint_data = lint_mining._run_pylint(repo_path, 'HEAD')
+        ast_data = ast_lint.lint_repository(repo_path, 'HEAD')
+        pylint_stats, ast_stats = pylint_data['stats'], ast_data['stats']
+
+        self.assertEqual(set(pylint_stats), set(ast_stats))
+        for key in ['statement', 'node_count', 'undocumented', 'bad_names', 'avg_mccabe_complexity']:
+            self.assertEqual(pylint_stats[key], ast_stats[key], key)
+        self.assertEqual({module: stats['statement'] for module, stats in pylint_stats['by_module'].items()},
+                         {module: stats['statement'] for module, stats in ast_stats['by_module'].items()})
+        self.assertEqual(_checked_messages(pylint_data), _checked_messages(ast_data))
+
+    def test_matches_pylint_on_a_synthetic_repository(self):
+        """ Test that the AST backend gives the stats and messages of Pylint for its checks on a synthetic repo. """
+
+        self._assert_same_as_pylint(generate_repo(self.root / 'repo', RepoSpec(commits=1, files_per_commit=8, seed=3)))
+
+    def test_matches_pylint_on_naming_and_docstrings(self):
+        """ Test that the AST backend gives the messages of Pylint for constants, attributes, overrides and scopes. """
+
+        repo_path = self.root / 'repo'
+        (repo_path / 'package').mkdir(parents=True)
+        (repo_path / '__init__.py').write_text('')
+        (repo_path / 'package' / '__init__.py').write_text('')
+        (repo_path / 'package' / 'shapes.py').write_text(textwrap.dedent(SOURCE))
+        (repo_path / 'broken.py').write_text('def broken(:\n')
+        repo = Repo.init(repo_path)
+        repo.index.add(['__init__.py', 'package/__init__.py', 'package/shapes.py', 'broken.py'])
+        repo.index.commit('Add the package')
+
+        self._assert_same_as_pylint(repo_path)
+
+    def test_standard_library_bases_are_not_imported(self):
+        """ Test that the methods of standard library bases are found as Pylint does, without importing them. """
+
+        repo_path = self.root / 'repo'
+        repo_path.mkdir()
+        (repo_path / '__init__.py').write_text('')
+        (repo_path / 'pen.py').write_text(textwrap.dedent('''
+            import antigravity
+            import this
+            from turtle import Turtle
+
+
+            class Pen(Turtle):
+                def forward(self, distance):
+                    return distance
+
+                def Draw(self):
+                    return antigravity, this
+        '''))
+        repo = Repo.init(repo_path)
+        repo.index.add(['__init__.py', 'pen.py'])
+        repo.index.commit('Add the pen')
+
+        modules = set(sys.modules)
+        ast_lint._standard_library_methods.cache_clear()
+        self._assert_same_as_pylint(repo_path)
+        self.assertEqual(set(), {'antigravity', 'this', 'turtle', 'tkinter'} & (set(sys.modules) - modules))
+
+    def test_selected_per_run(self):
+        """ Test that the lint miner lints with the backend of LINT_BACKEND. """
+
+        repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=2, files_per_commit=2, seed=1))
+        commits = [(commit.hexsha, None) for commit in Repo(repo_path).iter_commits()]
+
+        with mock.patch.object(config, 'LINT_BACKEND', 'ast'), \
+                mock.patch.dict(lint_mining.LINT_BACKENDS, pylint=mock.Mock(side_effect=AssertionError)):
+            data = [record.data for record in lint_mining._iter_commit_data(repo_path, commits, Progress(disable=True))]
+
+        self.assertEqual(2, len(data))
+        self.assertTrue(all(lint_data['stats']['statement'] > 0 for lint_data in data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from data_io import checkpoint_management
+
+
+class CheckpointManagementTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.data_directory = Path(self.temporary_directory.name)
+        self.commit_metadata = [(f'hash{i}', datetime(2024, 1, i + 1)) for i in range(5)]
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_record_and_read_checkpoints(self):
+        """ Test that checkpoints are stored per miner and repository. """
+
+        checkpoint_management.record_checkpoint(self.data_directory, 'lint', 'repo_a', 'hash1')
+        checkpoint_management.record_checkpoint(self.data_directory, 'lint', 'repo_a', 'hash3')
+        checkpoint_management.record_checkpoint(self.data_directory, 'test', 'repo_b', 'hash2')
+
+        self.assertEqual({'repo_a': 'hash3'}, checkpoint_management.read_checkpoints(self.data_directory, 'lint'))
+        self.assertEqual({'repo_b': 'hash2'}, checkpoint_management.read_checkpoints(self.data_directory, 'test'))
+        self.assertEqual({}, checkpoint_management.read_checkpoints(self.data_directory, 'git'))
+
+    def test_skip_processed_commits(self):
+        """ Test that mining continues after the high-water mark, and from the start without one. """
+
+        checkpoint_management.record_checkpoint(self.data_directory, 'lint', 'repo_a', 'hash2')
+        repos = {
+            '/repos/repo_a': self.commit_metadata,
+            '/repos/repo_b': self.commit_metadata,
+        }
+
+        remaining = checkpoint_management.skip_processed_commits(self.data_directory, 'lint', repos)
+
+        self.assertEqual(self.commit_metadata[3:], remaining['/repos/repo_a'])
+        self.assertEqual(self.commit_metadata, remaining['/repos/repo_b'])
+
+    def test_skip_processed_commits_unknown_high_water_mark(self):
+        """ Test that all commits are mined if the recorded commit is no longer in the history. """
+
+        checkpoint_management.record_checkpoint(self.data_directory, 'test', 'repo_a', 'rewritten')
+        repos = {'/repos/repo_a': self.commit_metadata}
+
+        remaining = checkpoint_management.skip_processed_commits(self.data_directory, 'test', repos)
+
+        self.assertEqual(self.commit_metadata, remaining['/repos/repo_a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
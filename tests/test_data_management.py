@@ -0,0 +1,132 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from rich.progress import Progress
+
+from benchmarks import synthetic_payloads
+from data_io import data_management
+
+
+class MergeDataDirectoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.progress = Progress(disable=True)
+        self.nodes = [self.root / 'node_a', self.root / 'node_b']
+        self.target = self.root / 'merged'
+        for directory in [*self.nodes, self.target]:
+            directory.mkdir()
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _write(self, directory: Path, names: list[str], seed: int):
+        data_management.stargazers_data_to_csv(synthetic_payloads.stargazers_payload(names, 5, seed),
+                                               directory / 'stargazers.csv', self.progress)
+        data_management.git_data_to_csv(synthetic_payloads.git_payload(names, 5, 3, seed),
+                                        directory / 'git.csv', self.progress)
+        data_management.test_data_to_csv(synthetic_payloads.test_payload(names, 5, 3, seed),
+                                         directory / 'test.csv', self.progress)
+
+    def test_chunks_are_appended_to_the_stargazers_csv(self):
+        """ Test that the stargazers of later chunks are added to the stargazers CSV instead of replacing it. """
+
+        self._write(self.nodes[0], ['repo_a'], 0)
+        self._write(self.nodes[0], ['repo_b'], 1)
+
+        stargazers = pd.read_csv(self.nodes[0] / 'stargazers.csv')
+        self.assertEqual(['date', 'repo_a', 'repo_b'], list(stargazers.columns))
+        self.assertEqual([5, 5], stargazers[['repo_a', 'repo_b']].iloc[-1].tolist())
+
+    def test_nodes_are_merged_without_duplicates(self):
+        """ Test that the data of nodes is combined, with repositories mined by both nodes appearing once. """
+
+        self._write(self.nodes[0], ['repo_a', 'repo_b'], 0)
+        self._write(self.nodes[1], ['repo_b', 'repo_c'], 0)
+
+        for node in self.nodes:
+            data_management.merge_data_directory(node, self.target, self.progress)
+
+        git = pd.read_csv(self.target / 'git.csv')
+        self.assertEqual(['repo_a', 'repo_b', 'repo_c'], git['repo'].tolist())
+
+        test = pd.read_csv(self.target / 'test.csv')
+        self.assertEqual({'repo_a': 5, 'repo_b': 5, 'repo_c': 5}, test.groupby('repo').size().to_dict())
+
+        stargazers = pd.read_csv(self.target / 'stargazers.csv')
+        self.assertEqual(['date', 'repo_a', 'repo_b', 'repo_c'], list(stargazers.columns))
+        self.assertEqual([5, 5, 5], stargazers[['repo_a', 'repo_b', 'repo_c']].iloc[-1].tolist())
+
+
+class SnapshotBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.progress = Progress(disable=True)
+        self.node, self.target = self.root / 'node', self.root / 'merged'
+        for directory in [self.node, self.target]:
+            directory.mkdir()
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_batches_are_appended_and_deduplicated_when_merged(self):
+        """ Test that batches are appended to the CSV with new columns added, and deduplicated when merged. """
+
+        data_management.lint_data_to_csv(synthetic_payloads.lint_payload(['repo_b'], 1, 1, 0), self.node / 'lint.csv',
+                                         self.progress)
+        data_management.lint_data_to_csv(synthetic_payloads.lint_payload(['repo_b'], 1, 1, 0),
+                                         self.root / 'first.csv', self.progress)
+        for _ in range(2):
+            data_management.lint_data_to_csv(synthetic_payloads.lint_payload(['repo_a'], 4, 6, 1),
+                                             self.node / 'lint.csv', self.progress)
+        data_management.lint_data_to_csv(synthetic_payloads.lint_payload(['repo_a'], 4, 6, 1),
+                                         self.root / 'second.csv', self.progress)
+
+        first, second = pd.read_csv(self.root / 'first.csv'), pd.read_csv(self.root / 'second.csv')
+        lint = pd.read_csv(self.node / 'lint.csv')
+        self.assertEqual(1, (self.node / 'lint.csv').read_text().count('repo,date'))
+        self.assertEqual(9, len(lint))
+        self.assertEqual(set(first.columns) | set(second.columns), set(lint.columns))
+        self.assertGreater(len(set(second.columns) - set(first.columns)), 0)
+        self.assertTrue(lint.loc[0, list(set(second.columns) - set(first.columns))].isna().all())
+        pd.testing.assert_frame_equal(second, lint.loc[5:, second.columns].reset_index(drop=True),
+                                      check_dtype=False)
+
+        data_management.merge_data_directory(self.node, self.target, self.progress)
+        merged = pd.read_csv(self.target / 'lint.csv')
+        self.assertEqual(['repo_a'] * 4 + ['repo_b'], merged['repo'].tolist())
+        pd.testing.assert_frame_equal(second, merged.loc[:3, second.columns], check_dtype=False)
+
+    def test_json_lines_are_appended_and_deduplicated_when_merged(self):
+        """ Test that batches are appended as commit records, which appear once after merging, from the source. """
+
+        batches = [synthetic_payloads.test_payload(['repo_a'], 3, 2, 0),
+                   synthetic_payloads.test_payload(['repo_b'], 2, 2, 1)]
+        for batch in [batches[0], batches[1], batches[1]]:
+            data_management.append_json_lines(batch, self.node / 'test-raw.jsonl', self.progress)
+        updated = synthetic_payloads.test_payload(['repo_a'], 3, 2, 0)
+        commit_hash = next(iter(updated['repo_a']))
+        updated['repo_a'][commit_hash]['test-to-code-ratio'] = -1
+        data_management.append_json_lines(batches[0], self.target / 'test-raw.jsonl', self.progress)
+        data_management.append_json_lines({'repo_a': {commit_hash: updated['repo_a'][commit_hash]}},
+                                          self.node / 'test-raw.jsonl', self.progress)
+
+        self.assertEqual(8, len((self.node / 'test-raw.jsonl').read_text().splitlines()))
+        data_management.merge_data_directory(self.node, self.target, self.progress)
+
+        with open(self.target / 'test-raw.jsonl') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(5, len(records))
+        self.assertEqual(5, len({(record['repo'], record['commit_hash']) for record in records}))
+        ratios = {record['commit_hash']: record['data']['test-to-code-ratio'] for record in records}
+        self.assertEqual(-1, ratios[commit_hash])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from astroid import MANAGER
+from git import Repo
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from mining import duplicate_index, lint_mining
+
+
+def _duplicates(lint_data: dict[str, any]) -> tuple:
+    """The duplicate stats of lint data, and the files and line numbers of its duplicate-code messages."""
+
+    stats = lint_data['stats']
+    return (stats['nb_duplicated_lines'], round(stats['percent_duplicated_lines'], 9), stats['refactor'],
+            sorted('\n'.join(line for line in message.msg.split('\n') if line.startswith('=='))
+                   for message in lint_data['messages'] if message.kind.msg_id == 'R0801'))
+
+
+class DuplicateIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_matches_the_similarities_checker(self):
+        """ Test that the incremental checker gives the duplicate stats and messages of Pylint on every commit. """
+
+        repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=3, files_per_commit=4, seed=2))
+        repo = Repo(repo_path)
+        options = lint_mining._pylint_options
+        without_index = [option for option in options() if 'duplicate_index' not in option]
+
+        for commit in [commit.hexsha for commit in repo.iter_commits()][::-1]:
+            repo.git.checkout(commit)
+            lint_mining._evict_modules(repo_path)
+            incremental = lint_mining._run_pylint(repo_path, commit)
+
+            MANAGER.clear_cache()
+            with mock.patch.object(lint_mining, '_pylint_options', lambda: without_index), \
+                    mock.patch.object(lint_mining, '_lint_session', lint_mining.LintSession):
+                self.assertEqual(_duplicates(lint_mining._run_pylint(repo_path, commit)), _duplicates(incremental))
+        self.assertGreater(_duplicates(incremental)[0], 0)
+
+    def test_only_changed_files_are_hashed_and_compared(self):
+        """ Test that the windows and common lines of unchanged blobs are reused by the next run. """
+
+        body = ''.join(f'    value_{index} = argument * {index}\n' for index in range(8))
+        files = {name: f'def {name}(argument):\n{body}    return argument\n' for name in ['a', 'b', 'c']}
+        index = duplicate_index.DuplicateIndex()
+
+        def similarities(contents: dict[str, str]) -> int:
+            for name, content in contents.items():
+                if name not in index.windows:
+                    lines = content.splitlines(keepends=True)
+                    index.windows[name] = duplicate_index.hash_windows(
+                        lines, duplicate_index.stripped_lines(lines, True, True, True, True), 4)
+            result = index.similarities(list(contents), 4)
+            index.retain(set(contents))
+            return sum(lines * (len(couples) - 1) for lines, couples in result)
+
+        self.assertEqual(9, similarities(files))
+        self.assertEqual({('a', 'b'), ('a', 'c'), ('b', 'c')}, set(index.commons))
+
+        with mock.patch.object(duplicate_index, 'common_lines', wraps=duplicate_index.common_lines) as common_lines:
+            files['d'] = files.pop('c').replace('value_', 'other_')
+            self.assertEqual(9, similarities(files))
+
+        self.assertEqual(0, common_lines.call_count)
+        self.assertEqual({('a', 'b')}, set(index.commons))
+
+
+if __name__ == '__main__':
+    unittest.main()
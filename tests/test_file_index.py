@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from git import Repo
+
+from utility import file_index
+
+
+class FileIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.repo_path = Path(self.temporary_directory.name) / 'repo'
+        self.repo = Repo.init(self.repo_path)
+
+    def tearDown(self):
+        self.repo.close()
+        self.temporary_directory.cleanup()
+
+    def _commit(self, files: dict[str, str]) -> str:
+        for name, content in files.items():
+            (self.repo_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.repo_path / name).write_text(content)
+        self.repo.index.add(list(files))
+        return self.repo.index.commit('Change files').hexsha
+
+    def test_lists_python_files_without_ignored_directories(self):
+        """ Test that the Python files of a commit are listed without ignored directories at any depth. """
+
+        commit = self._commit({'main.py': '', 'README.md': '', 'package/module.py': '', 'package/Docs/conf.py': '',
+                               'package/sub/deep.py': '', 'venv/site.py': '', '.hidden/secret.py': '',
+                               '_private/module.py': '', 'documents/module.py': ''})
+
+        self.assertEqual(['main.py', 'documents/module.py', 'package/module.py', 'package/sub/deep.py'],
+                         file_index.get_python_files_from_commit(self.repo, commit))
+
+    def test_unchanged_trees_are_listed_once(self):
+        """ Test that a commit only lists the trees it changed, and reuses the files of the other trees. """
+
+        first = self._commit({'a/one.py': '', 'a/nested/two.py': '', 'b/three.py': ''})
+        file_index.get_python_files_from_commit(self.repo, first)
+        cached = set(file_index._tree_files)
+
+        second = self._commit({'b/four.py': ''})
+        files = file_index.get_python_files_from_commit(self.repo, second)
+
+        self.assertEqual(['a/one.py', 'a/nested/two.py', 'b/four.py', 'b/three.py'], files)
+        self.assertEqual({self.repo.commit(second).tree.binsha, self.repo.commit(second).tree['b'].binsha},
+                         {binsha for binsha, _ in set(file_index._tree_files) - cached})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from git import Repo
+from rich.progress import Progress
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from mining import guards, lint_mining, test_mining
+from utility import config, skips
+
+
+class GuardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.skips_path = self.root / 'skipped.jsonl'
+        skips.configure(self.skips_path)
+
+    def tearDown(self):
+        skips.configure(None)
+        self.temporary_directory.cleanup()
+
+    def _skips(self) -> list[tuple[str, str | None, str]]:
+        with open(self.skips_path) as file:
+            return [(entry['miner'], entry['file'], entry['reason'].split(' ')[0])
+                    for entry in map(json.loads, file)]
+
+    def test_pathological_files_are_skipped_and_recorded(self):
+        """ Test that large, long-lined and generated files are removed from the checkout and recorded. """
+
+        repo = Repo.init(self.root / 'repo')
+        files = {'main.py': 'VALUE = 1\n',
+                 'large.py': 'VALUE = 1\n' * 120_000,
+                 'minified.py': f'VALUES = [{"1, " * 5000}]\n',
+                 'package/messages_pb2.py': '# Generated by the protocol buffer compiler.  DO NOT EDIT!\n'}
+        for name, content in files.items():
+            (self.root / 'repo' / name).parent.mkdir(exist_ok=True)
+            (self.root / 'repo' / name).write_text(content)
+        repo.index.add(list(files))
+        commit = repo.index.commit('Add files').hexsha
+
+        self.assertEqual(['main.py'], guards.guard_files(repo, commit, 'lint'))
+        self.assertEqual(['main.py'], sorted(file.name for file in (self.root / 'repo').rglob('*.py')))
+        self.assertEqual([('lint', 'large.py', 'file'), ('lint', 'minified.py', 'line'),
+                          ('lint', 'package/messages_pb2.py', 'generated')], self._skips())
+
+    def test_commits_over_budget_are_stopped(self):
+        """ Test that a call over the time or memory budget stops the worker, which is replaced for the next call. """
+
+        guard = guards.CommitGuard()
+        try:
+            with mock.patch.object(config, 'COMMIT_TIMEOUT_SECONDS', 30), \
+                    mock.patch.object(config, 'COMMIT_MEMORY_LIMIT_MB', 1024):
+                self.assertEqual(3, guard.run(sum, [1, 2]))
+                self.assertRaises(ValueError, guard.run, int, 'three')
+                self.assertTrue(guard.running)
+
+                with self.assertRaisesRegex(guards.CommitBudgetExceeded, 'memory'):
+                    guard.run(bytearray, 2 * 1024 ** 3)
+                self.assertFalse(guard.running)
+
+                config.COMMIT_TIMEOUT_SECONDS = 1
+                self.assertEqual(3, guard.run(sum, [1, 2]))
+                start = time.perf_counter()
+                with self.assertRaisesRegex(guards.CommitBudgetExceeded, 'time'):
+                    guard.run(time.sleep, 60)
+                self.assertLess(time.perf_counter() - start, 30)
+                self.assertFalse(guard.running)
+        finally:
+            guard.stop()
+
+    def test_miners_skip_commits_over_budget(self):
+        """ Test that the lint and test miners mine in the worker, and record the commits that run out of time. """
+
+        repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=2, files_per_commit=3, seed=4))
+        commits = [(commit.hexsha, None) for commit in Repo(repo_path).iter_commits()]
+
+        def mine(miner) -> list[dict[str, any] | None]:
+            return [record.data for record in miner._iter_commit_data(repo_path, commits, Progress(disable=True))]
+
+        with mock.patch.object(config, 'LINT_BACKEND', 'ast'):
+            lint_data, test_data = mine(lint_mining), mine(test_mining)
+            with mock.patch.object(config, 'COMMIT_TIMEOUT_SECONDS', 60):
+                guarded_lint_data, guarded_test_data = mine(lint_mining), mine(test_mining)
+                guards.commit_guard().stop()
+            with mock.patch.object(config, 'COMMIT_TIMEOUT_SECONDS', 0.001):
+                self.assertEqual([None] * 4, mine(lint_mining) + mine(test_mining))
+
+        self.assertEqual([list(data['messages']) for data in lint_data],
+                         [list(data['messages']) for data in guarded_lint_data])
+        self.assertEqual([data['stats'] for data in lint_data], [data['stats'] for data in guarded_lint_data])
+        self.assertEqual(test_data, guarded_test_data)
+        self.assertEqual([('lint', None, 'time'), ('lint', None, 'time'), ('test', None, 'time'),
+                          ('test', None, 'time')], self._skips())
+
+
+if __name__ == '__main__':
+    unittest.main()
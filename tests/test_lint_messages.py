@@ -0,0 +1,88 @@
+import json
+import tracemalloc
+import unittest
+
+from pylint.interfaces import HIGH, UNDEFINED
+from pylint.message import Message
+from pylint.typing import MessageLocationTuple
+
+from data_io.data_management import CustomEncoder
+from mining.lint_messages import LintMessages, LintTables
+
+
+def _message(msg_id: str, symbol: str, module: str, msg: str, line: int | None = 1, confidence=UNDEFINED) -> Message:
+    path = f'{module.replace(".", "/")}.py'
+    return Message(msg_id, symbol, MessageLocationTuple(f'/repo/{path}', path, module, '', line, 0, None, None), msg,
+                   confidence)
+
+
+def _commit_messages(number: int) -> list[Message]:
+    """The messages of a commit, which mostly repeat the messages of the previous commits."""
+
+    return [_message('C0114', 'missing-module-docstring', f'package.module_{index}', 'Missing module docstring')
+            for index in range(40)] + \
+        [_message('W0612', 'unused-variable', f'package.module_{index}', f"Unused variable 'value_{index}'", index)
+         for index in range(10)] + \
+        [_message('R1260', 'too-complex', 'package.module_0', f"'function' is too complex. The McCabe rating is "
+                                                             f"{number % 5 + 10}", 20, HIGH)]
+
+
+class LintMessagesTests(unittest.TestCase):
+
+    def test_to_dict_builds_the_nested_messages(self):
+        """ Test that compact messages are converted to the nested dict of modules, categories and message IDs. """
+
+        messages = [_message('C0114', 'missing-module-docstring', 'package.a', 'Missing module docstring'),
+                    _message('W0612', 'unused-variable', 'package.a', "Unused variable 'x'", 3, HIGH),
+                    _message('C0116', 'missing-function-docstring', 'package.b', 'Missing function docstring', None)]
+
+        compact = LintMessages.from_messages(messages, LintTables(), 'repo', 12.5)
+
+        self.assertEqual(3, len(compact))
+        self.assertEqual([1, 3, None], [message.line for message in compact])
+        self.assertEqual({
+            'package.a': {'total_messages': 2, 'categories': {
+                'convention': {'total': 1, 'message_ids': {'C0114': [
+                    {'symbol': 'missing-module-docstring', 'msg': 'Missing module docstring',
+                     'confidence': UNDEFINED, 'path': 'package/a.py'}]}},
+                'warning': {'total': 1, 'message_ids': {'W0612': [
+                    {'symbol': 'unused-variable', 'msg': "Unused variable 'x'", 'confidence': HIGH,
+                     'path': 'package/a.py'}]}}}},
+            'package.b': {'total_messages': 1, 'categories': {
+                'convention': {'total': 1, 'message_ids': {'C0116': [
+                    {'symbol': 'missing-function-docstring', 'msg': 'Missing function docstring',
+                     'confidence': UNDEFINED, 'path': 'package/b.py'}]}}}},
+            'avg_mccabe_complexity': 12.5,
+            'repository_name': 'repo'
+        }, compact.to_dict())
+
+    def test_written_as_nested_json(self):
+        """ Test that compact messages are written to JSON as the nested dict. """
+
+        compact = LintMessages.from_messages(_commit_messages(0), LintTables(), 'repo', 10)
+
+        self.assertEqual(json.dumps(compact.to_dict(), cls=CustomEncoder), json.dumps(compact, cls=CustomEncoder))
+
+    def test_uses_an_order_of_magnitude_less_memory(self):
+        """ Test that the compact messages of the commits of a repository use a tenth of the memory of nested dicts. """
+
+        def allocated(build) -> int:
+            tracemalloc.start()
+            data = [build(number) for number in range(200)]
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del data
+            return size
+
+        commits = [_commit_messages(number) for number in range(200)]
+        tables = LintTables()
+
+        nested = allocated(lambda number: LintMessages.from_messages(commits[number], LintTables(), 'repo',
+                                                                     10).to_dict())
+        compact = allocated(lambda number: LintMessages.from_messages(commits[number], tables, 'repo', 10))
+
+        self.assertLess(compact * 10, nested)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from astroid import MANAGER
+from git import Repo
+from rich.progress import Progress
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from data_io.data_management import CustomEncoder
+from mining import lint_mining
+
+
+def _comparable(lint_data: dict[str, any]) -> str:
+    """
+    Returns lint data as JSON without the date, and with only the first line of the duplicate-code messages. Pylint
+    picks the file whose lines are quoted in those messages from a set, which differs between runs.
+    """
+
+    data = json.loads(json.dumps({key: value for key, value in lint_data.items() if key != 'date'}, cls=CustomEncoder))
+    for module in data['messages'].values():
+        if isinstance(module, dict):
+            for category in module['categories'].values():
+                for message in category['message_ids'].get('R0801', []):
+                    message['msg'] = message['msg'].split('\n')[0]
+    return json.dumps(data, sort_keys=True)
+
+
+class LintSessionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_warm_linter_matches_a_new_linter_per_commit(self):
+        """ Test that linting the commits of a repository with one linter gives the data of a new linter per commit. """
+
+        repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=3, files_per_commit=2, seed=1))
+        repo = Repo(repo_path)
+        commits = [commit.hexsha for commit in repo.iter_commits()][::-1]
+
+        warm = [record.data for record in lint_mining._iter_commit_data(repo_path,
+                                                                        [(commit, None) for commit in commits],
+                                                                        Progress(disable=True))]
+
+        for commit, lint_data in zip(commits, warm):
+            repo.git.checkout(commit)
+            MANAGER.clear_cache()
+            with mock.patch.object(lint_mining, '_lint_session', lint_mining.LintSession):
+                self.assertEqual(_comparable(lint_mining._run_pylint(repo_path, commit)), _comparable(lint_data))
+
+    def test_only_changed_modules_are_evicted(self):
+        """ Test that only the modules of the changed files of a repository are removed from the astroid cache. """
+
+        repo_path = self.root / 'repo'
+        repo_path.mkdir()
+        for name in ['changed', 'unchanged']:
+            (repo_path / f'{name}.py').write_text('VALUE = 1\n')
+            MANAGER.ast_from_file(str(repo_path / f'{name}.py'), f'evict_{name}', source=True)
+
+        lint_mining._evict_modules(repo_path, ['changed.py'])
+        self.assertNotIn('evict_changed', MANAGER.astroid_cache)
+        self.assertIn('evict_unchanged', MANAGER.astroid_cache)
+
+        lint_mining._evict_modules(repo_path)
+        self.assertNotIn('evict_unchanged', MANAGER.astroid_cache)
+
+    def test_eviction_without_the_private_astroid_caches(self):
+        """ Test that the whole astroid cache is cleared if astroid lacks the private caches that eviction clears. """
+
+        repo_path = self.root / 'repo'
+        repo_path.mkdir()
+        (repo_path / 'module.py').write_text('VALUE = 1\n')
+        MANAGER.ast_from_file(str(repo_path / 'module.py'), 'evict_module', source=True)
+
+        with mock.patch.object(lint_mining, '_invalidate_cache', None), \
+                mock.patch.object(MANAGER, 'clear_cache', wraps=MANAGER.clear_cache) as clear_cache:
+            lint_mining._evict_modules(repo_path, [])
+            clear_cache.assert_not_called()
+            lint_mining._evict_modules(repo_path, ['other.py'])
+
+        clear_cache.assert_called_once()
+        self.assertNotIn('evict_module', MANAGER.astroid_cache)
+        self.assertIn('builtins', MANAGER.astroid_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
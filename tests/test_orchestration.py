@@ -0,0 +1,165 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from rich.progress import Progress
+
+import pyciras
+from data_io.database_management import DatabaseManager
+from data_io.database_models import Repository
+from tests.test_repo_management import make_source_repo
+from utility import config, util
+
+
+class ProcessChunkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.urls = [f'https://github.com/owner/repo_{index}' for index in range(8)]
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.mined = []
+
+    def _network_miner(self, name: str):
+        def mine(urls: list[str]):
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.2)
+            with self.lock:
+                self.running -= 1
+                self.mined += [(name, url) for url in urls]
+            return True
+
+        mine.__name__ = name
+        return mine
+
+    def _cpu_miner(self, urls: list[str]):
+        time.sleep(0.1)
+        with self.lock:
+            self.mined += [('cpu', url) for url in urls]
+        return True
+
+    def _process_chunk(self, metadata: bool = True, stargazers: bool = True, **kwargs):
+        with mock.patch.object(pyciras, '_mine_metadata', self._network_miner('metadata')), \
+                mock.patch.object(pyciras, '_mine_stargazers', self._network_miner('stargazers')):
+            start = time.perf_counter()
+            pyciras._process_chunk(self.urls, [self._cpu_miner], stargazers, metadata, **kwargs)
+            return time.perf_counter() - start
+
+    @mock.patch.multiple(config, NETWORK_CONCURRENCY=2, REPOSITORY_BATCH_SIZE=4)
+    def test_repositories_that_a_miner_failed_on_are_returned(self):
+        """ Test that the repositories of the chunks and batches that a miner failed on are returned, in order. """
+
+        def failing_miner(urls: list[str]) -> bool:
+            return self.urls[2] not in urls and self.urls[5] not in urls
+
+        failed = pyciras._process_chunk(self.urls, [failing_miner, self._cpu_miner], False, False, chunk_size=2)
+        self.assertEqual(self.urls[2:6], failed)
+
+        failed = pyciras._process_chunk(self.urls, [failing_miner], False, False, chunk_size=2, multiprocessing=True)
+        self.assertEqual([self.urls[2], self.urls[5]], failed)
+
+        with mock.patch.object(pyciras, '_mine_metadata', failing_miner):
+            failed = pyciras._process_chunk(self.urls[:4], [self._cpu_miner], False, True, chunk_size=4)
+        self.assertEqual(self.urls[:4], failed)
+        self.assertEqual([], pyciras._process_chunk(self.urls, [self._cpu_miner], False, False, chunk_size=4))
+
+    @mock.patch.multiple(config, NETWORK_CONCURRENCY=4, REPOSITORY_BATCH_SIZE=4)
+    def test_network_and_cpu_miners_overlap(self):
+        """ Test that the network miners run alongside the chunks, so the wall time is close to the longest. """
+
+        duration = self._process_chunk(chunk_size=2)
+
+        self.assertEqual({(name, url) for name in ['metadata', 'stargazers', 'cpu'] for url in self.urls},
+                         set(self.mined))
+        self.assertEqual(24, len(self.mined))
+        # Sequentially the network miners take 0.8 seconds and the four chunks 0.4 seconds.
+        self.assertLess(duration, 0.7)
+
+    @mock.patch.multiple(config, NETWORK_CONCURRENCY=4, REPOSITORY_BATCH_SIZE=1)
+    def test_concurrent_miners_write_to_the_same_database(self):
+        """ Test that miners running at the same time can all add the same new repositories to the database. """
+
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = Path(directory) / 'database.db'
+
+            def database_miner(insert: str):
+                def mine(urls: list[str]) -> bool:
+                    try:
+                        with DatabaseManager(database_path) as dbm:
+                            getattr(dbm, insert)({url: {} for url in urls}, Progress(disable=True))
+                        return True
+                    except Exception:
+                        return False
+
+                return mine
+
+            with mock.patch.object(pyciras, '_mine_metadata', database_miner('insert_metadata')), \
+                    mock.patch.object(pyciras, '_mine_stargazers', database_miner('insert_stargazers_data')):
+                for attempt in range(10):
+                    urls = [f'{url}_{attempt}' for url in self.urls]
+                    failed = pyciras._process_chunk(urls, [database_miner('insert_git_data')], True, True,
+                                                    chunk_size=1)
+                    self.assertEqual([], failed)
+
+            with DatabaseManager(database_path) as dbm:
+                self.assertEqual(80, dbm.session.query(Repository).count())
+
+    @mock.patch.multiple(config, NETWORK_CONCURRENCY=1, REPOSITORY_BATCH_SIZE=2)
+    def test_network_concurrency_is_limited(self):
+        """ Test that at most NETWORK_CONCURRENCY batches are mined by the network miners at the same time. """
+
+        self._process_chunk(chunk_size=8)
+
+        self.assertEqual(1, self.max_running)
+        self.assertEqual(8, len([entry for entry in self.mined if entry[0] == 'metadata']))
+
+    def test_without_network_miners(self):
+        """ Test that the chunks are mined when the network miners are disabled. """
+
+        self._process_chunk(metadata=False, stargazers=False, chunk_size=3)
+
+        self.assertEqual([('cpu', url) for url in self.urls], self.mined)
+
+    def test_runs_inside_an_event_loop(self):
+        """ Test that the orchestrator can be started from a running event loop, as in Jupyter. """
+
+        async def notebook():
+            return util.run_coroutine(asyncio.sleep(0, result='done'))
+
+        self.assertEqual('done', asyncio.run(notebook()))
+
+
+class CloneChunkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.urls = [str(make_source_repo(self.root / 'sources' / name)) for name in ['alpha', 'beta']]
+        self.urls.insert(1, str(self.root / 'sources' / 'missing'))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_cloning_returns_the_repositories_that_failed_to_clone(self):
+        """ Test that the cloner runs through the chunks, sequentially and in parallel, and reports failed clones. """
+
+        # Sequentially a failure is reported for the whole chunk, in parallel for the repository.
+        for multiprocessing, expected in [(False, self.urls[:2]), (True, self.urls[1:2])]:
+            repos_directory = self.root / f'repositories_{multiprocessing}'
+            with mock.patch.object(config, 'REPOSITORIES_FOLDER', repos_directory), \
+                    mock.patch.object(pyciras, 'progress', Progress(disable=True)):
+                failed = pyciras._process_chunk(self.urls, [pyciras._clone_chunk], False, False, chunk_size=2,
+                                                multiprocessing=multiprocessing)
+
+            self.assertEqual(expected, failed)
+            self.assertEqual(['alpha', 'beta'], sorted(path.name for path in repos_directory.iterdir()))
+
+
+if __name__ == '__main__':
+    unittest.main()
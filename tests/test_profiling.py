@@ -0,0 +1,65 @@
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from utility import profiling
+
+
+@profiling.profiled
+def _mine_example(repo_urls: list[str]) -> int:
+    return sum(_write_example(url) for url in repo_urls)
+
+
+@profiling.profiled
+def _write_example(repo_name: str) -> int:
+    return len(repo_name)
+
+
+class ProfilingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.profile_directory = Path(self.temporary_directory.name) / 'profiles'
+        profiling.configure(self.profile_directory)
+
+    def tearDown(self):
+        profiling.configure(None)
+        self.temporary_directory.cleanup()
+
+    @patch('utility.config.PROFILE_STAGES', ['_mine_*'])
+    @patch('utility.config.PROFILE_REPOSITORY_PATTERN', 'alpha*')
+    def test_profiles_selected_stages_and_repositories(self):
+        """ Test that only the selected stages are profiled, and only for matching repositories. """
+
+        self.assertEqual(9, _mine_example(['alpha', 'beta']))
+        self.assertEqual(4, _mine_example(['beta']))
+
+        profiles = list(self.profile_directory.glob('*.pstats'))
+        self.assertEqual(1, len(profiles))
+        self.assertTrue(profiles[0].name.startswith('_mine_example--alpha_beta--'))
+        self.assertIn('_write_example', str(pstats.Stats(str(profiles[0])).stats))
+
+    @patch('utility.config.PROFILE_STAGES', ['_mine_example'])
+    def test_report_merges_profiles_per_stage(self):
+        """ Test that the report merges the profiles of a stage across repositories. """
+
+        _mine_example(['alpha'])
+        _mine_example(['beta'])
+
+        report = profiling.write_report(top_n=50).read_text()
+        self.assertIn('===== _mine_example: 2 profiles =====', report)
+        self.assertIn('_write_example', report)
+
+    def test_disabled_by_default(self):
+        """ Test that nothing is profiled without selected stages. """
+
+        _mine_example(['alpha'])
+
+        self.assertFalse(self.profile_directory.exists())
+        self.assertIsNone(profiling.write_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pyciras
+from utility import config
+
+
+class PycirasCliTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.repos_file = self.root / 'repos.txt'
+        self.repos_file.write_text('https://github.com/owner/alpha\nhttps://github.com/owner/beta\n')
+        self.settings = {name: value for name, value in vars(config).items() if name.isupper()}
+        self.data_directory = pyciras.data_directory
+        self.options = ['--repos', str(self.repos_file),
+                        '--data-dir', str(self.root / 'data'),
+                        '--logs-dir', str(self.root / 'logs')]
+
+    def tearDown(self):
+        for name, value in self.settings.items():
+            setattr(config, name, value)
+        pyciras.data_directory = self.data_directory
+        self.temporary_directory.cleanup()
+
+    @patch('pyciras.run_mining')
+    def test_mine_applies_and_records_options(self, run_mining):
+        """ Test that the options override the config, are passed to the run and are recorded. """
+
+        pyciras.main(['mine', *self.options, '--chunk-size', '4', '--workers', '2', '--sinks', 'csv',
+                      '--miners', 'lint', 'test', '--sample-every', '5', '--batch-size', '10'])
+
+        kwargs = run_mining.call_args.kwargs
+        self.assertEqual(['https://github.com/owner/alpha', 'https://github.com/owner/beta'], kwargs['repo_urls'])
+        self.assertEqual((4, True), (kwargs['chunk_size'], kwargs['multiprocessing']))
+        self.assertEqual((True, True, False, False), (kwargs['lint'], kwargs['test'], kwargs['git'],
+                                                      kwargs['metadata']))
+        self.assertEqual((False, False, True), (config.WRITE_DATABASE, config.WRITE_JSON, config.WRITE_CSV))
+        self.assertEqual((2, 5, 10), (config.MAX_WORKERS, config.SNAPSHOT_SAMPLE_EVERY, config.SNAPSHOT_BATCH_SIZE))
+
+        run_config = json.loads((pyciras.data_directory / pyciras.RUN_CONFIG_FILE).read_text())
+        self.assertEqual('mine', run_config['command'])
+        self.assertEqual(['csv'], run_config['arguments']['sinks'])
+        self.assertEqual(5, run_config['config']['SNAPSHOT_SAMPLE_EVERY'])
+
+    @patch('pyciras.run_mining')
+    def test_resume_reuses_recorded_options(self, run_mining):
+        """ Test that resume applies the recorded options, with the given options taking precedence. """
+
+        pyciras.main(['mine', *self.options, '--chunk-size', '3', '--miners', 'lint', '--prefetch', '2'])
+        name = pyciras.data_directory.name
+
+        pyciras.main(['resume', name, '--data-dir', str(self.root / 'data'), '--prefetch', '5'])
+
+        kwargs = run_mining.call_args.kwargs
+        self.assertEqual(name, kwargs['resume_from'])
+        self.assertEqual((3, 5), (kwargs['chunk_size'], kwargs['prefetch']))
+        self.assertEqual((True, False), (kwargs['lint'], kwargs['git']))
+
+        run_config = json.loads((pyciras.data_directory / pyciras.RUN_CONFIG_FILE).read_text())
+        self.assertEqual('resume', run_config['resumes'][0]['command'])
+
+    def test_invalid_options(self):
+        """ Test that invalid values and combinations exit with a usage error. """
+
+        for argv in [['mine', *self.options, '--chunk-size', '0'],
+                     ['mine', *self.options, '--workers', '4'],
+                     ['mine', *self.options, '--disk-budget-mb', '100'],
+                     ['mine', *self.options, '--sinks', 'parquet'],
+                     ['mine', '--repos', str(self.root / 'missing.txt')],
+                     ['resume', 'missing', '--data-dir', str(self.root / 'data')]]:
+            with self.subTest(argv=argv), self.assertRaises(SystemExit), patch('sys.stderr'):
+                pyciras.main(argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
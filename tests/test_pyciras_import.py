@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+HEAVY_MODULES = ['git', 'numpy', 'pandas', 'pydriller', 'pylint', 'requests', 'rich', 'sqlalchemy']
+
+IMPORT_SCRIPT = '''
+import json
+import sys
+from pathlib import Path
+
+from utility import config
+
+output_folder = Path(sys.argv[1])
+config.OUTPUT_FOLDER = output_folder
+config.DATA_FOLDER = output_folder / 'data'
+config.LOGGING_FOLDER = output_folder / 'logs'
+config.REPOSITORIES_FOLDER = output_folder / 'repositories'
+
+import pyciras
+
+print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))
+'''
+
+
+class PycirasImportTests(unittest.TestCase):
+
+    def test_import_is_light_and_side_effect_free(self):
+        """ Test that importing pyciras loads no heavy dependencies and creates no directories. """
+
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            output_folder = Path(temporary_directory) / 'out'
+            result = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, str(output_folder)],
+                                    cwd=Path(__file__).parent.parent,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True)
+
+            loaded = json.loads(result.stdout)
+            self.assertEqual([], [module for module in HEAVY_MODULES if module in loaded])
+            self.assertFalse(output_folder.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
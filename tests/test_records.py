@@ -0,0 +1,79 @@
+import unittest
+
+from mining import records
+from mining.records import CommitRecord, RepoRecord, StargazersPage
+
+
+class CollectCommitsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [CommitRecord('alpha', 'a1', {'date': 1}),
+                        CommitRecord('alpha', 'a2', None),
+                        CommitRecord('alpha', 'a3', {'date': 3}),
+                        CommitRecord('beta', 'b1', {'date': 1})]
+
+    def test_collects_commits_per_repository(self):
+        """ Test that commit records are collected per repository, without the commits that have no data. """
+
+        self.assertEqual({'alpha': {'a1': {'date': 1}, 'a3': {'date': 3}}, 'beta': {'b1': {'date': 1}}},
+                         records.collect_commits(iter(self.records)))
+
+    def test_passes_batches_to_the_sink(self):
+        """ Test that a sink gets batches per repository with the last commit, counting commits without data. """
+
+        batches = []
+        data = records.collect_commits(iter(self.records),
+                                       sink=lambda repo, commits, last: batches.append((repo, commits, last)),
+                                       batch_size=2)
+
+        self.assertEqual([('alpha', {'a1': {'date': 1}}, 'a2'),
+                          ('alpha', {'a3': {'date': 3}}, 'a3'),
+                          ('beta', {'b1': {'date': 1}}, 'b1')], batches)
+        self.assertEqual({'alpha': {}, 'beta': {}}, data)
+
+    def test_consumes_records_as_they_are_yielded(self):
+        """ Test that a batch reaches the sink before the following records are mined. """
+
+        events = []
+
+        def mine():
+            for record in self.records:
+                events.append(f'mined {record.commit_hash}')
+                yield record
+
+        records.collect_commits(mine(), sink=lambda repo, commits, last: events.append(f'wrote {last}'), batch_size=1)
+
+        self.assertEqual(['mined a1', 'wrote a1', 'mined a2', 'wrote a2', 'mined a3', 'wrote a3', 'mined b1',
+                          'wrote b1'], events)
+
+
+class GroupStargazersTests(unittest.TestCase):
+
+    def test_groups_pages_per_repository(self):
+        """ Test that pages are grouped into the response shape, including repositories that stopped early. """
+
+        pages = [StargazersPage('alpha', [{'cursor': 1}], False),
+                 StargazersPage('alpha', [{'cursor': 2}], False),
+                 StargazersPage('alpha', [], True),
+                 StargazersPage('beta', [], True),
+                 StargazersPage('gamma', [{'cursor': 3}], False)]
+
+        grouped = list(records.group_stargazers(pages))
+
+        self.assertEqual(['alpha', 'beta', 'gamma'], [record.repo_name for record in grouped])
+        self.assertEqual({'data': {'repository': {'stargazers': {'edges': [{'cursor': 1}, {'cursor': 2}]},
+                                                  'name': 'alpha'}}},
+                         grouped[0].data)
+        self.assertEqual([], grouped[1].data['data']['repository']['stargazers']['edges'])
+        self.assertEqual([{'cursor': 3}], grouped[2].data['data']['repository']['stargazers']['edges'])
+
+    def test_batched(self):
+        """ Test that records are grouped in batches of at most the given size. """
+
+        repos = [RepoRecord(str(index), {}) for index in range(5)]
+
+        self.assertEqual([repos[:2], repos[2:4], repos[4:]], list(records.batched(repos, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
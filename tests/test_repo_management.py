@@ -0,0 +1,253 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from git import Repo, rmtree
+from rich.progress import Progress
+
+from data_io import repo_management
+
+
+def make_source_repo(path: Path, commits: int = 2) -> Path:
+    """ Create a small local repository to clone from. """
+
+    repo = Repo.init(path)
+    with repo.config_writer() as writer:
+        writer.set_value('user', 'name', 'PyCIRAS')
+        writer.set_value('user', 'email', 'pyciras@example.com')
+        writer.set_value('uploadpack', 'allowFilter', 'true')
+
+    for i in range(commits):
+        (path / f'module_{i}.py').write_text(f'VALUE = {i}\n')
+        (path / f'data_{i}.csv').write_text('a,b\n1,2\n' * 100)
+        repo.index.add([f'module_{i}.py', f'data_{i}.csv'])
+        repo.index.commit(f'Commit {i}')
+
+    return path
+
+
+class SampleCommitsTests(unittest.TestCase):
+
+    def test_sample_commits(self):
+        """ Test that sampling keeps the latest commit and the order of the commits. """
+
+        commits = [(f'hash{i}', i) for i in range(10)]
+
+        self.assertEqual(commits, repo_management.sample_commits({'a': commits})['a'])
+        self.assertEqual([commits[i] for i in [0, 3, 6, 9]], repo_management.sample_commits({'a': commits}, 3)['a'])
+        self.assertEqual([commits[i] for i in [1, 5, 9]], repo_management.sample_commits({'a': commits}, 2, 3)['a'])
+        self.assertEqual(commits[-1:], repo_management.sample_commits({'a': commits}, 1, 1)['a'])
+
+
+class ClonePrefetcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        root = Path(self.temporary_directory.name)
+        self.repos_directory = root / 'repositories'
+        self.repo_urls = [str(make_source_repo(root / 'sources' / name)) for name in ['alpha', 'beta', 'gamma']]
+        self.progress = Progress(disable=True)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_clones_in_order_within_capacity(self):
+        """ Test that the prefetcher does not clone past the look-ahead until repositories are released. """
+
+        with repo_management.ClonePrefetcher(self.repos_directory,
+                                             self.repo_urls,
+                                             self.progress,
+                                             capacity=2) as prefetcher:
+            paths = prefetcher.wait_for(self.repo_urls[:2])
+            time.sleep(0.2)
+
+            self.assertEqual([self.repos_directory / 'alpha', self.repos_directory / 'beta'], paths)
+            self.assertFalse((self.repos_directory / 'gamma').exists())
+
+            prefetcher.release(self.repo_urls[:1])
+            self.assertEqual([self.repos_directory / 'gamma'], prefetcher.wait_for(self.repo_urls[2:]))
+
+    def test_requested_repositories_ignore_disk_budget(self):
+        """ Test that a repository that is waited for is cloned even if the disk budget is used up. """
+
+        with repo_management.ClonePrefetcher(self.repos_directory,
+                                             self.repo_urls,
+                                             self.progress,
+                                             capacity=3,
+                                             disk_budget_mb=0) as prefetcher:
+            self.assertEqual(3, len(prefetcher.wait_for(self.repo_urls)))
+
+
+class CloneStrategyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        root = Path(self.temporary_directory.name)
+        self.repos_directory = root / 'repositories'
+        source = make_source_repo(root / 'source')
+        bare = Repo.clone_from(str(source), root / 'alpha.git', bare=True)
+        with bare.config_writer() as writer:
+            writer.set_value('uploadpack', 'allowFilter', 'true')
+        self.url = (root / 'alpha.git').as_uri()
+        self.progress = Progress(disable=True)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    @patch('utility.config.CLONE_STRATEGY', 'auto')
+    def test_select_clone_strategy(self):
+        """ Test that the strategy follows the enabled miners. """
+
+        self.assertIsNone(repo_management.select_clone_strategy(git=False, lint=False, test=False))
+        self.assertEqual('blobless', repo_management.select_clone_strategy(git=True, lint=False, test=False))
+        self.assertEqual('snapshot', repo_management.select_clone_strategy(git=True, lint=True, test=False))
+        self.assertEqual('snapshot', repo_management.select_clone_strategy(git=False, lint=False, test=True))
+
+        with patch('utility.config.CLONE_STRATEGY', 'full'):
+            self.assertEqual('full', repo_management.select_clone_strategy(git=True, lint=True, test=True))
+
+    def test_snapshot_clone_checks_out_python_files_only(self):
+        """ Test that a snapshot clone is partial and only checks out the sparse patterns. """
+
+        path = repo_management.clone_repos(self.repos_directory, [self.url], self.progress, 'snapshot')[0]
+        repo = Repo(path)
+
+        self.assertEqual('true', repo.git.config('remote.origin.promisor'))
+        self.assertEqual(['module_0.py', 'module_1.py'], sorted(file.name for file in path.iterdir()
+                                                                if file.is_file()))
+
+        repo.git.checkout('HEAD~1')
+        self.assertTrue((path / 'module_0.py').exists())
+        self.assertFalse((path / 'module_1.py').exists())
+
+    def test_snapshot_clone_leaves_out_ignored_directories(self):
+        """ Test that a snapshot clone does not check out the Python files of ignored directories at any depth. """
+
+        root = Path(self.temporary_directory.name)
+        source = Repo(root / 'source')
+        for name in ['venv/site.py', 'package/module.py', 'package/Docs/conf.py', 'package/_private/helper.py']:
+            (root / 'source' / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / 'source' / name).write_text('VALUE = 0\n')
+            source.index.add([name])
+        source.index.commit('Add packages')
+        source.git.push(str(root / 'alpha.git'), f'HEAD:{source.active_branch.name}')
+
+        path = repo_management.clone_repos(self.repos_directory, [self.url], self.progress, 'snapshot')[0]
+        self.assertEqual(['module_0.py', 'module_1.py', 'package/module.py'],
+                         sorted(file.relative_to(path).as_posix() for file in path.rglob('*.py')))
+
+        with patch('utility.config.SPARSE_CHECKOUT_EXCLUDE_IGNORED', False):
+            self.assertEqual(['*.py'], repo_management.sparse_checkout_patterns())
+
+    def test_blobless_clone_checks_out_all_files(self):
+        """ Test that a blobless clone fetches the blobs of the checked out tree on demand. """
+
+        path = repo_management.clone_repos(self.repos_directory, [self.url], self.progress, 'blobless')[0]
+
+        self.assertEqual('true', Repo(path).git.config('remote.origin.promisor'))
+        self.assertTrue((path / 'data_1.csv').exists())
+
+
+class MirrorCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.repos_directory = self.root / 'repositories'
+        self.source = make_source_repo(self.root / 'upstream' / 'alpha')
+        self.fork = Repo.clone_from(str(self.source), self.root / 'fork' / 'alpha')
+        self.progress = Progress(disable=True)
+        self.patches = [patch('utility.config.USE_MIRROR_CACHE', True),
+                        patch('utility.config.MIRROR_FOLDER', self.root / 'mirrors')]
+        for mirror_patch in self.patches:
+            mirror_patch.start()
+
+    def tearDown(self):
+        for mirror_patch in self.patches:
+            mirror_patch.stop()
+        self.temporary_directory.cleanup()
+
+    def test_clone_from_mirror_and_fetch_new_commits(self):
+        """ Test that working clones come from the mirror, which is refreshed for the next clone. """
+
+        path = repo_management.clone_repos(self.repos_directory, [str(self.source)], self.progress)[0]
+        mirror_path = self.root / 'mirrors' / 'upstream__alpha.git'
+
+        self.assertTrue((mirror_path / 'HEAD').exists())
+        self.assertTrue((path / '.git' / 'objects' / 'info' / 'alternates').exists())
+        self.assertEqual(2, len(list(Repo(path).iter_commits())))
+
+        source_repo = Repo(self.source)
+        (self.source / 'module_2.py').write_text('VALUE = 2\n')
+        source_repo.index.add(['module_2.py'])
+        source_repo.index.commit('Commit 2')
+        rmtree(path)
+
+        path = repo_management.clone_repos(self.repos_directory, [str(self.source)], self.progress)[0]
+        self.assertEqual(3, len(list(Repo(path).iter_commits())))
+
+    def test_fork_mirrors_share_objects(self):
+        """ Test that the mirror of a fork borrows the objects of the upstream mirror. """
+
+        repo_management.update_mirror(str(self.source), self.progress)
+        fork_mirror = repo_management.update_mirror(self.fork.working_dir, self.progress)
+
+        alternates = (fork_mirror / 'objects' / 'info' / 'alternates').read_text()
+        self.assertIn('upstream__alpha.git', alternates)
+
+    def test_prepared_mirror_keeps_objects_borrowed_by_forks_and_clones(self):
+        """ Test that preparing a mirror after a pruned branch keeps the objects that forks and clones borrow. """
+
+        source_repo = Repo(self.source)
+        source_repo.git.checkout('-b', 'feature')
+        (self.source / 'feature.py').write_text('FEATURE = True\n')
+        source_repo.index.add(['feature.py'])
+        source_repo.index.commit('Feature')
+        source_repo.git.checkout('master')
+        fork = Repo.clone_from(str(self.source), self.root / 'feature_fork' / 'alpha')
+        fork.git.branch('feature', 'origin/feature')
+
+        with patch('utility.config.PREPARE_REPOSITORIES', True):
+            mirror = repo_management.update_mirror(str(self.source), self.progress)
+            fork_mirror = repo_management.update_mirror(fork.working_dir, self.progress)
+            clone = Repo.clone_from(str(mirror), self.root / 'clone', multi_options=['--shared'])
+            clone.git.checkout('feature')
+
+            source_repo.git.branch('-D', 'feature')
+            repo_management.update_mirror(str(self.source), self.progress)
+
+        self.assertNotIn('feature', [head.name for head in Repo(mirror).heads])
+        Repo(fork_mirror).git.fsck('--full')
+        clone.git.fsck('--full')
+        self.assertEqual('FEATURE = True', clone.git.show('HEAD:feature.py'))
+
+
+class PrepareRepoTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = make_source_repo(Path(self.temporary_directory.name) / 'alpha')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_prepare_writes_indexes_once(self):
+        """ Test that the indexes are written, and that preparing again is skipped until the refs change. """
+
+        timings = repo_management.prepare_repo(self.path)
+        objects = self.path / '.git' / 'objects'
+
+        self.assertEqual({'commit_graph', 'repack'}, set(timings))
+        self.assertTrue((objects / 'info' / 'commit-graph').exists())
+        self.assertTrue((objects / 'pack' / 'multi-pack-index').exists())
+        self.assertIsNone(repo_management.prepare_repo(self.path))
+
+        repo = Repo(self.path)
+        repo.index.commit('Empty commit')
+        self.assertIsNotNone(repo_management.prepare_repo(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
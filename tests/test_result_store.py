@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from git import Repo
+from rich.progress import Progress
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from data_io import result_store
+from mining import lint_mining, test_mining
+from tests.test_lint_mining import _comparable
+from utility import config
+
+
+class ResultStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=2, files_per_commit=3, seed=2))
+        repo = Repo(self.repo_path)
+        # A commit without changes has the tree of its parent, like a merge that changes no files.
+        repo.index.commit('Merge branch')
+        self.commits = [(commit.hexsha, None) for commit in repo.iter_commits()][::-1]
+        repo.close()
+        result_store.configure(self.root / 'store' / 'results.db')
+        self.patches = [mock.patch.object(config, 'LINT_BACKEND', 'ast')]
+        for store_patch in self.patches:
+            store_patch.start()
+
+    def tearDown(self):
+        for store_patch in self.patches:
+            store_patch.stop()
+        result_store.configure(None)
+        self.temporary_directory.cleanup()
+
+    def _mine(self, miner) -> list[dict[str, any]]:
+        return [record.data for record in miner._iter_commit_data(self.repo_path, self.commits, Progress(disable=True))]
+
+    def test_commits_with_a_mined_tree_are_not_mined_again(self):
+        """ Test that a commit with the tree of a mined commit gets its results without being mined. """
+
+        with mock.patch.object(lint_mining, '_lint_commit', wraps=lint_mining._lint_commit) as lint_commit, \
+                mock.patch.object(test_mining, '_mine_files', wraps=test_mining._mine_files) as mine_files:
+            lint_data, test_data = self._mine(lint_mining), self._mine(test_mining)
+
+        self.assertEqual(2, lint_commit.call_count)
+        self.assertEqual(2, mine_files.call_count)
+        self.assertEqual(_comparable(lint_data[1]), _comparable(lint_data[2]))
+        self.assertEqual(test_data[1], test_data[2])
+        self.assertEqual({'lint': {'hits': 1, 'misses': 2}, 'test': {'hits': 1, 'misses': 2}}, result_store.summary())
+
+        # The store is shared between runs, and only by the miners with the same settings.
+        result_store.configure(self.root / 'store' / 'results.db')
+        self.assertEqual([_comparable(data) for data in lint_data],
+                         [_comparable(data) for data in self._mine(lint_mining)])
+        self.assertEqual(test_data, self._mine(test_mining))
+        with mock.patch.object(config, 'MAX_LINE_LENGTH', 5000):
+            self.assertEqual(test_data, self._mine(test_mining))
+        self.assertEqual({'lint': {'hits': 3, 'misses': 0}, 'test': {'hits': 4, 'misses': 2}}, result_store.summary())
+
+    def test_messages_refer_to_the_repository(self):
+        """ Test that the paths of messages linted or loaded in a worktree refer to the files of the repository. """
+
+        in_place = self._mine(lint_mining)
+        with mock.patch.object(config, 'SNAPSHOT_WORKTREE_FOLDER', self.root / 'worktrees'):
+            in_worktree = self._mine(lint_mining)
+            result_store.configure(None)
+            linted_in_worktree = self._mine(lint_mining)
+
+        checkout_prefix = lint_mining._checkout_prefix(self.repo_path)
+        for data, stored, linted in zip(in_place, in_worktree, linted_in_worktree):
+            paths = [message.path for message in data['messages']]
+            self.assertTrue(paths)
+            self.assertTrue(all(path.startswith(checkout_prefix) for path in paths))
+            self.assertEqual(paths, [message.path for message in stored['messages']])
+            self.assertEqual(paths, [message.path for message in linted['messages']])
+            self.assertEqual(data['stats']['by_module'].keys(), linted['stats']['by_module'].keys())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from rich.progress import Progress
+
+from benchmarks import synthetic_payloads
+from data_io import data_management
+from data_io.database_management import DatabaseManager
+
+
+class SyntheticPayloadsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temporary_directory.name)
+        self.progress = Progress(disable=True)
+        self.names = synthetic_payloads.make_repo_names(2)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_payloads_are_reproducible(self):
+        """ Test that the same seed produces the same data. """
+
+        self.assertEqual(synthetic_payloads.lint_payload(self.names, 3, 4, seed=1),
+                         synthetic_payloads.lint_payload(self.names, 3, 4, seed=1))
+        self.assertNotEqual(synthetic_payloads.test_payload(self.names, 3, 4, seed=1),
+                            synthetic_payloads.test_payload(self.names, 3, 4, seed=2))
+
+    def test_payloads_are_accepted_by_the_sinks(self):
+        """ Test that the payloads have the shapes that the CSV writers and the database expect. """
+
+        with DatabaseManager(self.directory / 'database.db') as dbm:
+            dbm.insert_lint_data(synthetic_payloads.lint_payload(self.names, 3, 4), self.progress)
+            dbm.insert_test_data(synthetic_payloads.test_payload(self.names, 3, 4), self.progress)
+            dbm.insert_git_data(synthetic_payloads.git_payload(self.names, 3, 4), self.progress)
+            dbm.insert_stargazers_data(synthetic_payloads.stargazers_payload(self.names, 5), self.progress)
+
+        data_management.lint_data_to_csv(synthetic_payloads.lint_payload(self.names, 3, 4),
+                                         self.directory / 'lint.csv', self.progress)
+        data_management.test_data_to_csv(synthetic_payloads.test_payload(self.names, 3, 4),
+                                         self.directory / 'test.csv', self.progress)
+        data_management.git_data_to_csv(synthetic_payloads.git_payload(self.names, 3, 4),
+                                        self.directory / 'git.csv', self.progress)
+        data_management.stargazers_data_to_csv(synthetic_payloads.stargazers_payload(self.names, 5),
+                                               self.directory / 'stargazers.csv', self.progress)
+
+        lint = pd.read_csv(self.directory / 'lint.csv')
+        self.assertEqual(6, len(lint))
+        self.assertIn('global_note', lint.columns)
+        self.assertEqual(6, len(pd.read_csv(self.directory / 'test.csv')))
+        self.assertEqual(2, len(pd.read_csv(self.directory / 'git.csv')))
+        self.assertEqual(['date'] + self.names, list(pd.read_csv(self.directory / 'stargazers.csv').columns))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from git import Repo
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+
+
+class SyntheticReposTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_generation_is_reproducible(self):
+        """ Test that the same spec produces the same history, and another seed a different one. """
+
+        spec = RepoSpec(commits=10, merge_density=0.3)
+        first = Repo(generate_repo(self.root / 'first', spec))
+        second = Repo(generate_repo(self.root / 'second', spec))
+        other = Repo(generate_repo(self.root / 'other', spec._replace(seed=1)))
+
+        self.assertEqual(first.head.commit.hexsha, second.head.commit.hexsha)
+        self.assertNotEqual(first.head.commit.hexsha, other.head.commit.hexsha)
+
+    def test_generated_shape(self):
+        """ Test that the repository has the requested commits, merges and test files. """
+
+        path = generate_repo(self.root / 'repo', RepoSpec(commits=20, test_ratio=0.5, merge_density=0.5))
+        commits = list(Repo(path).iter_commits())
+
+        self.assertEqual(20, len(commits))
+        self.assertTrue(any(len(commit.parents) == 2 for commit in commits))
+        self.assertTrue(any((path / 'tests').glob('test_*.py')))
+        self.assertTrue(any((path / 'src').rglob('module_*.py')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from rich.progress import Progress
+
+from mining import git_mining
+from utility import telemetry
+
+
+class TelemetryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.temporary_directory.name) / 'telemetry.jsonl'
+        telemetry.configure(self.path)
+
+    def tearDown(self):
+        telemetry.configure(None)
+        self.temporary_directory.cleanup()
+
+    def test_spans_are_written_as_json_lines(self):
+        """ Test that each span is appended to the telemetry file with its counters and rates. """
+
+        with telemetry.span('pylint', 'repo_a') as span:
+            span.add('commits', 2)
+            span.add('files', 10)
+
+        entries = [json.loads(line) for line in self.path.read_text().splitlines()]
+
+        self.assertEqual(1, len(entries))
+        self.assertEqual('pylint', entries[0]['stage'])
+        self.assertEqual('repo_a', entries[0]['repo'])
+        self.assertEqual({'commits': 2, 'files': 10}, entries[0]['counters'])
+        self.assertEqual({'commits_per_s', 'files_per_s'}, set(entries[0]['rates']))
+
+    def test_timed_sections_define_the_duration(self):
+        """ Test that a span with timed sections only counts the time spent in them. """
+
+        with telemetry.span('checkout', 'repo_a') as span:
+            with span.timing():
+                pass
+            sum(range(100000))
+
+        self.assertLess(span.duration, span.wall_seconds)
+
+    def test_summary_totals_per_stage(self):
+        """ Test that the summary adds up the spans and counters of each stage. """
+
+        for repo in ['repo_a', 'repo_b']:
+            with telemetry.span('csv_write', repo) as span:
+                span.add('rows', 5)
+        with telemetry.span('clone', 'repo_a'):
+            pass
+
+        summary = telemetry.summary()
+
+        self.assertEqual(2, summary['csv_write']['spans'])
+        self.assertEqual({'rows': 10}, summary['csv_write']['counters'])
+        self.assertEqual(1, summary['clone']['spans'])
+
+    def test_stargazers_span_is_written_when_a_query_fails(self):
+        """ Test that the span of a stargazers query is written if the query raises. """
+
+        with mock.patch.object(git_mining, '_check_graphql_rate_limit', return_value=(5000, None)), \
+                mock.patch.object(git_mining.requests, 'post', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                list(git_mining.iter_stargazers_data(['https://github.com/owner/repo_a'], Progress(disable=True)))
+
+        entries = [json.loads(line) for line in self.path.read_text().splitlines()]
+        self.assertEqual([('stargazers_query', 'repo_a')], [(entry['stage'], entry['repo']) for entry in entries])
+
+
+if __name__ == '__main__':
+    unittest.main()
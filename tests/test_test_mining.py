@@ -0,0 +1,117 @@
+import ast
+import sysconfig
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from git import Repo
+
+from benchmarks.bench_visitor import NodeStatementVisitor, parse_files
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from mining import test_mining
+from utility import config, file_index
+
+
+class ParallelParsingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_parallel_parsing_matches_serial_parsing(self):
+        """ Test that parsing the files of a commit in the parse pool gives the data of parsing them one by one. """
+
+        repo_path = generate_repo(self.root / 'repo', RepoSpec(commits=3, files_per_commit=8, seed=5))
+        (repo_path / 'broken.py').write_text('def broken(:\n')
+        repo = Repo(repo_path)
+        repo.index.add(['broken.py'])
+        commit = repo.index.commit('Add a file with a syntax error').hexsha
+        files = file_index.get_python_files_from_commit(repo, commit)
+
+        serial = test_mining._mine_files(repo_path, files, commit, None)
+        with mock.patch.object(config, 'AST_PARSE_PROCESSES', 3), mock.patch.object(config, 'AST_PARSE_THRESHOLD',
+                                                                                    len(files)):
+            self.assertEqual(3, test_mining._parse_processes(len(files)))
+            self.assertEqual(1, test_mining._parse_processes(len(files) - 1))
+            parallel = test_mining._mine_files(repo_path, files, commit, None, 3)
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual(list(serial[0]['files']), [f'repo/{file}' for file in files if file != 'broken.py'])
+        repo.close()
+
+
+def _counts(visitor) -> tuple:
+    return (visitor.test_imports, visitor.test_classes, visitor.test_functions, visitor.production_statements,
+            visitor.test_statements)
+
+
+class StatementVisitorTests(unittest.TestCase):
+
+    def test_counts_match_the_node_visitor(self):
+        """ Test that the statement visitor counts and names what the NodeVisitor it replaced did, in its order. """
+
+        source = textwrap.dedent('''
+            import os, unittest, pytest as pt
+            from unittest import TestCase
+            x = print(len([y for y in range(3)]))
+
+            @decorate(call())
+            class Tests(unittest.TestCase, Mixin):
+                value = {**defaults, 'key': call()}
+                import nose2
+
+                def test_nested(self):
+                    class Inner(TestCase):
+                        def helper(self):
+                            assert (lambda: call())()
+                    def test_inner():
+                        x = 1
+
+                async def test_async(self):
+                    await call()
+
+            class Production:
+                def method(self, a=call(), *, b=None):
+                    match a:
+                        case Point(x=0) if check():
+                            print(a)
+                        case {'key': value, **rest}:
+                            pass
+                    return f'{call()!r:>{width()}}'
+
+            def test_function():
+                global x
+                x = call()
+                try:
+                    import unittest
+                except Exception as error:
+                    raise error
+        ''')
+
+        reference, visitor = NodeStatementVisitor(), test_mining.StatementVisitor()
+        reference.visit(ast.parse(source))
+        visitor.visit(ast.parse(source))
+        self.assertEqual(_counts(reference), _counts(visitor))
+        self.assertEqual(['Tests', 'Inner'], visitor.test_classes)
+        self.assertEqual(['test_nested', 'test_inner', 'test_function'], visitor.test_functions)
+
+    def test_reset_visitor_matches_a_new_visitor_per_file(self):
+        """ Test that one visitor, reset between files, counts the files of a real package as a new visitor does. """
+
+        trees = parse_files([Path(sysconfig.get_paths()['stdlib']) / 'unittest'])
+        visitor = test_mining.StatementVisitor()
+        for tree in trees.values():
+            reference = NodeStatementVisitor()
+            reference.visit(tree)
+            visitor.reset()
+            visitor.visit(tree)
+            self.assertEqual(_counts(reference), _counts(visitor))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,19 +6,6 @@ from utility import util, config
 
 class MyModuleTests(unittest.TestCase):
 
-    @patch('os.walk')
-    def test_get_python_files_from_directory(self, mock_walk):
-        """ Test that the function gets the python files. """
-
-        mock_walk.return_value = [
-            ('/path/to/dir', ('subdir',), ('file.py', 'not_a_python_file.txt')),
-        ]
-        expected_files = [str(Path('/path/to/dir/file.py').resolve())]
-        directory = Path('/path/to/dir').resolve()
-        result = util.get_python_files_from_directory(directory)
-        normalized_result = [str(Path(file).resolve()) for file in result]
-        self.assertEqual(expected_files, normalized_result)
-
     def test_get_repo_name_from_url(self):
         test_cases = [
             ("https://github.com/user/repo_name.git", "repo_name"),
@@ -60,15 +47,6 @@ class MyModuleTests(unittest.TestCase):
         self.assertEqual(result, expected_urls)
         mock_file.assert_called_once_with(config.REPOSITORY_URLS, 'r')
 
-    @patch('utility.config.REPOSITORIES_FOLDER', new_callable=lambda: Path('/base/repo'))
-    def test_get_file_relative_path_from_absolute_path(self, mock_base_path):
-        """ Tests that the function returns a relative path, based on the absolute path provided by config.py """
-
-        absolute_path = f'{config.REPOSITORIES_FOLDER}/subfolder/file.py'
-        expected_relative_path = 'subfolder/file.py'
-        actual_relative_path = util.absolute_repos_to_relative(absolute_path)
-        self.assertEqual(expected_relative_path, actual_relative_path)
-
     @patch('utility.config.REPOSITORIES_FOLDER', Path('/base/repo/'))
     def test_get_path_to_repo(self):
         """ Test that we can get the path to a repository form an url """
@@ -0,0 +1,174 @@
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic_repos import RepoSpec, generate_repo
+from data_io.work_queue import WorkQueue
+
+ROOT = Path(__file__).parent.parent
+
+
+def _claim_until_drained(path: str, node: str) -> list[str]:
+    """Claims and completes repositories one at a time, as a node would, and returns the claimed repositories."""
+
+    queue = WorkQueue(Path(path))
+    claimed = []
+    while urls := queue.claim(node):
+        claimed += urls
+        queue.complete(node, urls)
+    return claimed
+
+
+class WorkQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.urls = [f'https://github.com/owner/repo_{index}' for index in range(6)]
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_claims_in_order_and_completes(self):
+        """ Test that repositories are claimed in the order they were added, once each, until the queue is drained. """
+
+        queue = WorkQueue(self.root / 'queue.db')
+        self.assertEqual(6, queue.add(self.urls))
+        self.assertEqual(0, queue.add(self.urls[:2]))
+
+        self.assertEqual(self.urls[:4], queue.claim('a', 4))
+        self.assertEqual(self.urls[4:], queue.claim('b', 4))
+        self.assertEqual([], queue.claim('c', 4))
+        self.assertFalse(queue.is_drained())
+
+        queue.complete('a', self.urls[:4])
+        queue.complete('b', self.urls[4:])
+        self.assertEqual({'pending': 0, 'leased': 0, 'done': 6, 'failed': 0}, queue.counts())
+        self.assertTrue(queue.is_drained())
+
+    def test_expired_leases_are_requeued(self):
+        """ Test that the repositories of a node without heartbeats are claimed by another node. """
+
+        queue = WorkQueue(self.root / 'queue.db', lease_seconds=0.2)
+        queue.add(self.urls[:2])
+        queue.claim('a', 1)
+        queue.claim('b', 1)
+
+        time.sleep(0.1)
+        self.assertEqual([self.urls[1]], queue.heartbeat('b', [self.urls[1]]))
+        time.sleep(0.15)
+
+        self.assertEqual([self.urls[0]], queue.claim('c', 2))
+        self.assertEqual([], queue.heartbeat('a', [self.urls[0]]))
+
+    def test_failures_are_retried_until_max_attempts(self):
+        """ Test that failed repositories are returned to the queue, and marked as failed after the last attempt. """
+
+        queue = WorkQueue(self.root / 'queue.db', max_attempts=2)
+        queue.add(self.urls[:1])
+
+        queue.fail('a', queue.claim('a'), 'error')
+        self.assertEqual(1, queue.counts()['pending'])
+
+        queue.fail('b', queue.claim('b'), 'error')
+        self.assertEqual(1, queue.counts()['failed'])
+        self.assertTrue(queue.is_drained())
+
+        self.assertEqual(1, queue.requeue_failed())
+        self.assertEqual(self.urls[:1], queue.claim('c'))
+
+    def test_release_does_not_count_an_attempt(self):
+        """ Test that released repositories can be claimed again without using up their attempts. """
+
+        queue = WorkQueue(self.root / 'queue.db', max_attempts=1)
+        queue.add(self.urls[:1])
+
+        queue.release('a', queue.claim('a'))
+        queue.fail('b', queue.claim('b'), 'error')
+
+        self.assertEqual(1, queue.counts()['failed'])
+
+    def test_nodes_in_processes_claim_each_repository_once(self):
+        """ Test that nodes in separate processes never claim the same repository. """
+
+        path = self.root / 'queue.db'
+        WorkQueue(path).add(self.urls + [f'{url}_fork' for url in self.urls])
+
+        with multiprocessing.get_context('spawn').Pool(3) as pool:
+            claimed = pool.starmap(_claim_until_drained, [(str(path), f'node_{index}') for index in range(3)])
+
+        self.assertEqual(12, sum(len(urls) for urls in claimed))
+        self.assertEqual(12, len({url for urls in claimed for url in urls}))
+
+
+class WorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        self.repos = [generate_repo(self.root / 'source' / name, RepoSpec(commits=4, seed=seed))
+                      for seed, name in enumerate(['alpha', 'beta', 'gamma'])]
+        self.queue_path = self.root / 'queue.db'
+        self.locations = ['--data-dir', str(self.root / 'data'), '--logs-dir', str(self.root / 'logs')]
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def _pyciras(self, *arguments: str) -> subprocess.Popen:
+        return subprocess.Popen([sys.executable, 'pyciras.py', *arguments, *self.locations],
+                                cwd=ROOT,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE,
+                                text=True)
+
+    def _wait(self, process: subprocess.Popen):
+        _, errors = process.communicate(timeout=300)
+        self.assertEqual(0, process.returncode, errors)
+
+    def test_workers_drain_the_queue_and_their_data_is_merged(self):
+        """ Test that local worker processes mine every queued repository, including an abandoned one, once. """
+
+        queue = WorkQueue(self.queue_path, lease_seconds=1)
+        queue.add([str(repo) for repo in self.repos])
+        queue.claim('crashed')
+
+        workers = [self._pyciras('worker', str(self.queue_path), '--node', node,
+                                 '--repositories-dir', str(self.root / 'repositories' / node),
+                                 '--miners', 'test', '--sinks', 'csv', 'db',
+                                 '--lease-seconds', '30', '--heartbeat-seconds', '1', '--poll-seconds', '1')
+                   for node in ['node_a', 'node_b']]
+        for worker in workers:
+            self._wait(worker)
+
+        self.assertEqual({'pending': 0, 'leased': 0, 'done': 3, 'failed': 0}, queue.counts())
+        self.assertEqual({'node_a', 'node_b'}, set(queue.nodes()))
+
+        self._wait(self._pyciras('merge', str(self.queue_path), '--name', 'merged'))
+
+        merged = pd.read_csv(self.root / 'data' / 'merged' / 'test.csv')
+        self.assertEqual(['alpha', 'beta', 'gamma'], sorted(merged['repo'].unique()))
+        self.assertEqual(12, len(merged))
+
+    def test_repositories_that_a_miner_fails_on_are_retried(self):
+        """ Test that a repository whose miner raises is claimed again, and marked as failed after max attempts. """
+
+        # A leftover directory that is not a git repository makes the test miner raise while it mines the repository.
+        (self.root / 'repositories' / 'broken').mkdir(parents=True)
+        queue = WorkQueue(self.queue_path)
+        queue.add([str(self.repos[0]), str(self.root / 'source' / 'broken')])
+
+        self._wait(self._pyciras('worker', str(self.queue_path), '--node', 'node_a',
+                                 '--repositories-dir', str(self.root / 'repositories'),
+                                 '--miners', 'test', '--sinks', 'csv', '--max-attempts', '2', '--poll-seconds', '1'))
+
+        self.assertEqual({'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}, queue.counts())
+
+
+if __name__ == '__main__':
+    unittest.main()
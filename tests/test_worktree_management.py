@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from git import Repo
+from rich.progress import Progress
+
+from data_io import repo_management, worktree_management
+from tests.test_repo_management import make_source_repo
+
+
+class SnapshotWorktreeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.temporary_directory.name)
+        source = make_source_repo(self.root / 'source' / 'alpha')
+        self.repo_path = repo_management.clone_repos(self.root / 'repositories', [source.as_uri()],
+                                                     Progress(disable=True), 'snapshot')[0]
+        self.folder = self.root / 'shm'
+        self.patches = [patch('utility.config.SNAPSHOT_WORKTREE_FOLDER', self.folder),
+                        patch('utility.config.SNAPSHOT_WORKTREE_LIMIT_MB', 1)]
+        for worktree_patch in self.patches:
+            worktree_patch.start()
+
+    def tearDown(self):
+        for worktree_patch in self.patches:
+            worktree_patch.stop()
+        self.temporary_directory.cleanup()
+
+    def test_commits_are_checked_out_in_a_temporary_worktree(self):
+        """ Test that the worktree has the name and sparse checkout of the repository, and is removed afterwards. """
+
+        with worktree_management.snapshot_worktree(self.repo_path) as worktree_path:
+            self.assertEqual('alpha', worktree_path.name)
+            self.assertTrue(worktree_path.is_relative_to(self.folder))
+
+            repo = Repo(worktree_path)
+            repo.git.reset('--hard')
+            repo.git.checkout('HEAD~1')
+            self.assertEqual(['.git', 'module_0.py'], sorted(file.name for file in worktree_path.iterdir()))
+            repo.close()
+
+        self.assertEqual([], list(self.folder.iterdir()))
+        self.assertEqual(1, len(Repo(self.repo_path).git.worktree('list').splitlines()))
+
+    def test_large_repositories_are_mined_in_place(self):
+        """ Test that a repository whose mined Python files exceed the limit is checked out in place. """
+
+        source, repo = Repo(self.root / 'source' / 'alpha'), Repo(self.repo_path)
+        repo.git.sparse_checkout('disable')
+        for path in ['data.csv', 'build/generated.py', 'large.py']:
+            (Path(source.working_dir) / path).parent.mkdir(exist_ok=True)
+            (Path(source.working_dir) / path).write_bytes(b'#' * 2 * 1024 * 1024)
+            source.index.add([path])
+            source.index.commit(f'Add {path}')
+            repo.git.pull()
+
+            with worktree_management.snapshot_worktree(self.repo_path) as worktree_path:
+                # Files that are not mined, such as data and the files of ignored directories, are not counted.
+                self.assertEqual(path == 'large.py', self.repo_path == worktree_path)
+        repo.close()
+
+    def test_worktrees_of_stopped_processes_are_removed(self):
+        """ Test that the worktrees left by processes that are no longer running are removed. """
+
+        stopped = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                                 capture_output=True, text=True).stdout.strip()
+        (self.folder / f'pyciras-{stopped}-crashed' / 'alpha').mkdir(parents=True)
+
+        with worktree_management.snapshot_worktree(self.repo_path) as worktree_path:
+            self.assertEqual([worktree_path.parent], list(self.folder.iterdir()))
+
+
+if __name__ == '__main__':
+    unittest.main()
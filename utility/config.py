@@ -11,6 +11,8 @@ DATA_FOLDER: Path = OUTPUT_FOLDER / 'data'
 REPOSITORY_URLS: Path = ROOT_DIR / 'repos.txt'
 # Define the repository folder where the repositories will be searched for, or cloned to.
 REPOSITORIES_FOLDER: Path = OUTPUT_FOLDER / 'repositories'
+# Define the folder where bare mirrors of the repositories are kept between runs, if USE_MIRROR_CACHE is enabled.
+MIRROR_FOLDER: Path = OUTPUT_FOLDER / 'mirrors'
 # Define the folder where the logs will be stored.
 LOGGING_FOLDER: Path = OUTPUT_FOLDER / 'logs'
 # Define the URL to the GitHub GraphQL API. If used, ensure to provide a valid token in the .env file.
@@ -74,10 +76,108 @@ CONSOLE_LOGGING_LEVEL: int = logging.WARNING
 FILE_LOGGING_LEVEL: int = logging.DEBUG
 # If set to true, the collected raw data will be inserted into a database.
 WRITE_DATABASE: bool = True
-# If set to true, the collected raw data will be written to a JSON file.
+# If set to true, the collected raw data will be written to a JSON file, or a JSON Lines file for lint and test data.
 WRITE_JSON: bool = False
 # If set to true, the collected data will be parsed and written to a CSV file.
 WRITE_CSV: bool = True
+# Number of commits after which the snapshot miners (lint and test) flush their data to the enabled outputs and
+# record a checkpoint. Lower values reduce the memory usage and the work lost if a run is interrupted.
+SNAPSHOT_BATCH_SIZE: int = 250
+# Number of repositories after which the git, metadata and stargazers miners flush their data to the enabled outputs.
+REPOSITORY_BATCH_SIZE: int = 50
+# The clone strategy used when mining. 'auto' selects the strategy from the enabled miners: a blobless clone with a
+# sparse checkout of SPARSE_CHECKOUT_PATTERNS for lint and test mining ('snapshot'), and a blobless clone for git
+# mining ('blobless'). It can be set to 'full', 'blobless', 'treeless' or 'snapshot' to always use that strategy.
+CLONE_STRATEGY: str = 'auto'
+# The files that are checked out in repositories cloned with the 'snapshot' strategy, as non-cone sparse-checkout
+# patterns. Configuration files that a miner reads from the repositories can be added here, such as 'setup.cfg'.
+SPARSE_CHECKOUT_PATTERNS: list[str] = ['*.py']
+# If set to true, the directories of IGNORE_DIRECTORIES and IGNORE_STARTSWITH are left out of the sparse checkout of
+# snapshot clones, as the miners skip them anyway.
+SPARSE_CHECKOUT_EXCLUDE_IGNORED: bool = True
+# If set, the lint and test miners check out the commits of a repository in a temporary git worktree in this folder,
+# such as Path('/dev/shm/pyciras') to keep the files of the checkouts in memory. None checks out in the repositories.
+# Pylint compares files for duplicate code in the order that the file system lists them, so its duplicate-code stats
+# can differ between file systems.
+SNAPSHOT_WORKTREE_FOLDER: Path | None = None
+# The largest size in MB of the Python files of a repository that is mined in a worktree of SNAPSHOT_WORKTREE_FOLDER,
+# at its latest commit. Repositories with larger Python files are checked out in place.
+SNAPSHOT_WORKTREE_LIMIT_MB: int = 512
+# Python files that are larger than this size in KB, have a line longer than MAX_LINE_LENGTH characters, or contain one
+# of GENERATED_FILE_MARKERS near their start are skipped by the lint and test miners. None disables a check. Skipped
+# files are recorded in skipped.jsonl in the data directory.
+MAX_FILE_SIZE_KB: int | None = 1024
+MAX_LINE_LENGTH: int | None = 10000
+GENERATED_FILE_MARKERS: list[str] = [
+    '@generated', 'DO NOT EDIT', 'Generated by the protocol buffer compiler', 'Autogenerated by Thrift',
+    'Form implementation generated from reading ui file',
+]
+# If set, the lint and test miners mine each commit in a worker process that may take at most this many seconds and
+# this much memory in MB. A commit over budget is skipped and recorded in skipped.jsonl, and the worker is replaced.
+# The workers are spawned, so scripts that call pyciras.run_mining need an if __name__ == '__main__' guard.
+COMMIT_TIMEOUT_SECONDS: int | None = None
+COMMIT_MEMORY_LIMIT_MB: int | None = None
+# If set to true, the lint and test results of each commit are stored by the tree of its Python files, and commits with
+# a tree that was mined before, in the same repository or in a fork with the same name, are not mined again. The store
+# is kept in RESULT_STORE_FOLDER if it is set, which shares it between runs, and in the data directory of a run
+# otherwise.
+USE_RESULT_STORE: bool = True
+RESULT_STORE_FOLDER: Path | None = None
+# If set to true, repositories are cloned from local bare mirrors in MIRROR_FOLDER, which persist between runs and are
+# refreshed with git fetch --prune. Working clones share the objects of the mirrors, and mirrors of forks share their
+# objects with each other. The mirrors are always complete, clone strategy filters only apply without this cache.
+USE_MIRROR_CACHE: bool = False
+# If set to true, cloned repositories (or their mirrors) get a commit-graph, a multi-pack-index and a bitmap index,
+# which speed up the history walks of the git and snapshot mining. Skipped for repositories that are up to date.
+PREPARE_REPOSITORIES: bool = False
+# The maximum disk space in MB that prefetched repositories may use before the prefetcher stops cloning ahead.
+# Only used when mining with prefetch enabled. None means no limit.
+PREFETCH_DISK_BUDGET_MB: int | None = None
+# Only every nth commit of a repository is mined by the lint and test miners, counting back from the latest commit.
+SNAPSHOT_SAMPLE_EVERY: int = 1
+# The maximum number of commits per repository mined by the lint and test miners, evenly spaced over the commits left
+# by SNAPSHOT_SAMPLE_EVERY and always including the latest. None mines all of them.
+SNAPSHOT_MAX_COMMITS: int | None = None
+# The maximum number of repositories mined in parallel when multiprocessing is enabled. None uses the default of
+# ThreadPoolExecutor. At most one chunk of repositories is mined in parallel.
+MAX_WORKERS: int | None = None
+# The maximum number of batches of REPOSITORY_BATCH_SIZE repositories that the metadata and stargazers miners mine at
+# the same time, alongside the chunks of the CPU miners. Higher values shorten the network wait, but make hitting the
+# secondary rate limits of the GitHub API more likely.
+NETWORK_CONCURRENCY: int = 2
+# The number of processes Pylint uses per commit, 0 for one per CPU. None uses the jobs setting of PYLINT_CONFIG.
+# With one process, the linter and the ASTs of unchanged files are kept between the commits of a repository.
+PYLINT_JOBS: int | None = None
+# The lint backend used by the lint miner, see LINT_BACKENDS in lint_mining. 'ast' computes the messages and stats that
+# the analyses use from the syntax trees, without inference, which is an order of magnitude faster than 'pylint'.
+LINT_BACKEND: str = 'pylint'
+# The number of processes that the test miner parses the Python files of a commit with, 0 for one per CPU. Commits with
+# fewer than AST_PARSE_THRESHOLD files, and commits mined in the worker of COMMIT_TIMEOUT_SECONDS or
+# COMMIT_MEMORY_LIMIT_MB, are parsed in one process. None parses all commits in one process.
+AST_PARSE_PROCESSES: int | None = None
+AST_PARSE_THRESHOLD: int = 2000
+# The number of seconds a mining node holds the repositories it claims from a work queue without a heartbeat. Once a
+# lease expires, the repositories are claimed again by other nodes. It should be well above QUEUE_HEARTBEAT_SECONDS
+# and the clock difference between the nodes.
+QUEUE_LEASE_SECONDS: float = 600
+# The number of seconds between the heartbeats that extend the leases of a mining node.
+QUEUE_HEARTBEAT_SECONDS: float = 60
+# The number of times a repository is claimed from a work queue before it is marked as failed.
+QUEUE_MAX_ATTEMPTS: int = 3
+# The number of seconds an idle mining node waits before it checks the work queue for expired leases again.
+QUEUE_POLL_SECONDS: float = 30
+# The number of seconds a node waits for the lock of the work queue database, which nodes hold only briefly.
+QUEUE_LOCK_TIMEOUT_SECONDS: float = 60
+# The stages that are profiled, as function names or glob patterns, for example '_mine_lint', '_mine_test', '_mine_git',
+# '_write_lint_data' or '*_to_csv'. Profiles are written as .pstats files to the profiles folder of the data directory,
+# with a merged report of the top hotspots per stage. An empty list disables profiling.
+PROFILE_STAGES: list[str] = []
+# Only stages that handle a repository whose name matches this glob pattern are profiled.
+PROFILE_REPOSITORY_PATTERN: str = '*'
+# The profiler: 'cprofile', or 'sampling' to use pyinstrument if it is installed, which has a lower overhead.
+PROFILER: str = 'cprofile'
+# The number of functions per stage in the hotspots report.
+PROFILE_TOP_N: int = 25
 # If set to true, a notification will be sent when the process is complete using ntfyer.
 # This requires valid credentials added to the .env file.
 ENABLE_NTFYER: bool = True
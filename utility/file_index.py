@@ -0,0 +1,73 @@
+"""
+This module lists the Python files of the commits of a repository from its git trees, instead of walking the checked out
+directory of every commit.
+
+The Python files below a tree are cached by the SHA of the tree, so the tree of a commit reuses the files of the
+subtrees that the commit did not change. Only the changed trees are read from the object database of the repository
+and matched against the ignored directories. As trees are addressed by their content, the cache is shared by all
+repositories.
+"""
+
+import re
+import threading
+
+from git import Repo, Tree
+
+from utility import config, util
+
+# The number of trees whose files are cached, which covers the changed trees of many commits of large repositories.
+TREE_CACHE_SIZE = 65536
+
+_lock = threading.Lock()
+_tree_files: dict[tuple[bytes, re.Pattern], tuple[tuple[str, bytes], ...]] = {}
+
+
+def ignore_pattern(ignore_directories: list[str], ignore_startswith: tuple) -> re.Pattern:
+    """Returns a pattern that matches the names of the ignored directories, in their case variations or by prefix."""
+
+    names = [re.escape(name) for name in util.generate_dir_name_variations(ignore_directories)]
+    prefixes = [re.escape(prefix) for prefix in ignore_startswith]
+    alternatives = ([f'(?:{"|".join(names)})$'] if names else []) + ([f'(?:{"|".join(prefixes)})'] if prefixes else [])
+    return re.compile('|'.join(alternatives) or '(?!)')
+
+
+def tree_files(tree: Tree, ignored: re.Pattern) -> tuple[tuple[str, bytes], ...]:
+    """
+    Returns the paths of the Python files below a tree relative to it and the SHAs of their blobs, without the
+    directories whose names match the ignored pattern. The files of a directory come before those of its
+    subdirectories, in the order of their names.
+    """
+
+    key = (tree.binsha, ignored)
+    with _lock:
+        files = _tree_files.get(key)
+    if files is not None:
+        return files
+
+    paths = sorted((blob.name, blob.binsha) for blob in tree.blobs if blob.name.endswith('.py'))
+    for subtree in sorted(tree.trees, key=lambda subtree: subtree.name):
+        if not ignored.match(subtree.name):
+            paths += [(f'{subtree.name}/{path}', binsha) for path, binsha in tree_files(subtree, ignored)]
+    files = tuple(paths)
+
+    with _lock:
+        _tree_files[key] = files
+        if len(_tree_files) > TREE_CACHE_SIZE:
+            del _tree_files[next(iter(_tree_files))]
+    return files
+
+
+def get_python_files_from_commit(repo: Repo, commit: str) -> list[str]:
+    """
+    Get a list of the paths of the Python files of a commit relative to the repository, without the directories of
+    config.IGNORE_DIRECTORIES and the directories that start with config.IGNORE_STARTSWITH at any depth.
+    """
+
+    return [path for path, _ in get_python_blobs_from_commit(repo, commit)]
+
+
+def get_python_blobs_from_commit(repo: Repo, commit: str) -> list[tuple[str, bytes]]:
+    """Get a list of the Python files of a commit as in get_python_files_from_commit, with the SHAs of their blobs."""
+
+    ignored = ignore_pattern(config.IGNORE_DIRECTORIES, config.IGNORE_STARTSWITH)
+    return list(tree_files(repo.commit(commit).tree, ignored))
@@ -9,13 +9,13 @@ from utility import config
 
 LOG_DIR = Path(config.LOGGING_FOLDER)
 LOG_FILE = datetime.now().strftime('%Y-%m-%d_%H-%M.log')
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def setup_root_logger():
     """Configure the root logger with custom handlers."""
 
     if not logging.root.handlers:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
         console = Console()
 
         file_handler = logging.FileHandler(LOG_DIR / LOG_FILE, mode='a', encoding='utf-8')
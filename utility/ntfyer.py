@@ -1,3 +1,4 @@
+import logging
 import os
 
 import requests
@@ -11,7 +12,9 @@ def ntfy(data: str, title: str):
     """ Send a ntfy message to the server """
 
     load_dotenv()
-    if config.ENABLE_NTFYER:
+    if config.ENABLE_NTFYER and os.getenv('NTFY_URL') is None:
+        logging.warning('ENABLE_NTFYER is set, but NTFY_URL is missing in the .env file, skipping the notification')
+    elif config.ENABLE_NTFYER:
         requests.post(f"{os.getenv('NTFY_URL')}/{os.getenv('NTFY_TOPIC')}",
                       data=data,
                       headers={
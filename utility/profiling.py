@@ -0,0 +1,146 @@
+"""This module provides profiling hooks for the mining stages, which are enabled in config.py per stage and repository."""
+
+import cProfile
+import fnmatch
+import io
+import logging
+import pstats
+import threading
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+from utility import config, util
+
+_profile_directory: Path | None = None
+# Only one profiler can be active per process, so stages that start while another is profiled are not profiled.
+_profiling = threading.Lock()
+
+
+def configure(profile_directory: Path | None):
+    """Sets the directory that profiles are written to."""
+
+    global _profile_directory
+    _profile_directory = profile_directory
+
+
+def profiled(func):
+    """
+    Profiles a stage if its name matches config.PROFILE_STAGES and a repository it handles matches
+    config.PROFILE_REPOSITORY_PATTERN. The profile is written as a .pstats file to the profile directory.
+    Stages that run while another stage is profiled, in the same or another thread, are not profiled separately.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        stage = func.__name__
+        repo_names = _get_repo_names(args)
+        if not _should_profile(stage, repo_names) or not _profiling.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        profiler = _Profiler()
+        try:
+            profiler.start()
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            _profiling.release()
+            profiler.write(_profile_directory / _get_profile_name(stage, repo_names))
+
+    return wrapper
+
+
+def write_report(top_n: int = 25) -> Path | None:
+    """Merges the profiles of each stage across repositories, and writes their top hotspots to hotspots.txt."""
+
+    if _profile_directory is None or not _profile_directory.exists():
+        return None
+
+    profiles_by_stage = {}
+    for path in sorted(_profile_directory.glob('*.pstats')):
+        profiles_by_stage.setdefault(path.name.split('--')[0], []).append(str(path))
+
+    if not profiles_by_stage:
+        return None
+
+    report_path = _profile_directory / 'hotspots.txt'
+    with open(report_path, 'w') as file:
+        for stage, paths in profiles_by_stage.items():
+            stream = io.StringIO()
+            stats = pstats.Stats(*paths, stream=stream)
+            stats.strip_dirs().sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+            file.write(f'===== {stage}: {len(paths)} profiles =====\n{stream.getvalue()}\n')
+
+    logging.info(f'\nProfiling report written to {report_path}')
+    return report_path
+
+
+class _Profiler:
+    """Wraps cProfile, or the pyinstrument sampling profiler if it is selected and installed."""
+
+    def __init__(self):
+        self.sampling = None
+        if config.PROFILER == 'sampling':
+            try:
+                from pyinstrument import Profiler
+                self.sampling = Profiler()
+            except ImportError:
+                logging.warning('pyinstrument is not installed, falling back to cProfile')
+
+        self.profile = cProfile.Profile() if self.sampling is None else None
+
+    def start(self):
+        if self.sampling is not None:
+            self.sampling.start()
+        else:
+            self.profile.enable()
+
+    def stop(self):
+        if self.sampling is not None:
+            self.sampling.stop()
+        else:
+            self.profile.disable()
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if self.sampling is not None:
+            from pyinstrument.renderers import PstatsRenderer
+            with open(path, 'w', encoding='utf-8', errors='surrogateescape') as file:
+                file.write(self.sampling.output(PstatsRenderer()))
+        else:
+            self.profile.dump_stats(path)
+
+        logging.debug(f'Profile written to {path}')
+
+
+def _should_profile(stage: str, repo_names: list[str]) -> bool:
+    """Checks if a stage and one of its repositories are selected for profiling."""
+
+    if _profile_directory is None:
+        return False
+
+    if not any(fnmatch.fnmatch(stage, pattern) for pattern in config.PROFILE_STAGES):
+        return False
+
+    return len(repo_names) == 0 or any(fnmatch.fnmatch(name, config.PROFILE_REPOSITORY_PATTERN)
+                                       for name in repo_names)
+
+
+def _get_repo_names(args: tuple) -> list[str]:
+    """Finds the repositories of a stage in its arguments: a list of URLs, a dict keyed by repo or a repo name."""
+
+    for arg in args:
+        if isinstance(arg, str):
+            return [util.get_repo_name_from_url_or_path(arg)]
+        if isinstance(arg, (list, dict)):
+            return [util.get_repo_name_from_url_or_path(str(key)) for key in arg]
+
+    return []
+
+
+def _get_profile_name(stage: str, repo_names: list[str]) -> str:
+    """Returns the file name of a profile, unique per stage, repositories, time and thread."""
+
+    repos = '_'.join(repo_names[:3]) + (f'_and_{len(repo_names) - 3}_more' if len(repo_names) > 3 else '')
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f')
+    return f'{stage}--{repos or "all"}--{timestamp}-{threading.get_ident()}.pstats'
@@ -0,0 +1,40 @@
+"""This module records the commits and files that the lint and test miners skip, and the reasons they were skipped."""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+_lock = threading.Lock()
+_skips_path: Path | None = None
+
+
+def configure(skips_path: Path | None):
+    """Sets the JSONL file that skips are appended to."""
+
+    global _skips_path
+
+    with _lock:
+        _skips_path = skips_path
+
+
+def record(miner: str, repo: str, commit: str, reason: str, file: str | None = None):
+    """Logs a skipped commit, or a skipped file of a commit, and writes it to the skips file."""
+
+    logging.warning(f'{miner}: skipping {repo} {commit}{f" {file}" if file is not None else ""}: {reason}')
+    entry = {
+        'miner': miner,
+        'repo': repo,
+        'commit': commit,
+        'file': file,
+        'reason': reason,
+        'skipped_at': str(datetime.now()),
+    }
+    with _lock:
+        if _skips_path is not None:
+            try:
+                with open(_skips_path, 'a') as file_handle:
+                    file_handle.write(json.dumps(entry) + '\n')
+            except OSError:
+                logging.error(f'Could not write skips to {_skips_path}', exc_info=True)
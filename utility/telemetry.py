@@ -0,0 +1,157 @@
+"""This module records structured performance telemetry of the mining stages, per repository and per stage."""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Generator
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+_lock = threading.Lock()
+_telemetry_path: Path | None = None
+_totals: dict[str, dict[str, any]] = {}
+
+
+class Span:
+    """A timed stage of the mining of a repository, with counters such as commits, files, bytes and rows."""
+
+    def __init__(self, stage: str, repo: str | None = None):
+        self.stage = stage
+        self.repo = repo
+        self.counters: dict[str, float] = {}
+        self.started_at = datetime.now()
+        self.wall_seconds = 0.0
+        self.active_seconds = 0.0
+        self._timed_sections = False
+        self._start = time.perf_counter()
+
+    def add(self, counter: str, amount: float = 1):
+        """Adds to a counter of the span."""
+
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timing(self) -> Generator['Span', None, None]:
+        """Times a section of the span. A span with timed sections lasts for the sum of its sections."""
+
+        self._timed_sections = True
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.active_seconds += time.perf_counter() - start
+
+    def finish(self):
+        """Ends the span and records it."""
+
+        self.wall_seconds = time.perf_counter() - self._start
+        record(self)
+
+    @property
+    def duration(self) -> float:
+        """The duration of the span in seconds."""
+
+        return self.active_seconds if self._timed_sections else self.wall_seconds
+
+    def to_dict(self) -> dict[str, any]:
+        """Returns the span as a dict, with the rate per second of each counter."""
+
+        duration = self.duration
+        return {
+            'stage': self.stage,
+            'repo': self.repo,
+            'started_at': str(self.started_at),
+            'duration': round(duration, 6),
+            'wall_duration': round(self.wall_seconds, 6),
+            'counters': self.counters,
+            'rates': {f'{counter}_per_s': round(value / duration, 3) for counter, value in self.counters.items()
+                      if duration > 0}
+        }
+
+
+def configure(telemetry_path: Path | None):
+    """Sets the JSONL file that spans are appended to, and resets the totals of the run summary."""
+
+    global _telemetry_path, _totals
+
+    with _lock:
+        _telemetry_path = telemetry_path
+        _totals = {}
+
+
+@contextmanager
+def span(stage: str, repo: str | None = None) -> Generator[Span, None, None]:
+    """Records a span of a stage, which is written to the telemetry file when the context exits."""
+
+    current_span = Span(stage, repo)
+    try:
+        yield current_span
+    finally:
+        current_span.finish()
+
+
+def record(finished_span: Span):
+    """Writes a finished span to the telemetry file and adds it to the totals of its stage."""
+
+    entry = finished_span.to_dict()
+    with _lock:
+        totals = _totals.setdefault(finished_span.stage, {'spans': 0, 'duration': 0.0, 'counters': {}})
+        totals['spans'] += 1
+        totals['duration'] += finished_span.duration
+        for counter, value in finished_span.counters.items():
+            totals['counters'][counter] = totals['counters'].get(counter, 0) + value
+
+        if _telemetry_path is not None:
+            try:
+                with open(_telemetry_path, 'a') as file:
+                    file.write(json.dumps(entry) + '\n')
+            except OSError:
+                logging.error(f'Could not write telemetry to {_telemetry_path}', exc_info=True)
+
+
+def summary() -> dict[str, dict[str, any]]:
+    """Returns the totals of each stage recorded since the last configure, sorted by duration."""
+
+    with _lock:
+        return dict(sorted(((stage, {'spans': totals['spans'],
+                                     'duration': totals['duration'],
+                                     'counters': dict(totals['counters'])})
+                            for stage, totals in _totals.items()),
+                           key=lambda item: item[1]['duration'],
+                           reverse=True))
+
+
+def log_summary(console: 'Console | None' = None):
+    """Logs the run summary, and prints it as a table to the console if given."""
+
+    from rich.table import Table
+
+    totals = summary()
+    if not totals:
+        return
+
+    total_duration = sum(stage['duration'] for stage in totals.values())
+    table = Table(title='PyCIRAS Telemetry')
+    table.add_column('Stage')
+    table.add_column('Spans', justify='right')
+    table.add_column('Time', justify='right')
+    table.add_column('Share', justify='right')
+    table.add_column('Counters')
+
+    lines = []
+    for stage, totals_of_stage in totals.items():
+        duration = totals_of_stage['duration']
+        share = duration / total_duration * 100 if total_duration > 0 else 0
+        counters = ', '.join(f'{counter} {value:g}' + (f' ({value / duration:.1f}/s)' if duration > 0 else '')
+                             for counter, value in totals_of_stage['counters'].items())
+        table.add_row(stage, str(totals_of_stage['spans']), f'{duration:.1f}s', f'{share:.1f}%', counters)
+        lines.append(f'{stage}: {totals_of_stage["spans"]} spans, {duration:.1f}s ({share:.1f}%) {counters}')
+
+    logging.info('\nTelemetry summary\n' + '\n'.join(lines))
+    if console is not None:
+        console.print(table)
@@ -1,39 +1,13 @@
-import logging
-import os
+import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import ModuleType
+from typing import Coroutine
 
 from utility import config
 
 
-def get_python_files_from_directory(directory: Path,
-                                    exclude_dirs: list[str] = None,
-                                    ignore_starts_with: tuple = None) -> list[str]:
-    """Get a list of string paths to Python files from a directory"""
-
-    if exclude_dirs is None:
-        exclude_dirs = []
-
-    exclude_dirs = [Path(directory) / Path(exc_dir) for exc_dir in
-                    generate_dir_name_variations(exclude_dirs)]
-
-    python_files = []
-    for root, dirs, files in os.walk(directory, topdown=True):
-
-        # Exclude specified directories
-        dirs[:] = [d for d in dirs if Path(root) / d not in exclude_dirs and
-                   not d.startswith(ignore_starts_with)]
-
-        for file in files:
-            if file.endswith(".py"):
-                python_file_path = str(Path(root) / file)
-                logging.debug(f"Found python file: {python_file_path}")
-                python_files.append(python_file_path)
-
-    logging.info(f"Found {len(python_files)} Python files.")
-
-    return python_files
-
-
 def generate_dir_name_variations(dirs: list[str]) -> list[str]:
     """
     Generate lowercase, uppercase, and capitalized variations for each directory name in dirs.
@@ -80,12 +54,6 @@ def get_repository_urls_from_file(file_path: Path) -> list[str]:
     return urls
 
 
-def absolute_repos_to_relative(absolute_path: str) -> str:
-    """Returns the relative path of a repo from an absolute path"""
-
-    return absolute_path.replace(str(config.REPOSITORIES_FOLDER), '').lstrip('/').strip()
-
-
 def absolute_data_path_to_relative(absolute_path: str) -> str:
     """Returns the relative path of a file from an absolute path"""
 
@@ -131,3 +99,28 @@ def format_duration(seconds):
     minutes = (seconds % 3600) // 60
     seconds = seconds % 60
     return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+
+
+class LazyModule(ModuleType):
+    """A stand-in for a module, which imports the module when one of its attributes is first used."""
+
+    def __getattr__(self, attribute: str):
+        return getattr(importlib.import_module(self.__name__), attribute)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Returns a module that is only imported when it is first used, to keep heavy dependencies out of startup."""
+
+    return LazyModule(name)
+
+
+def run_coroutine(coroutine: Coroutine) -> any:
+    """Runs a coroutine to completion, in a thread of its own if an event loop is already running, as in Jupyter."""
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()